@@ -2,17 +2,27 @@
 Backend package initialization
 """
 
-from .modules.data_processor import process_enrollment_data, CSVDataImporter, CourseGrouper
-from .modules.scheduler import BacktrackingScheduler, ScheduleOptimizer, ConflictDetector
-from .modules.nlp_filter import IntentDetector, ConstraintFilter
+import importlib
 
-__all__ = [
-    "process_enrollment_data",
-    "CSVDataImporter",
-    "CourseGrouper",
-    "BacktrackingScheduler",
-    "ScheduleOptimizer",
-    "ConflictDetector",
-    "IntentDetector",
-    "ConstraintFilter",
-]
+# Exported name -> defining module, imported on first attribute access so
+# that importing the package (e.g. for app.main) loads nothing else
+_EXPORTS = {
+    "process_enrollment_data": ".modules.data_processor",
+    "CSVDataImporter": ".modules.data_processor",
+    "CourseGrouper": ".modules.data_processor",
+    "BacktrackingScheduler": ".modules.scheduler",
+    "ScheduleOptimizer": ".modules.scheduler",
+    "ConflictDetector": ".modules.scheduler",
+    "IntentDetector": ".modules.nlp_filter",
+    "ConstraintFilter": ".modules.nlp_filter",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -3,17 +3,47 @@ Module 5: FastAPI Backend
 RESTful API endpoints for the IntelliPlan system
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Callable, Iterator, List, Mapping, Optional, Dict, Any, Hashable, Sequence, Set, Tuple
+import asyncio
+import gzip
+import hashlib
 import json
 import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from functools import cached_property, partial
+from itertools import islice
 from pathlib import Path
 
-from app.modules.data_processor import process_enrollment_data, CSVDataImporter
-from app.modules.scheduler import BacktrackingScheduler
-from app.modules.nlp_filter import IntentDetector, ConstraintFilter
+from app.modules.data_processor import process_enrollment_data, CSVDataImporter, Slot, TimeBlock, TimingsParser
+from app.modules.scheduler import (
+    BacktrackingScheduler,
+    ConflictIndex,
+    FeasibilityCache,
+    ParallelSearch,
+    ScheduleOptimizer,
+    ScheduleSet,
+    SearchBudget,
+    SearchConstraints,
+    SearchInterrupted,
+    SearchStats,
+    TimeTableSchedule,
+)
+from app.modules.nlp_filter import IntentDetector, ConstraintFilter, Constraint
+from app.modules.serialization import dumps, dumps_with_list
+from app.modules.snapshot import DatasetSnapshot
 
 
 # ============ Pydantic Models ============
@@ -47,25 +77,93 @@ class CourseListResponse(BaseModel):
 class GenerateRequest(BaseModel):
     course_codes: List[str]
     slot_preferences: Dict[str, List[str]] = {}  # courseCode -> [slotNumbers]
+    offset: int = 0
+    limit: Optional[int] = None
+    stream: bool = False  # NDJSON, one timetable per line
+    rank: bool = False  # Order by ScheduleOptimizer score
+    top_k: Optional[int] = None  # With rank, only search for the best N
+    prefer_morning: bool = False  # Ranking criterion
+    constraint_text: str = ""  # Natural language constraints applied during the search
+    max_results: Optional[int] = None  # Stop the search after this many timetables
+    max_nodes: Optional[int] = None  # Stop the search after visiting this many nodes
+    timeout_seconds: Optional[float] = None  # Wall-clock limit for the search
 
 
 class FilterRequest(BaseModel):
-    schedules: List[TimetableModel]
+    schedules: List[TimetableModel] = []
     constraint_text: str
+    result_set_id: Optional[str] = None  # Filter a stored /generate result instead of schedules
+    offset: int = 0
+    limit: Optional[int] = None
 
 
 class FilterResponse(BaseModel):
     filtered_timetables: List[TimetableModel]
     constraints_applied: List[Dict[str, Any]]
     count: int
+    total: Optional[int] = None  # Matches before pagination
+    has_more: bool = False
 
 
 # ============ FastAPI App Setup ============
 
+# Set to 1 to load the dataset and build its indexes before the server reports
+# ready, instead of on the first request
+WARMUP_ENV = "INTELLIPLAN_WARMUP"
+# Seconds; caps every search's timeout_seconds (no cap when unset)
+SEARCH_TIMEOUT_ENV = "INTELLIPLAN_SEARCH_TIMEOUT"
+# Seconds between client-disconnect checks while a search runs
+DISCONNECT_POLL_SECONDS = 0.1
+# Search worker processes; 0 keeps every search serial (default: CPU count)
+SEARCH_WORKERS_ENV = "INTELLIPLAN_SEARCH_WORKERS"
+# Smallest search space (product of slot counts) split across the workers
+PARALLEL_THRESHOLD_ENV = "INTELLIPLAN_PARALLEL_THRESHOLD"
+# Result cache limits: memory cap in bytes, entry count and seconds to live
+RESULT_CACHE_MAX_BYTES_ENV = "INTELLIPLAN_RESULT_CACHE_MAX_BYTES"
+RESULT_CACHE_MAX_ENTRIES_ENV = "INTELLIPLAN_RESULT_CACHE_MAX_ENTRIES"
+RESULT_CACHE_TTL_ENV = "INTELLIPLAN_RESULT_CACHE_TTL"
+
+
+def env_number(name: str, default, number_type: Callable = int, positive: bool = False):
+    """
+    Read a non-negative (or, with `positive`, strictly positive) number
+    setting from the environment.
+
+    Raises:
+        ValueError: If the variable is set to anything else
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        number = number_type(value)
+    except ValueError:
+        number = -1
+    # Written so that NaN fails too
+    if not (number > 0 if positive else number >= 0):
+        raise ValueError(f"{name} must be a {'positive' if positive else 'non-negative'} number, got {value!r}")
+    return number
+
+
+# Read once at import, so a bad value stops the server instead of failing requests
+SEARCH_TIMEOUT: Optional[float] = env_number(SEARCH_TIMEOUT_ENV, None, float, positive=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Optional warm-up at startup; stop search workers at shutdown"""
+    if os.environ.get(WARMUP_ENV, "").lower() in ("1", "true", "yes"):
+        warm_up()
+    yield
+    if dataset is not None:
+        dataset.parallel_search.shutdown()
+
+
 app = FastAPI(
     title="IntelliPlan API",
     description="AI-Powered Course Scheduler",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS
@@ -78,25 +176,784 @@ app.add_middleware(
 )
 
 
+# ============ Result Cache ============
+
+class ResultCache:
+    """
+    Thread-safe LRU of complete /generate result sets with a TTL, a memory
+    cap and an entry limit.
+
+    Entries are packed ScheduleSets; their slots are shared with the loaded
+    dataset and not counted.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    DEFAULT_TTL_SECONDS = 600.0
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expiry time, estimated bytes, schedules)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, ScheduleSet]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def estimate_size(schedules: ScheduleSet) -> int:
+        """Approximate memory held by a result set, excluding shared slots"""
+        return sys.getsizeof(schedules) + schedules.nbytes
+
+    def get(self, key: Hashable) -> Optional[ScheduleSet]:
+        """Return a live cached result set, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check for a live entry without touching counters or LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def put(self, key: Hashable, schedules: ScheduleSet):
+        """Store a result set, evicting least recently used ones over the caps"""
+        size = self.estimate_size(schedules)
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, schedules)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        """Drop all entries; counters are kept"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def discard_courses(self, course_codes: Set[str]) -> int:
+        """
+        Drop result sets whose selection includes any of `course_codes`.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key in self._entries if not course_codes.isdisjoint(key[1])]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def configured_result_cache() -> ResultCache:
+    """Result cache with the limits set in the environment (defaults otherwise)"""
+    return ResultCache(
+        max_bytes=env_number(RESULT_CACHE_MAX_BYTES_ENV, ResultCache.DEFAULT_MAX_BYTES),
+        ttl_seconds=env_number(RESULT_CACHE_TTL_ENV, ResultCache.DEFAULT_TTL_SECONDS, float),
+        max_entries=env_number(RESULT_CACHE_MAX_ENTRIES_ENV, ResultCache.DEFAULT_MAX_ENTRIES),
+    )
+
+
+class ResultSetStore:
+    """
+    Bounded registry of /generate result-set handles.
+
+    A handle records the request that produced a result set; the schedules
+    themselves live in the ResultCache and are regenerated from the request
+    if they were evicted. Ids are derived from the result cache key, so the
+    same selection on the same dataset always gets the same id.
+    """
+
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, GenerateRequest]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def id_for(cache_key: Hashable) -> str:
+        """Result-set id of a result cache key"""
+        return hashlib.sha256(repr(cache_key).encode()).hexdigest()[:24]
+
+    def register(self, cache_key: Hashable, request: "GenerateRequest") -> str:
+        """Store the request behind a result set and return its id"""
+        result_set_id = self.id_for(cache_key)
+        with self._lock:
+            self._entries[result_set_id] = GenerateRequest(
+                course_codes=request.course_codes,
+                slot_preferences=request.slot_preferences,
+                constraint_text=request.constraint_text,
+            )
+            self._entries.move_to_end(result_set_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result_set_id
+
+    def get(self, result_set_id: str) -> Optional["GenerateRequest"]:
+        """Return the request behind a result set, or None if unknown or evicted"""
+        with self._lock:
+            request = self._entries.get(result_set_id)
+            if request is not None:
+                self._entries.move_to_end(result_set_id)
+            return request
+
+    def discard(self, result_set_id: str):
+        """Forget one handle, if present"""
+        with self._lock:
+            self._entries.pop(result_set_id, None)
+
+    def clear(self):
+        """Forget every handle"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and eviction counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+            }
+
+
+# ============ Course Catalog ============
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows a gzip response"""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        if not params.startswith("q="):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class CourseCatalog:
+    """
+    The /courses payload of one dataset version, built and serialized once.
+
+    Served with an ETag (a hash of the body) and Last-Modified, so clients
+    revalidating an unchanged catalog get 304 Not Modified; the gzip variant
+    is compressed on first use and served to clients that accept it.
+    """
+
+    def __init__(self, grouped: Dict[str, List[Slot]], built_at: float):
+        courses = [
+            {
+                "course_code": course_code,
+                "course_name": slots[0].course_name if slots else "",
+                "faculty_name": slots[0].faculty_name if slots else "",
+                "credits": slots[0].credits if slots else 0,
+                "available_slots": len(slots),
+                "slots": [
+                    {
+                        "slot_number": slot.slot_number,
+                        "time_blocks": [
+                            {
+                                "day": tb.day,
+                                "start_time": tb.start_time,
+                                "end_time": tb.end_time
+                            }
+                            for tb in slot.time_blocks
+                        ],
+                    }
+                    for slot in slots
+                ],
+            }
+            for course_code, slots in grouped.items()
+        ]
+        self.body = dumps({"courses": courses, "count": len(courses)})
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # Strong validators differ per content coding
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.modified_at = int(built_at)
+        self.last_modified = formatdate(self.modified_at, usegmt=True)
+        self._gzip_body: Optional[bytes] = None
+
+    @property
+    def gzip_body(self) -> bytes:
+        """The body gzip-compressed, built on first use"""
+        if self._gzip_body is None:
+            # Compressing twice under a race is harmless; the output is identical
+            self._gzip_body = gzip.compress(self.body, mtime=0)
+        return self._gzip_body
+
+    def is_unchanged(self, etag: str, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """
+        Evaluate a conditional GET (RFC 9110: If-None-Match takes precedence).
+
+        Args:
+            etag: ETag of the variant being served
+            if_none_match: If-None-Match header, if any
+            if_modified_since: If-Modified-Since header, if any
+        """
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.modified_at <= since.timestamp()
+        return False
+
+    def response(self, headers: Mapping[str, str]) -> Response:
+        """
+        Serve the catalog for a request's headers.
+
+        Args:
+            headers: Request headers (case-insensitive mapping)
+
+        Returns:
+            304 if the client's copy is current, else the (gzip) JSON body
+        """
+        use_gzip = accepts_gzip(headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if use_gzip else self.etag
+        response_headers = {
+            "ETag": etag,
+            "Last-Modified": self.last_modified,
+            # Cacheable, but revalidated on every page load
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self.is_unchanged(etag, headers.get("if-none-match"), headers.get("if-modified-since")):
+            return Response(status_code=304, headers=response_headers)
+        if use_gzip:
+            response_headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type="application/json", headers=response_headers)
+        return Response(self.body, media_type="application/json", headers=response_headers)
+
+
 # ============ Global State ============
 
+@dataclass(frozen=True)
+class Dataset:
+    """
+    One version of the served data and everything derived from it.
+
+    Never modified once published: uploads and slot edits build a new
+    Dataset and swap the module-level reference. A request reads that
+    reference once and works from it, so it never sees a mix of versions
+    and never waits for a writer.
+    """
+
+    grouped: Dict[str, List[Slot]]
+    conflict_index: ConflictIndex
+    feasibility_cache: FeasibilityCache
+    parallel_search: ParallelSearch
+    scheduler: BacktrackingScheduler
+    csv_hash: str
+    version: int
+    # Dataset version of each course's last slot edit; part of result cache
+    # keys, so results from before an edit are never served after it
+    course_revisions: Dict[str, int] = field(default_factory=dict)
+    built_at: float = field(default_factory=time.time)
+
+    @cached_property
+    def catalog(self) -> CourseCatalog:
+        """The /courses payload of this version, built on first request"""
+        return CourseCatalog(self.grouped, self.built_at)
+
+    @classmethod
+    def build(
+        cls,
+        grouped: Dict[str, List[Slot]],
+        index: ConflictIndex,
+        csv_hash: str,
+        version: int,
+        feasibility_cache: Optional[FeasibilityCache] = None,
+        course_revisions: Optional[Dict[str, int]] = None,
+    ) -> "Dataset":
+        """Create the scheduler, search cache and worker pool for processed data"""
+        feasibility_cache = feasibility_cache if feasibility_cache is not None else FeasibilityCache()
+        parallel_search = ParallelSearch(
+            index,
+            workers=env_number(SEARCH_WORKERS_ENV, None),
+            min_combinations=env_number(PARALLEL_THRESHOLD_ENV, ParallelSearch.DEFAULT_MIN_COMBINATIONS),
+        )
+        return cls(
+            grouped=grouped,
+            conflict_index=index,
+            feasibility_cache=feasibility_cache,
+            parallel_search=parallel_search,
+            scheduler=BacktrackingScheduler(grouped, index, feasibility_cache, parallel_search),
+            csv_hash=csv_hash,
+            version=version,
+            course_revisions=course_revisions or {},
+        )
+
+
 DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "ENROLLMENT.csv")
-grouped_courses_cache = None
-scheduler_instance = None
+# The served Dataset; replaced, never mutated, under dataset_lock
+dataset: Optional[Dataset] = None
+result_cache = configured_result_cache()
+result_sets = ResultSetStore()
+# Serializes loading and changes of the served dataset (uploads and slot edits)
+dataset_lock = threading.Lock()
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def build_dataset(csv_path: str) -> Tuple[Dict[str, List[Slot]], ConflictIndex]:
+    """Run the CSV pipeline and build the conflict index for its courses"""
+    grouped = process_enrollment_data(csv_path)
+    return grouped, ConflictIndex(grouped)
+
+
+def install_dataset(grouped: Dict[str, List[Slot]], index: ConflictIndex, csv_hash: str):
+    """
+    Serve a processed dataset, dropping results derived from the previous
+    one. The caller holds dataset_lock.
+    """
+    global dataset
+
+    previous = dataset
+    dataset = Dataset.build(grouped, index, csv_hash, previous.version + 1 if previous else 1)
+    result_cache.clear()
+    result_sets.clear()
+    if previous is not None:
+        # Its workers hold the old index; searches running on them finish first
+        previous.parallel_search.close()
+
+
+def read_data_file() -> Tuple[Dict[str, List[Slot]], ConflictIndex, str]:
+    """Process DATA_FILE, from its snapshot when the CSV is unchanged"""
+    if not os.path.exists(DATA_FILE):
+        raise FileNotFoundError(f"Data file not found: {DATA_FILE}")
+
+    with open(DATA_FILE, "rb") as f:
+        csv_hash = hashlib.sha256(f.read()).hexdigest()
+
+    # Reuse the processed data of an unchanged CSV; rebuild and re-snapshot otherwise
+    snapshot_path = DatasetSnapshot.path_for(DATA_FILE)
+    snapshot = DatasetSnapshot.load(snapshot_path, csv_hash)
+    if snapshot is not None:
+        grouped, index = snapshot
+    else:
+        grouped, index = build_dataset(DATA_FILE)
+        DatasetSnapshot.save(snapshot_path, csv_hash, grouped, index)
+    return grouped, index, csv_hash
+
+
+def _loaded_dataset() -> Dataset:
+    """Return the served dataset, loading it first if needed; the caller holds dataset_lock"""
+    if dataset is None:
+        install_dataset(*read_data_file())
+    return dataset
+
+
+def get_dataset() -> Dataset:
+    """
+    Return the served dataset.
+
+    Lock-free once loaded. Concurrent first calls wait for one load instead
+    of each parsing the CSV.
+    """
+    current = dataset
+    if current is not None:
+        return current
+    with dataset_lock:
+        return _loaded_dataset()
 
 
-def load_data():
-    """Load and cache course data"""
-    global grouped_courses_cache, scheduler_instance
+def load_data() -> Dict[str, List[Slot]]:
+    """Load and cache course data along with its slot conflict index"""
+    return get_dataset().grouped
 
-    if grouped_courses_cache is None:
-        if not os.path.exists(DATA_FILE):
-            raise FileNotFoundError(f"Data file not found: {DATA_FILE}")
 
-        grouped_courses_cache = process_enrollment_data(DATA_FILE)
-        scheduler_instance = BacktrackingScheduler(grouped_courses_cache)
+def replace_dataset(upload_path: str, csv_hash: str) -> Dict[str, List[Slot]]:
+    """
+    Validate an uploaded CSV and swap it in as the served dataset.
+
+    The current dataset stays in place (and served) unless the upload
+    parses into at least one course.
+
+    Args:
+        upload_path: Uploaded CSV, on the same filesystem as DATA_FILE
+        csv_hash: sha256 hex digest of the upload
+
+    Returns:
+        The new grouped courses
+
+    Raises:
+        ValueError: If the CSV is missing columns or has no usable rows
+    """
+    # Parsed outside the lock, so slot edits and first loads are not held up
+    grouped, index = build_dataset(upload_path)
+    if not grouped:
+        raise ValueError("CSV contains no valid course rows")
+    with dataset_lock:
+        os.replace(upload_path, DATA_FILE)
+        DatasetSnapshot.save(DatasetSnapshot.path_for(DATA_FILE), csv_hash, grouped, index)
+        install_dataset(grouped, index, csv_hash)
+    return grouped
+
+
+def apply_slot_change(course_code: str, slot_number: Optional[str], new_slot: Optional[Slot]) -> int:
+    """
+    Add, replace or delete one slot of the served dataset.
+
+    The new dataset version patches a copy of the conflict index for that
+    slot only and keeps the cached subtrees and result sets that do not
+    involve `course_code`. Edits live in memory: the CSV and its snapshot
+    are unchanged, so the next upload or restart serves the file contents
+    again.
+
+    Args:
+        course_code: Course the slot belongs to
+        slot_number: Slot to replace or delete; None to add `new_slot`
+        new_slot: Replacement or added slot; None to delete
+
+    Returns:
+        The new dataset version
 
-    return grouped_courses_cache
+    Raises:
+        LookupError: If the slot to replace or delete does not exist
+        ValueError: If `new_slot` would duplicate a slot number of the course
+    """
+    global dataset
+
+    with dataset_lock:
+        current = _loaded_dataset()
+        slots = current.grouped.get(course_code, [])
+        old_slot = None
+        if slot_number is not None:
+            old_slot = next((slot for slot in slots if slot.slot_number == slot_number), None)
+            if old_slot is None:
+                raise LookupError(f"Slot {course_code}/{slot_number} not found")
+        if new_slot is not None and any(
+            slot.slot_number == new_slot.slot_number and slot is not old_slot for slot in slots
+        ):
+            raise ValueError(f"Slot {course_code}/{new_slot.slot_number} already exists")
+
+        index = current.conflict_index.copy()
+        if old_slot is None:
+            index.add_slot(new_slot)
+            updated_slots = slots + [new_slot]
+        elif new_slot is None:
+            index.remove_slot(old_slot)
+            updated_slots = [slot for slot in slots if slot is not old_slot]
+        else:
+            index.replace_slot(old_slot, new_slot)
+            updated_slots = [new_slot if slot is old_slot else slot for slot in slots]
+
+        grouped = dict(current.grouped)
+        if updated_slots:
+            grouped[course_code] = updated_slots
+        else:
+            del grouped[course_code]
+
+        affected = {course_code}
+        version = current.version + 1
+        dataset = Dataset.build(
+            grouped, index, current.csv_hash, version,
+            feasibility_cache=current.feasibility_cache.without_courses(affected),
+            course_revisions={**current.course_revisions, course_code: version},
+        )
+        # No longer reachable under the new revision; free them now
+        result_cache.discard_courses(affected)
+        current.parallel_search.close()
+        return version
+
+
+def slot_from_model(slot: SlotModel) -> Slot:
+    """
+    Build a Slot from a request body.
+
+    Raises:
+        ValueError: If a time block has an unknown day, invalid times or
+            does not end after it starts
+    """
+    time_blocks = [TimeBlock(tb.day, tb.start_time, tb.end_time) for tb in slot.time_blocks]
+    for tb in time_blocks:
+        if tb.end <= tb.start:
+            raise ValueError(f"Time block {tb.day} {tb.start_time}-{tb.end_time} does not end after it starts")
+    return Slot(
+        course_code=slot.course_code,
+        course_name=slot.course_name,
+        faculty_name=slot.faculty_name,
+        slot_number=slot.slot_number,
+        credits=slot.credits,
+        time_blocks=time_blocks,
+    )
+
+
+def warm_up():
+    """Load the dataset (snapshot or CSV) and build its indexes ahead of the first request"""
+    start = time.perf_counter()
+    load_data()
+    print(f"✓ Warm-up complete in {time.perf_counter() - start:.2f}s")
+
+
+def get_scheduler(
+    current: Dataset,
+    course_codes: List[str],
+    slot_preferences: Dict[str, List[str]],
+) -> BacktrackingScheduler:
+    """Return a scheduler restricted to the preferred slots of each course"""
+    if not slot_preferences:
+        # No slot preferences, use scheduler with all slots
+        return current.scheduler
+
+    grouped = current.grouped
+    filtered_grouped = {}
+    for course_code in course_codes:
+        if course_code in grouped:
+            all_slots = grouped[course_code]
+
+            # If preferences exist for this course, filter to only those slots
+            if course_code in slot_preferences:
+                preferred_slot_numbers = slot_preferences[course_code]
+                filtered_slots = [
+                    slot for slot in all_slots
+                    if slot.slot_number in preferred_slot_numbers
+                ]
+
+                if filtered_slots:
+                    filtered_grouped[course_code] = filtered_slots
+                else:
+                    # If no slots match preferences, use all slots
+                    filtered_grouped[course_code] = all_slots
+            else:
+                # No preference for this course, use all slots
+                filtered_grouped[course_code] = all_slots
+
+    # Filtered slots are the same objects, so the shared index and cache apply
+    return BacktrackingScheduler(
+        filtered_grouped, current.conflict_index, current.feasibility_cache, current.parallel_search
+    )
+
+
+def result_cache_key(
+    current: Dataset,
+    course_codes: List[str],
+    slot_preferences: Dict[str, List[str]],
+    constraints: List[Constraint],
+) -> Hashable:
+    """
+    Identify a result set by dataset content, selection and constraints.
+
+    Course order, preferences for unselected courses and the order of
+    preferred slot numbers do not change the result set.
+    """
+    selected = sorted(course_codes)
+    preferences = tuple(
+        (code, tuple(sorted(set(slot_preferences[code]))))
+        for code in sorted(set(selected))
+        if slot_preferences.get(code)
+    )
+    revisions = tuple(current.course_revisions.get(code, 0) for code in selected)
+    return (
+        current.csv_hash,
+        tuple(selected),
+        revisions,
+        preferences,
+        json.dumps(describe_constraints(constraints), sort_keys=True),
+    )
+
+
+def reorder_schedule(schedule: TimeTableSchedule, course_codes: List[str]) -> TimeTableSchedule:
+    """Rebuild a schedule searched over sorted course codes in request order"""
+    if schedule.course_codes == course_codes:
+        return schedule
+    # The k-th sorted course sits at request position order[k]
+    order = sorted(range(len(course_codes)), key=course_codes.__getitem__)
+    slots = [None] * len(course_codes)
+    for k, position in enumerate(order):
+        slots[position] = schedule.slots[k]
+    return TimeTableSchedule(
+        slots=slots,
+        course_codes=list(course_codes),
+        total_credits=schedule.total_credits,
+    )
+
+
+def get_result_set(
+    scheduler: BacktrackingScheduler,
+    request: "GenerateRequest",
+    cache_key: Hashable,
+    search_constraints: SearchConstraints,
+    budget: Optional[SearchBudget] = None,
+    stats: Optional[SearchStats] = None,
+) -> ScheduleSet:
+    """
+    Return every timetable of a selection in request course order.
+
+    The search runs over sorted course codes and is cached in that form;
+    reordering the courses only permutes the packed index columns. A search
+    cut short by its budget is returned (stats.truncated set) but not
+    cached; a cached result is cut to budget.max_results.
+    """
+    stats = stats if stats is not None else SearchStats()
+    results = result_cache.get(cache_key)
+    if results is None:
+        results = scheduler.generate_timetables(
+            sorted(request.course_codes), stats, search_constraints, search_order=True, budget=budget
+        )
+        if not stats.truncated:
+            result_cache.put(cache_key, results)
+    elif budget is not None and budget.max_results is not None and len(results) > budget.max_results:
+        results = results[:budget.max_results]
+        stats.truncated, stats.stop_reason = True, "max_results"
+    return results.reorder(request.course_codes)
+
+
+def search_budget(
+    request: "GenerateRequest",
+    cancelled: Optional[threading.Event] = None,
+    max_results: bool = True,
+) -> Optional[SearchBudget]:
+    """
+    Limits for a request's search: its own, with the timeout capped by
+    SEARCH_TIMEOUT (from SEARCH_TIMEOUT_ENV), plus an optional cancellation
+    event.
+
+    Raises:
+        ValueError: If a limit is negative or the timeout not positive
+    """
+    if (request.max_results is not None and request.max_results < 0) or (
+        request.max_nodes is not None and request.max_nodes < 0
+    ):
+        raise ValueError("max_results and max_nodes must be non-negative")
+    if request.timeout_seconds is not None and request.timeout_seconds <= 0:
+        raise ValueError("timeout_seconds must be positive")
+
+    timeout = request.timeout_seconds
+    if SEARCH_TIMEOUT is not None:
+        timeout = SEARCH_TIMEOUT if timeout is None else min(timeout, SEARCH_TIMEOUT)
+    return SearchBudget.from_limits(
+        request.max_results if max_results else None, request.max_nodes, timeout, cancelled
+    )
+
+
+async def stream_until_closed(lines: Iterator[bytes], cancelled: threading.Event) -> AsyncIterator[bytes]:
+    """
+    Response body over a lazily searched iterator. The disconnect polling
+    of run_until_disconnected() ends once the response starts, so the body
+    stops the search itself when it is closed or cancelled before the end.
+    """
+    try:
+        async for line in iterate_in_threadpool(lines):
+            yield line
+    finally:
+        cancelled.set()
+
+
+async def run_until_disconnected(http_request: Request, search: Callable, *args) -> Any:
+    """
+    Run a blocking search endpoint in the threadpool.
+
+    `search` takes a trailing threading.Event; it is set when the client
+    disconnects, so the search stops at its next budget check instead of
+    holding a worker thread for a response nobody reads.
+    """
+    cancelled = threading.Event()
+    task = asyncio.ensure_future(run_in_threadpool(search, *args, cancelled))
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and await http_request.is_disconnected():
+            cancelled.set()
+            break
+    return await task
+
+
+def load_result_set(result_set_id: str) -> Tuple["GenerateRequest", ScheduleSet]:
+    """
+    Resolve a result-set id to its request and schedules.
+
+    Raises:
+        HTTPException: 404 if the id is unknown, expired, or from an older dataset
+    """
+    request = result_sets.get(result_set_id)
+    if request is None:
+        raise HTTPException(status_code=404, detail=f"Result set {result_set_id} not found or expired")
+
+    current = get_dataset()
+    constraints = parse_constraints(request.constraint_text)
+    cache_key = result_cache_key(current, request.course_codes, request.slot_preferences, constraints)
+    if ResultSetStore.id_for(cache_key) != result_set_id:
+        # A slot of one of its courses was edited since: the id names results
+        # that no longer exist, so never regenerate different ones under it
+        result_sets.discard(result_set_id)
+        raise HTTPException(status_code=404, detail=f"Result set {result_set_id} is from an older dataset")
+    scheduler = get_scheduler(current, request.course_codes, request.slot_preferences)
+    schedules = get_result_set(
+        scheduler, request, cache_key, ConstraintFilter.compile_constraints(constraints)
+    )
+    return request, schedules
+
+
+def parse_constraints(constraint_text: str) -> List[Constraint]:
+    """Detect constraints in optional natural language input"""
+    if not constraint_text.strip():
+        return []
+    return IntentDetector.detect_intent(constraint_text)
+
+
+def describe_constraints(constraints: List[Constraint]) -> List[Dict[str, Any]]:
+    """Convert constraints to serializable format"""
+    return [
+        {
+            "intent": c.intent.value,
+            "entities": c.entities,
+            "confidence": c.confidence,
+        }
+        for c in constraints
+    ]
 
 
 # ============ API Endpoints ============
@@ -134,50 +991,30 @@ def load_enrollment_data():
 
 
 @app.get("/courses", tags=["Data"], response_model=CourseListResponse)
-def get_available_courses():
+def get_available_courses(request: Request):
     """
     Get list of available courses and their slots
 
     Returns:
         - courses: List of course objects with available slots
         - count: Total number of unique courses
+
+    The payload is built once per dataset version and carries ETag and
+    Last-Modified; conditional requests for an unchanged catalog get
+    304 Not Modified, and gzip is served when accepted.
     """
     try:
-        grouped = load_data()
-        courses = []
-
-        for course_code, slots in grouped.items():
-            course_data = {
-                "course_code": course_code,
-                "course_name": slots[0].course_name if slots else "",
-                "faculty_name": slots[0].faculty_name if slots else "",
-                "credits": slots[0].credits if slots else 0,
-                "available_slots": len(slots),
-                "slots": [
-                    {
-                        "slot_number": slot.slot_number,
-                        "time_blocks": [
-                            {
-                                "day": tb.day,
-                                "start_time": tb.start_time,
-                                "end_time": tb.end_time
-                            }
-                            for tb in slot.time_blocks
-                        ],
-                    }
-                    for slot in slots
-                ],
-            }
-            courses.append(course_data)
-
-        return CourseListResponse(courses=courses, count=len(courses))
+        return get_dataset().catalog.response(request.headers)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/generate", tags=["Scheduling"], response_model=Dict[str, Any])
-def generate_timetables(request: GenerateRequest):
+def generate_timetables(
+    request: GenerateRequest,
+    cancelled: Optional[threading.Event] = None,
+    raw_json: bool = False,  # Return the /generate route's pre-serialized Response instead of a dict
+):
     """
     Generate valid (conflict-free) timetable combinations for selected courses
 
@@ -185,65 +1022,196 @@ def generate_timetables(request: GenerateRequest):
         - course_codes: List of course codes to schedule
         - optimize: Whether to rank schedules by optimization criteria
         - slot_preferences: Dict mapping course_code to list of preferred slot numbers
+        - offset: Number of timetables to skip
+        - limit: Maximum number of timetables to return (all when omitted)
+        - stream: Stream timetables as NDJSON, one per line, as they are found
+        - rank: Order timetables by optimization score, best first
+        - top_k: With rank, find only the N best timetables via branch-and-bound
+        - prefer_morning: With rank, favour timetables with early classes
+        - constraint_text: Natural language constraints, applied inside the search
+        - max_results: Stop the search after this many timetables
+        - max_nodes: Stop the search after visiting this many search nodes
+        - timeout_seconds: Stop the search after this many seconds
 
     Returns:
         - timetables: List of valid timetable combinations
-        - count: Number of valid timetables found
+        - count: Number of timetables returned
+        - has_more: Whether more timetables exist past this page
         - optimized: Whether results are ranked
+        - constraints_applied: Parsed constraints (when constraint_text is given)
+        - result_set_id: Handle for /filter and /results when the full result
+          set was computed (no limit, full ranking, or a cached selection)
+        - truncated: Whether a search limit stopped the search early; the
+          timetables are then the ones found before it stopped
+        - stop_reason: The limit that stopped it ("max_results", "max_nodes",
+          "deadline" or "cancelled")
     """
     try:
         if not request.course_codes:
             raise HTTPException(status_code=400, detail="At least one course must be selected")
-
-        grouped = load_data()
-        
-        # Filter slots based on preferences if provided
-        if request.slot_preferences:
-            filtered_grouped = {}
-            for course_code in request.course_codes:
-                if course_code in grouped:
-                    all_slots = grouped[course_code]
-                    
-                    # If preferences exist for this course, filter to only those slots
-                    if course_code in request.slot_preferences:
-                        preferred_slot_numbers = request.slot_preferences[course_code]
-                        filtered_slots = [
-                            slot for slot in all_slots 
-                            if slot.slot_number in preferred_slot_numbers
-                        ]
-                        
-                        if filtered_slots:
-                            filtered_grouped[course_code] = filtered_slots
-                        else:
-                            # If no slots match preferences, use all slots
-                            filtered_grouped[course_code] = all_slots
-                    else:
-                        # No preference for this course, use all slots
-                        filtered_grouped[course_code] = all_slots
-            
-            scheduler = BacktrackingScheduler(filtered_grouped)
+        if request.offset < 0 or (request.limit is not None and request.limit < 0):
+            raise HTTPException(status_code=400, detail="offset and limit must be non-negative")
+        if request.top_k is not None and request.top_k < 0:
+            raise HTTPException(status_code=400, detail="top_k must be non-negative")
+        if request.stream and cancelled is None:
+            # Stopped by the stream body when the client goes away mid-stream
+            cancelled = threading.Event()
+        budget = search_budget(request, cancelled)
+        stats = SearchStats()
+
+        current = get_dataset()
+        scheduler = get_scheduler(current, request.course_codes, request.slot_preferences)
+        constraints = parse_constraints(request.constraint_text)
+        search_constraints = ConstraintFilter.compile_constraints(constraints)
+
+        # Search over sorted codes so every request for the same selection
+        # sees one result order, whether served from the cache or not
+        cache_key = result_cache_key(current, request.course_codes, request.slot_preferences, constraints)
+        cached = cache_key in result_cache
+        result_set_id = None
+
+        def full_result() -> ScheduleSet:
+            nonlocal result_set_id
+            results = get_result_set(scheduler, request, cache_key, search_constraints, budget, stats)
+            if not stats.truncated:
+                result_set_id = result_sets.register(cache_key, request)
+            return results
+
+        if request.rank:
+            criteria = {"prefer_morning": request.prefer_morning}
+            if request.top_k is not None:
+                results = scheduler.top_k_timetables(
+                    request.course_codes, request.top_k, criteria, stats, search_constraints, budget
+                )
+            else:
+                # Equal scores keep the course-by-course order, as with top_k
+                results = ScheduleOptimizer.rank_schedules(full_result().sorted(), criteria)
+        elif cached or (request.limit is None and not request.stream):
+            results = full_result()
+        else:
+            # Schedules are produced lazily; only the requested page is built
+            results = (
+                reorder_schedule(schedule, request.course_codes)
+                for schedule in scheduler.iter_timetables(
+                    sorted(request.course_codes), stats, search_constraints, budget
+                )
+            )
+        stop = None if request.limit is None else request.offset + request.limit
+
+        if request.stream:
+            if isinstance(results, ScheduleSet):
+                lines = (timetable + b"\n" for timetable in results[request.offset:stop].iter_json())
+            else:
+                lines = (schedule.to_json() + b"\n" for schedule in islice(results, request.offset, stop))
+            return StreamingResponse(stream_until_closed(lines, cancelled), media_type="application/x-ndjson")
+
+        # Fetch one extra schedule to report whether another page exists
+        fetch_stop = None if stop is None else stop + 1
+        if isinstance(results, ScheduleSet):
+            # Packed results are only expanded for the returned page
+            page = results[request.offset:fetch_stop]
         else:
-            # No slot preferences, use scheduler with all slots
-            scheduler = scheduler_instance or BacktrackingScheduler(grouped)
+            page = list(islice(results, request.offset, fetch_stop))
+        has_more = stop is not None and len(page) > request.limit
+        if has_more:
+            page = page[:request.limit]
 
-        # Generate all valid timetables
-        schedules = scheduler.generate_timetables(request.course_codes)
+        result = {
+            "status": "success",
+            "count": len(page),
+            "offset": request.offset,
+            "has_more": has_more,
+            "optimized": request.rank,
+            "constraints_applied": describe_constraints(constraints),
+            "result_set_id": result_set_id,
+            "truncated": stats.truncated,
+            "stop_reason": stats.stop_reason,
+        }
+        if raw_json:
+            return timetables_response(result, page)
+        result["timetables"] = page.to_dicts() if isinstance(page, ScheduleSet) else [s.to_dict() for s in page]
+        return result
 
-        # Convert to response format
-        timetables = [schedule.to_dict() for schedule in schedules]
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def timetables_response(payload: Dict[str, Any], page: Sequence[TimeTableSchedule]) -> Response:
+    """
+    JSON response of `payload` with the page's timetables as a trailing
+    "timetables" list, spliced in from the slots' pre-serialized JSON
+    instead of being built as dicts and encoded (or validated) again.
+    """
+    timetables = page.to_json() if isinstance(page, ScheduleSet) else [s.to_json() for s in page]
+    return Response(dumps_with_list(payload, "timetables", timetables), media_type="application/json")
+
+
+@app.post("/generate", tags=["Scheduling"], description=generate_timetables.__doc__)
+async def generate_timetables_endpoint(request: GenerateRequest, http_request: Request):
+    """Run generate_timetables() off the event loop, stopping it if the client disconnects"""
+    return await run_until_disconnected(http_request, partial(generate_timetables, raw_json=True), request)
+
+
+def count_timetables(request: GenerateRequest, cancelled: Optional[threading.Event] = None):
+    """
+    Count valid timetable combinations without generating them
+
+    Request:
+        - course_codes: List of course codes to schedule
+        - slot_preferences: Dict mapping course_code to list of preferred slot numbers
+        - constraint_text: Natural language constraints the timetables must satisfy
+        - max_nodes, timeout_seconds: Search limits; a count cut short
+          by one is an error (503), as a partial count is meaningless
+
+    Returns:
+        - count: Number of valid timetables
+    """
+    try:
+        if not request.course_codes:
+            raise HTTPException(status_code=400, detail="At least one course must be selected")
+        budget = search_budget(request, cancelled, max_results=False)
+
+        current = get_dataset()
+        scheduler = get_scheduler(current, request.course_codes, request.slot_preferences)
+
+        constraints = parse_constraints(request.constraint_text)
+        search_constraints = ConstraintFilter.compile_constraints(constraints)
+
+        cached = result_cache.get(
+            result_cache_key(current, request.course_codes, request.slot_preferences, constraints)
+        )
+        if cached is not None:
+            count = len(cached)
+        else:
+            count = scheduler.count_timetables(
+                request.course_codes, constraints=search_constraints, budget=budget
+            )
 
         return {
             "status": "success",
-            "count": len(timetables),
-            "timetables": timetables,
+            "count": count,
         }
 
+    except HTTPException:
+        raise
+    except SearchInterrupted as e:
+        raise HTTPException(status_code=503, detail=f"Count stopped ({e}) before it completed")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/generate/count", tags=["Scheduling"], description=count_timetables.__doc__)
+async def count_timetables_endpoint(request: GenerateRequest, http_request: Request):
+    """Run count_timetables() off the event loop, stopping it if the client disconnects"""
+    return await run_until_disconnected(http_request, count_timetables, request)
+
+
 @app.post("/filter", tags=["NLP Filtering"], response_model=FilterResponse)
 def filter_timetables(request: FilterRequest):
     """
@@ -251,46 +1219,91 @@ def filter_timetables(request: FilterRequest):
 
     Request:
         - schedules: List of timetables to filter
+        - result_set_id: Filter a result set stored by /generate instead of schedules
         - constraint_text: Natural language constraint (e.g., "No classes on Saturday")
+        - offset: Number of matching timetables to skip
+        - limit: Maximum number of timetables to return (all when omitted)
 
     Returns:
         - filtered_timetables: Schedules matching the constraint
         - constraints_applied: Parsed constraints
-        - count: Number of filtered timetables
+        - count: Number of filtered timetables returned
+        - total: Number of matching timetables before pagination
+        - has_more: Whether more matches exist past this page
     """
     try:
-        if not request.schedules:
-            raise HTTPException(status_code=400, detail="At least one timetable must be provided")
+        if request.offset < 0 or (request.limit is not None and request.limit < 0):
+            raise HTTPException(status_code=400, detail="offset and limit must be non-negative")
 
-        if not request.constraint_text.strip():
-            return FilterResponse(
-                filtered_timetables=[s.dict() for s in request.schedules],
-                constraints_applied=[],
-                count=len(request.schedules),
-            )
+        if request.result_set_id is not None:
+            generate_request, schedules = load_result_set(request.result_set_id)
+        elif request.schedules:
+            generate_request, schedules = None, request.schedules
+        else:
+            raise HTTPException(status_code=400, detail="At least one timetable must be provided")
 
         # Detect intents from natural language
-        constraints = IntentDetector.detect_intent(request.constraint_text)
+        constraints = parse_constraints(request.constraint_text)
 
         # Filter schedules
-        filtered = ConstraintFilter.apply_constraints(request.schedules, constraints)
+        filtered = ConstraintFilter.apply_constraints(schedules, constraints)
+        stop = None if request.limit is None else request.offset + request.limit
+        page = filtered[request.offset:stop]
 
-        # Convert constraints to serializable format
-        constraints_info = [
-            {
-                "intent": c.intent.value,
-                "entities": c.entities,
-                "confidence": c.confidence,
-            }
-            for c in constraints
-        ]
+        if generate_request is not None:
+            timetables = page.to_dicts()
+        else:
+            timetables = [s.model_dump() for s in page]
 
         return FilterResponse(
-            filtered_timetables=[s.dict() for s in filtered],
-            constraints_applied=constraints_info,
-            count=len(filtered),
+            filtered_timetables=timetables,
+            constraints_applied=describe_constraints(constraints),
+            count=len(timetables),
+            total=len(filtered),
+            has_more=stop is not None and stop < len(filtered),
         )
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/results/{result_set_id}", tags=["Scheduling"])
+def get_results_page(result_set_id: str, offset: int = 0, limit: Optional[int] = None):
+    """
+    Page through a result set stored by /generate
+
+    Args:
+        result_set_id: Id returned by /generate
+        offset: Number of timetables to skip
+        limit: Maximum number of timetables to return (all when omitted)
+
+    Returns:
+        - timetables: Timetables of this page, in /generate order
+        - total: Size of the result set
+        - has_more: Whether more timetables exist past this page
+    """
+    try:
+        if offset < 0 or (limit is not None and limit < 0):
+            raise HTTPException(status_code=400, detail="offset and limit must be non-negative")
+
+        generate_request, schedules = load_result_set(result_set_id)
+        stop = None if limit is None else offset + limit
+        page = schedules[offset:stop]
+
+        return {
+            "status": "success",
+            "result_set_id": result_set_id,
+            "total": len(schedules),
+            "count": len(page),
+            "offset": offset,
+            "has_more": stop is not None and stop < len(schedules),
+            "timetables": page.to_dicts(),
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -300,40 +1313,126 @@ async def upload_csv(file: UploadFile = File(...)):
     """
     Upload a new CSV file to replace ENROLLMENT.csv
 
+    The upload is streamed to a temporary file and parsed in a worker
+    thread; the current dataset keeps being served until the new one has
+    been validated and swapped in.
+
     Args:
         file: CSV file to upload
 
     Returns:
         - status: Upload status
         - message: Success/error message
+        - file_path: Path of the replaced data file
+        - total_courses: Number of courses in the new dataset
     """
-    try:
-        global grouped_courses_cache, scheduler_instance
+    if not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
 
-        if not file.filename.endswith(".csv"):
-            raise HTTPException(status_code=400, detail="File must be a CSV")
-
-        # Save uploaded file
-        save_path = os.path.join(os.path.dirname(DATA_FILE), file.filename)
-        with open(save_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        # Invalidate cache
-        grouped_courses_cache = None
-        scheduler_instance = None
+    # Same directory as DATA_FILE, so the final rename is atomic
+    fd, upload_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(DATA_FILE)), prefix=".upload-", suffix=".csv"
+    )
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
 
-        # Reload data to validate
-        load_data()
+        grouped = await run_in_threadpool(replace_dataset, upload_path, digest.hexdigest())
 
         return {
             "status": "success",
             "message": f"CSV file '{file.filename}' uploaded and loaded",
-            "file_path": save_path,
+            "file_path": DATA_FILE,
+            "total_courses": len(grouped),
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if os.path.exists(upload_path):
+            os.unlink(upload_path)
+
+
+@app.post("/slots", tags=["Data"])
+def add_slot(slot: SlotModel):
+    """
+    Add a slot to a course (a new course if the code is unknown)
+
+    The change is applied in memory and is not written to the data file.
+
+    Returns:
+        - status: Update status
+        - dataset_version: Version of the dataset after the change
+        - slot: The added slot
+    """
+    try:
+        new_slot = slot_from_model(slot)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        version = apply_slot_change(new_slot.course_code, None, new_slot)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "success", "dataset_version": version, "slot": new_slot.to_dict()}
+
+
+@app.put("/slots/{course_code}/{slot_number}", tags=["Data"])
+def update_slot(course_code: str, slot_number: str, slot: SlotModel):
+    """
+    Replace a slot of a course (its slot number may change)
+
+    The change is applied in memory and is not written to the data file.
+
+    Returns:
+        - status: Update status
+        - dataset_version: Version of the dataset after the change
+        - slot: The updated slot
+    """
+    if slot.course_code != course_code:
+        raise HTTPException(status_code=400, detail="Body course_code does not match the URL")
+    try:
+        new_slot = slot_from_model(slot)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        version = apply_slot_change(course_code, slot_number, new_slot)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "success", "dataset_version": version, "slot": new_slot.to_dict()}
+
+
+@app.delete("/slots/{course_code}/{slot_number}", tags=["Data"])
+def delete_slot(course_code: str, slot_number: str):
+    """
+    Remove a slot; a course left without slots is removed too
+
+    The change is applied in memory and is not written to the data file.
+
+    Returns:
+        - status: Update status
+        - dataset_version: Version of the dataset after the change
+    """
+    try:
+        version = apply_slot_change(course_code, slot_number, None)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "success", "dataset_version": version}
 
 
 @app.get("/stats", tags=["Info"])
@@ -345,9 +1444,16 @@ def get_system_stats():
         - total_courses: Total unique courses in system
         - total_slots: Total course slots available
         - data_file: Path to current data file
+        - dataset_version: Counter bumped by every load, upload and slot edit
+        - feasibility_cache: Size and hit/miss/eviction counters of the search cache
+        - parallel_search: Worker count and the search size that is split across them
+        - result_cache: Size and hit/miss/eviction counters of cached /generate results
+        - result_sets: Number of live result-set handles
+        - timing_warnings: Time blocks skipped while parsing TIMINGS, by reason
     """
     try:
-        grouped = load_data()
+        current = get_dataset()
+        grouped = current.grouped
 
         total_slots = sum(len(slots) for slots in grouped.values())
 
@@ -355,6 +1461,15 @@ def get_system_stats():
             "total_courses": len(grouped),
             "total_slots": total_slots,
             "data_file": DATA_FILE,
+            "dataset_version": current.version,
+            "feasibility_cache": current.feasibility_cache.stats(),
+            "parallel_search": {
+                "workers": current.parallel_search.workers,
+                "min_combinations": current.parallel_search.min_combinations,
+            },
+            "result_cache": result_cache.stats(),
+            "result_sets": result_sets.stats(),
+            "timing_warnings": TimingsParser.warnings.to_dict(),
             "status": "operational",
         }
 
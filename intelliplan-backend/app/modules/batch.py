@@ -0,0 +1,186 @@
+"""
+Module 7: Vectorized Batch Evaluation
+Columnar (schedule x day x hour) views of result sets for NumPy scoring
+"""
+
+import re
+from typing import List, Dict, Optional, Sequence, Callable, Hashable
+import numpy as np
+
+from .data_processor import Slot, TimeBlock, OccupancyEncoder, TimingsParser
+
+
+HOURS_PER_DAY = 24
+NOON = 12
+# Start times the columnar counts agree with the scalar string comparisons on
+CLOCK_TIME_RE = re.compile(r"([01]\d|2[0-3]):[0-5]\d")
+
+
+class ScheduleBatch:
+    """
+    Columnar view of a result set.
+
+    counts[i, d, h] is the number of time blocks of schedule i that start on
+    day d during hour h, matching the int(start_time[:2]) hour used by the
+    scalar ScheduleOptimizer and ConstraintFilter code. indices[i, j] points
+    into `slots`, the distinct slots of the batch (None pads shorter rows).
+    """
+
+    def __init__(
+        self,
+        counts: np.ndarray,
+        slots: Optional[List[Optional[Slot]]] = None,
+        indices: Optional[np.ndarray] = None,
+    ):
+        self.counts = counts
+        self.slots = slots if slots is not None else []
+        self.indices = indices if indices is not None else np.zeros((len(counts), 0), dtype=np.int64)
+
+    @staticmethod
+    def slot_counts(slot: Optional[Slot]) -> np.ndarray:
+        """
+        Block counts of a single slot (None for padding) as a (days, hours) array.
+
+        Raises:
+            ValueError: If a slot-like object has a block whose day or start
+                time is not in the canonical "Monday" / "HH:MM" form
+        """
+        counts = np.zeros((len(TimingsParser.DAYS), HOURS_PER_DAY), dtype=np.uint16)
+        for tb in slot.time_blocks if slot is not None else []:
+            if isinstance(tb, TimeBlock):
+                counts[tb.day_index, tb.start // 60] += 1
+                continue
+            day_index = OccupancyEncoder.DAY_INDEX.get(tb.day)
+            if day_index is None or not CLOCK_TIME_RE.fullmatch(tb.start_time):
+                raise ValueError(f"Cannot batch time block '{tb.day} {tb.start_time}'")
+            counts[day_index, int(tb.start_time[:2])] += 1
+        return counts
+
+    @staticmethod
+    def block_key(slot: Optional[Slot]) -> Hashable:
+        """Value key for slot-like objects without shared identity (e.g. request models)"""
+        if slot is None:
+            return None
+        return tuple((tb.day, tb.start_time, tb.end_time) for tb in slot.time_blocks)
+
+    @classmethod
+    def from_schedules(cls, schedules: Sequence) -> "ScheduleBatch":
+        """
+        Build a batch from TimeTableSchedule-like objects (anything with .slots).
+
+        Each distinct slot is converted once; schedules are then summed from
+        a (schedules x courses) matrix of slot indices. Scheduler output shares
+        Slot objects and is deduplicated by identity; other slot-like objects
+        (such as API models) are deduplicated by their time blocks.
+        """
+        width = max((len(schedule.slots) for schedule in schedules), default=0)
+        flat_slots: List[Optional[Slot]] = []
+        for schedule in schedules:
+            flat_slots.extend(schedule.slots)
+            flat_slots.extend([None] * (width - len(schedule.slots)))
+
+        if all(slot is None or isinstance(slot, Slot) for slot in flat_slots[:width]):
+            ids = np.fromiter(map(id, flat_slots), dtype=np.int64, count=len(flat_slots))
+            _, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+            slots = [flat_slots[i] for i in first]
+        else:
+            positions: Dict[Hashable, int] = {}
+            slots = []
+            inverse = np.empty(len(flat_slots), dtype=np.int64)
+            for i, slot in enumerate(flat_slots):
+                key = cls.block_key(slot)
+                index = positions.get(key)
+                if index is None:
+                    index = positions[key] = len(slots)
+                    slots.append(slot)
+                inverse[i] = index
+
+        slot_arrays = np.stack(
+            [cls.slot_counts(slot) for slot in slots]
+            or [np.zeros((len(TimingsParser.DAYS), HOURS_PER_DAY), dtype=np.uint16)]
+        )
+        return cls.from_slot_indices(slot_arrays, inverse.reshape(len(schedules), width), slots)
+
+    @classmethod
+    def from_slot_indices(
+        cls,
+        slot_arrays: np.ndarray,
+        indices: np.ndarray,
+        slots: Optional[List[Optional[Slot]]] = None,
+    ) -> "ScheduleBatch":
+        """Sum per-slot count arrays selected by an index matrix"""
+        counts = np.zeros((indices.shape[0],) + slot_arrays.shape[1:], dtype=np.uint16)
+        for col in range(indices.shape[1]):
+            counts += slot_arrays[indices[:, col]]
+        return cls(counts, slots, indices)
+
+    def __len__(self) -> int:
+        return self.counts.shape[0]
+
+    def slot_mask(self, predicate: Callable[[Slot], bool]) -> np.ndarray:
+        """
+        Evaluate a slot predicate once per distinct slot.
+
+        Returns:
+            Boolean array: True where every slot of the schedule satisfies it
+        """
+        ok = np.array([slot is None or bool(predicate(slot)) for slot in self.slots], dtype=bool)
+        if not len(ok):
+            return np.ones(len(self), dtype=bool)
+        return ok[self.indices].all(axis=1)
+
+    def course_counts(self) -> np.ndarray:
+        """Number of (non-padding) slots per schedule"""
+        padding = np.array([slot is None for slot in self.slots], dtype=bool)
+        if not len(padding):
+            return np.zeros(len(self), dtype=np.int64)
+        return self.indices.shape[1] - padding[self.indices].sum(axis=1)
+
+    def has_consecutive_hours(self) -> np.ndarray:
+        """True where some day has classes starting in two adjacent hours"""
+        present = self.present
+        return (present[:, :, 1:] & present[:, :, :-1]).any(axis=(1, 2))
+
+    @property
+    def present(self) -> np.ndarray:
+        """Boolean (schedules, days, hours) occupancy"""
+        return self.counts > 0
+
+    def distinct_hours(self) -> np.ndarray:
+        """Number of distinct start hours per (schedule, day)"""
+        return np.count_nonzero(self.counts, axis=2)
+
+    def gap_hours(self, distinct: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Total gap hours per schedule.
+
+        Per day this is (last hour - first hour + 1) - distinct hours, which
+        equals the sum of (diff - 1) over consecutive distinct start hours.
+        """
+        present = self.present
+        if distinct is None:
+            distinct = self.distinct_hours()
+        first = present.argmax(axis=2)
+        last = np.where(present, np.arange(HOURS_PER_DAY, dtype=np.int8), -1).max(axis=2)
+        per_day = np.where(distinct > 0, last - first + 1 - distinct, 0)
+        return per_day.sum(axis=1)
+
+    def early_blocks(self) -> np.ndarray:
+        """Number of blocks starting before noon per schedule"""
+        return self.counts[:, :, :NOON].sum(axis=(1, 2), dtype=np.int64)
+
+    def days_with_classes(self, distinct: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of distinct days with at least one block per schedule"""
+        if distinct is None:
+            distinct = self.distinct_hours()
+        return np.count_nonzero(distinct, axis=1)
+
+    def scores(self, criteria: Dict[str, any]) -> np.ndarray:
+        """Vectorized ScheduleOptimizer.score_slots for every schedule"""
+        distinct = self.distinct_hours()
+        score = np.zeros(len(self), dtype=np.float64)
+        score += 10 - np.minimum(self.gap_hours(distinct), 10)
+        if criteria.get("prefer_morning", False):
+            score += np.minimum(self.early_blocks() * 2, 10)
+        score += np.where(self.days_with_classes(distinct) > 1, 5.0, 0.0)
+        return score
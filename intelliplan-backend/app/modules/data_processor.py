@@ -3,34 +3,152 @@ Module 1: Data Processing & Structuring
 Handles CSV import, timings parsing, and course grouping
 """
 
-import pandas as pd
+import numpy as np
 import re
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, asdict
+import sys
+from typing import TYPE_CHECKING, ClassVar, Dict, List, Optional, Sequence, Tuple
 import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .serialization import dumps
+
+if TYPE_CHECKING:
+    # Imported where needed: only the CSV ingest path pays for pandas
+    import pandas as pd
+
+
+# Minute resolution of the week-occupancy bitmask stored on each Slot.
+# Coarser buckets use fewer bits, but blocks sharing only part of a bucket
+# are then reported as overlapping.
+OCCUPANCY_GRANULARITY_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+
+# "HH:MM" for every minute of the day, plus "24:00"; TimeBlock times index it
+CLOCK_TIMES = tuple(sys.intern(f"{m // 60:02d}:{m % 60:02d}") for m in range(MINUTES_PER_DAY + 1))
+# Shared int objects, so blocks at the same minute do not each hold their own
+_MINUTES = tuple(range(MINUTES_PER_DAY + 1))
+
+
+def _intern(value):
+    """Intern strings so slots repeating a course or faculty share one object"""
+    return sys.intern(value) if type(value) is str else value
 
 
-@dataclass
 class TimeBlock:
-    """Represents a single time block (day, start_time, end_time)"""
-    day: str
-    start_time: str
-    end_time: str
+    """
+    Represents a single time block (day, start_time, end_time).
+
+    Stored as a day index and minutes since midnight; day, start_time and
+    end_time are read-only "HH:MM" views over them.
+    """
+
+    __slots__ = ("day_index", "start", "end")
+
+    def __init__(self, day: str, start_time: str, end_time: str):
+        day_index = OccupancyEncoder.DAY_INDEX.get(day)
+        if day_index is None:
+            raise ValueError(f"Unknown day '{day}' in time block")
+        self.day_index = day_index
+        self.start = _MINUTES[OccupancyEncoder.time_to_minutes(start_time)]
+        self.end = _MINUTES[OccupancyEncoder.time_to_minutes(end_time)]
+
+    @classmethod
+    def from_minutes(cls, day_index: int, start: int, end: int) -> "TimeBlock":
+        """Build a block from already validated day index and minute values"""
+        block = cls.__new__(cls)
+        block.day_index = day_index
+        block.start = _MINUTES[start]
+        block.end = _MINUTES[end]
+        return block
+
+    @property
+    def day(self) -> str:
+        return TimingsParser.DAYS[self.day_index]
+
+    @property
+    def start_time(self) -> str:
+        return CLOCK_TIMES[self.start]
+
+    @property
+    def end_time(self) -> str:
+        return CLOCK_TIMES[self.end]
 
     def to_tuple(self) -> Tuple[str, str]:
         """Convert to (day, time) tuple for conflict checking"""
         return (self.day, self.start_time)
 
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "day": TimingsParser.DAYS[self.day_index],
+            "start_time": CLOCK_TIMES[self.start],
+            "end_time": CLOCK_TIMES[self.end],
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, TimeBlock):
+            return NotImplemented
+        return (self.day_index, self.start, self.end) == (other.day_index, other.start, other.end)
+
+    def __hash__(self):
+        return hash((self.day_index, self.start, self.end))
+
+    def __repr__(self):
+        return f"TimeBlock(day={self.day!r}, start_time={self.start_time!r}, end_time={self.end_time!r})"
+
 
-@dataclass
 class Slot:
     """Represents a single course slot"""
-    course_code: str
-    course_name: str
-    faculty_name: str
-    slot_number: str
-    credits: int
-    time_blocks: List[TimeBlock]
+
+    __slots__ = (
+        "course_code", "course_name", "faculty_name", "slot_number",
+        "credits", "time_blocks", "occupancy_mask", "_json",
+    )
+
+    def __init__(
+        self,
+        course_code: str,
+        course_name: str,
+        faculty_name: str,
+        slot_number: str,
+        credits: int,
+        time_blocks: Sequence[TimeBlock],
+        occupancy_mask: Optional[int] = None,
+    ):
+        self.course_code = _intern(course_code)
+        self.course_name = _intern(course_name)
+        self.faculty_name = _intern(faculty_name)
+        self.slot_number = _intern(slot_number)
+        self.credits = credits
+        # Tuples are immutable, so slots can share the parser's block tuples
+        self.time_blocks = tuple(time_blocks)
+        if occupancy_mask is None:
+            occupancy_mask = OccupancyEncoder.encode(time_blocks)
+        self.occupancy_mask = occupancy_mask
+        self._json = None
+
+    @classmethod
+    def restore(
+        cls,
+        course_code: str,
+        course_name: str,
+        faculty_name: str,
+        slot_number: str,
+        credits: int,
+        time_blocks: Tuple[TimeBlock, ...],
+        occupancy_mask: int,
+    ) -> "Slot":
+        """Rebuild a slot from stored fields (already shared strings, a block tuple and its mask)"""
+        slot = cls.__new__(cls)
+        slot.course_code = course_code
+        slot.course_name = course_name
+        slot.faculty_name = faculty_name
+        slot.slot_number = slot_number
+        slot.credits = credits
+        slot.time_blocks = time_blocks
+        slot.occupancy_mask = occupancy_mask
+        slot._json = None
+        return slot
 
     def to_dict(self):
         return {
@@ -39,49 +157,178 @@ class Slot:
             "faculty_name": self.faculty_name,
             "slot_number": self.slot_number,
             "credits": self.credits,
-            "time_blocks": [asdict(tb) for tb in self.time_blocks],
+            "time_blocks": [tb.to_dict() for tb in self.time_blocks],
         }
 
+    def to_json(self) -> bytes:
+        """to_dict() as JSON, serialized on first use and reused by every response"""
+        fragment = self._json
+        if fragment is None:
+            fragment = self._json = dumps(self.to_dict())
+        return fragment
+
+    def _fields(self) -> Tuple:
+        # occupancy_mask is derived and excluded, as it was from comparisons
+        return (
+            self.course_code, self.course_name, self.faculty_name,
+            self.slot_number, self.credits, self.time_blocks,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Slot):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"Slot(course_code={self.course_code!r}, course_name={self.course_name!r}, "
+            f"faculty_name={self.faculty_name!r}, slot_number={self.slot_number!r}, "
+            f"credits={self.credits!r}, time_blocks={self.time_blocks!r})"
+        )
+
+
+@dataclass
+class ParseWarnings:
+    """Time blocks skipped while parsing TIMINGS, counted by reason"""
+    unknown_day: int = 0
+    invalid_time: int = 0
+    examples: List[str] = field(default_factory=list)
+
+    MAX_EXAMPLES: ClassVar[int] = 5
+
+    @property
+    def total(self) -> int:
+        return self.unknown_day + self.invalid_time
+
+    def record(self, reason: str, timing_string: str, count: int = 1):
+        """Count `count` skipped blocks for `reason` ("unknown_day" or "invalid_time")"""
+        setattr(self, reason, getattr(self, reason) + count)
+        if len(self.examples) < self.MAX_EXAMPLES and timing_string not in self.examples:
+            self.examples.append(timing_string)
+
+    def merge(self, other: "ParseWarnings"):
+        self.unknown_day += other.unknown_day
+        self.invalid_time += other.invalid_time
+        for example in other.examples:
+            if len(self.examples) < self.MAX_EXAMPLES and example not in self.examples:
+                self.examples.append(example)
+
+    def to_dict(self) -> Dict:
+        return {"unknown_day": self.unknown_day, "invalid_time": self.invalid_time, "examples": list(self.examples)}
+
 
 class TimingsParser:
     """Parse and standardize timing strings"""
 
     DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    # Pattern: "Day: HH:MM - HH:MM"
+    PATTERN = r"(?P<day>\w+):\s*(?P<start>\d{2}:\d{2})\s*-\s*(?P<end>\d{2}:\d{2})"
+    PATTERN_RE = re.compile(PATTERN)
+    # Distinct timing strings remembered by parse_timings
+    CACHE_SIZE = 4096
+
+    # Skipped blocks across the process; group_courses() adds each load's counts
+    warnings = ParseWarnings()
 
     @staticmethod
-    def parse_timings(timing_string: str) -> List[TimeBlock]:
+    def parse_timings(timing_string: str, warnings: Optional[ParseWarnings] = None) -> Tuple[TimeBlock, ...]:
         """
         Parse timing string like "Monday: 08:00 - 09:00, Tuesday: 09:00 - 10:00"
-        into a list of TimeBlock objects.
+        into a tuple of TimeBlock objects.
+
+        Identical strings are parsed once and share one tuple. Invalid blocks
+        are skipped and counted in `warnings` on every call.
 
         Args:
             timing_string: Raw timing string from CSV
+            warnings: Counters for skipped blocks (default: TimingsParser.warnings)
 
         Returns:
-            List of TimeBlock objects
+            Tuple of TimeBlock objects
         """
-        if not timing_string or pd.isna(timing_string):
-            return []
+        if not isinstance(timing_string, str) or not timing_string:
+            return ()
+
+        time_blocks, skipped = _parse_timing_string(timing_string)
+        if skipped:
+            if warnings is None:
+                warnings = TimingsParser.warnings
+            for reason in skipped:
+                warnings.record(reason, timing_string)
+        return time_blocks
 
-        time_blocks = []
-        # Pattern: "Day: HH:MM - HH:MM"
-        pattern = r"(\w+):\s*(\d{2}:\d{2})\s*-\s*(\d{2}:\d{2})"
+    @staticmethod
+    def parse_timings_column(
+        timings: "pd.Series", warnings: Optional[ParseWarnings] = None
+    ) -> List[Tuple[TimeBlock, ...]]:
+        """
+        Parse a whole TIMINGS column at once (see parse_distinct_timings).
 
-        matches = re.findall(pattern, timing_string)
-        for day, start_time, end_time in matches:
-            # Validate day
-            if day not in TimingsParser.DAYS:
-                print(f"Warning: Unknown day '{day}' in timing string: {timing_string}")
-                continue
+        Args:
+            timings: TIMINGS column (strings, NaN or empty)
+            warnings: Counters for skipped blocks (default: TimingsParser.warnings)
 
-            # Validate time format
-            if not TimingsParser._is_valid_time(start_time) or not TimingsParser._is_valid_time(end_time):
-                print(f"Warning: Invalid time format in: {timing_string}")
-                continue
+        Returns:
+            Tuple of TimeBlock objects for each row of `timings`
+        """
+        codes, parsed = TimingsParser.parse_distinct_timings(timings, warnings)
+        return [parsed[code] if code >= 0 else () for code in codes.tolist()]
 
-            time_blocks.append(TimeBlock(day=day, start_time=start_time, end_time=end_time))
+    @staticmethod
+    def parse_distinct_timings(
+        timings: "pd.Series", warnings: Optional[ParseWarnings] = None
+    ) -> Tuple[np.ndarray, List[Tuple[TimeBlock, ...]]]:
+        """
+        Parse each distinct string of a TIMINGS column once.
 
-        return time_blocks
+        The strings go through str.extractall together and their days and
+        times are validated as columns. Blocks equal those of parse_timings(),
+        and skipped blocks are counted once per row.
+
+        Args:
+            timings: TIMINGS column (strings, NaN or empty)
+            warnings: Counters for skipped blocks (default: TimingsParser.warnings)
+
+        Returns:
+            (codes, parsed): codes[i] indexes row i's blocks in `parsed`,
+            or is -1 for a missing value
+        """
+        import pandas as pd
+
+        if warnings is None:
+            warnings = TimingsParser.warnings
+        codes, uniques = pd.factorize(timings)
+        parsed: List[List[TimeBlock]] = [[] for _ in range(len(uniques))]
+
+        strings = pd.Series(uniques, dtype=object)
+        matches = strings[strings.map(lambda v: isinstance(v, str))].str.extractall(TimingsParser.PATTERN)
+        if len(matches):
+            owners = matches.index.get_level_values(0).to_numpy()
+            day_index = matches["day"].map(OccupancyEncoder.DAY_INDEX)
+            valid_day = day_index.notna().to_numpy()
+
+            times = {}
+            for column in ("start", "end"):
+                hours = matches[column].str[:2].astype(int).to_numpy()
+                minutes = matches[column].str[3:].astype(int).to_numpy()
+                times[column] = (hours * 60 + minutes, (hours <= 23) & (minutes <= 59))
+            valid = valid_day & times["start"][1] & times["end"][1]
+
+            rows_per_string = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            for i in (~valid).nonzero()[0].tolist():
+                owner = owners[i]
+                reason = "invalid_time" if valid_day[i] else "unknown_day"
+                warnings.record(reason, uniques[owner], int(rows_per_string[owner]))
+
+            day_values = day_index.to_numpy()
+            for i in valid.nonzero()[0].tolist():
+                parsed[owners[i]].append(
+                    TimeBlock.from_minutes(int(day_values[i]), int(times["start"][0][i]), int(times["end"][0][i]))
+                )
+
+        return codes, [tuple(blocks) for blocks in parsed]
 
     @staticmethod
     def _is_valid_time(time_str: str) -> bool:
@@ -96,13 +343,85 @@ class TimingsParser:
             return False
 
 
+@lru_cache(maxsize=TimingsParser.CACHE_SIZE)
+def _parse_timing_string(timing_string: str) -> Tuple[Tuple[TimeBlock, ...], Tuple[str, ...]]:
+    """Parse one timing string into (blocks, reasons of skipped blocks)"""
+    time_blocks = []
+    skipped = []
+    for day, start_time, end_time in TimingsParser.PATTERN_RE.findall(timing_string):
+        # Validate day
+        if day not in OccupancyEncoder.DAY_INDEX:
+            skipped.append("unknown_day")
+            continue
+
+        # Validate time format
+        if not TimingsParser._is_valid_time(start_time) or not TimingsParser._is_valid_time(end_time):
+            skipped.append("invalid_time")
+            continue
+
+        time_blocks.append(TimeBlock(day=day, start_time=start_time, end_time=end_time))
+    return tuple(time_blocks), tuple(skipped)
+
+
+class OccupancyEncoder:
+    """Encode time blocks as integer week-occupancy bitmasks"""
+
+    DAY_INDEX = {day: i for i, day in enumerate(TimingsParser.DAYS)}
+
+    @staticmethod
+    def time_to_minutes(time_str: str) -> int:
+        """
+        Convert HH:MM to minutes since midnight.
+
+        Raises:
+            ValueError: If the string is not a time between 00:00 and 24:00
+        """
+        hour, minute = time_str.split(":")
+        minutes = int(hour) * 60 + int(minute)
+        if not 0 <= minutes <= MINUTES_PER_DAY or not 0 <= int(minute) <= 59:
+            raise ValueError(f"Invalid time '{time_str}'")
+        return minutes
+
+    @staticmethod
+    def encode(
+        time_blocks: List[TimeBlock],
+        granularity: int = OCCUPANCY_GRANULARITY_MINUTES,
+    ) -> int:
+        """
+        Build a bitmask with one bit per `granularity` minutes of the week.
+
+        Each block sets the bits covering its [start_time, end_time) interval,
+        so two masks share a bit exactly when their intervals overlap at that
+        resolution. Blocks with an empty interval still occupy one bucket.
+
+        Args:
+            time_blocks: Blocks to encode
+            granularity: Bucket width in minutes
+
+        Returns:
+            Integer occupancy mask
+        """
+        if granularity <= 0:
+            raise ValueError(f"Granularity must be positive, got {granularity}")
+
+        buckets_per_day = -(-MINUTES_PER_DAY // granularity)
+        mask = 0
+        for tb in time_blocks:
+            start = tb.start // granularity
+            end = -(-tb.end // granularity)
+            end = max(end, start + 1)
+
+            mask |= ((1 << (end - start)) - 1) << (tb.day_index * buckets_per_day + start)
+        return mask
+
+
 class CSVDataImporter:
     """Import and validate CSV data"""
 
     REQUIRED_COLUMNS = ["COURSE_CODE", "COURSE_NAME", "FACULTY_NAME", "SLOT_NUMBER", "TIMINGS", "CREDITS"]
 
     @staticmethod
-    def load_csv(file_path: str) -> pd.DataFrame:
+    def load_csv(file_path: str) -> "pd.DataFrame":
         """
         Load CSV file with validation.
 
@@ -112,6 +431,8 @@ class CSVDataImporter:
         Returns:
             Validated Pandas DataFrame
         """
+        import pandas as pd
+
         try:
             df = pd.read_csv(file_path)
         except FileNotFoundError:
@@ -134,8 +455,10 @@ class CSVDataImporter:
         return df
 
     @staticmethod
-    def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_data(df: "pd.DataFrame") -> "pd.DataFrame":
         """Clean and standardize data"""
+        import pandas as pd
+
         # Remove duplicate rows
         initial_count = len(df)
         df = df.drop_duplicates()
@@ -157,44 +480,59 @@ class CourseGrouper:
     """Group courses and slots into structured format"""
 
     @staticmethod
-    def group_courses(df: pd.DataFrame) -> Dict[str, List[Slot]]:
+    def group_courses(
+        df: "pd.DataFrame",
+        granularity: int = OCCUPANCY_GRANULARITY_MINUTES,
+    ) -> Dict[str, List[Slot]]:
         """
         Group DataFrame into nested structure by course code.
 
         Args:
             df: Validated DataFrame
+            granularity: Minute resolution of each slot's occupancy mask
 
         Returns:
             Dict mapping course_code -> List of Slot objects
         """
-        grouped = {}
+        import pandas as pd
 
-        for _, row in df.iterrows():
-            course_code = row["COURSE_CODE"]
-            course_name = row["COURSE_NAME"]
-            faculty_name = row["FACULTY_NAME"]
-            slot_number = row["SLOT_NUMBER"]
-            credits = int(row["CREDITS"]) if pd.notna(row["CREDITS"]) else 0
-            timings = row["TIMINGS"]
-
-            # Parse timings
-            time_blocks = TimingsParser.parse_timings(timings)
-
-            # Create Slot object
-            slot = Slot(
-                course_code=course_code,
-                course_name=course_name,
-                faculty_name=faculty_name,
-                slot_number=slot_number,
-                credits=credits,
-                time_blocks=time_blocks,
+        grouped = {}
+        warnings = ParseWarnings()
+        timing_codes, timing_blocks = TimingsParser.parse_distinct_timings(df["TIMINGS"], warnings)
+        # Rows sharing a timing string share its block tuple and occupancy mask
+        timing_blocks.append(())  # code -1: missing TIMINGS
+        masks = [OccupancyEncoder.encode(blocks, granularity) for blocks in timing_blocks]
+        timing_codes = timing_codes.tolist()
+
+        course_codes = df["COURSE_CODE"].tolist()
+        # Missing names become None (JSON null), never a float NaN
+        course_names = df["COURSE_NAME"].astype(object).where(df["COURSE_NAME"].notna(), None).tolist()
+        faculty_names = df["FACULTY_NAME"].astype(object).where(df["FACULTY_NAME"].notna(), None).tolist()
+        slot_numbers = df["SLOT_NUMBER"].tolist()
+        credits = pd.to_numeric(df["CREDITS"], errors="coerce").fillna(0).astype(int).tolist()
+
+        groups = df.groupby("COURSE_CODE", sort=False).indices
+        for course_code, positions in sorted(groups.items(), key=lambda item: item[1][0]):
+            slots = []
+            for i in positions.tolist():
+                code = timing_codes[i]
+                slots.append(Slot(
+                    course_code=course_codes[i],
+                    course_name=course_names[i],
+                    faculty_name=faculty_names[i],
+                    slot_number=slot_numbers[i],
+                    credits=credits[i],
+                    time_blocks=timing_blocks[code],
+                    occupancy_mask=masks[code],
+                ))
+            grouped[course_code] = slots
+
+        if warnings.total:
+            print(
+                f"⚠ Skipped {warnings.total} time blocks ({warnings.unknown_day} unknown day, "
+                f"{warnings.invalid_time} invalid time), e.g. {warnings.examples[0]!r}"
             )
-
-            if course_code not in grouped:
-                grouped[course_code] = []
-
-            grouped[course_code].append(slot)
-
+            TimingsParser.warnings.merge(warnings)
         print(f"✓ Grouped courses into {len(grouped)} unique course codes")
         return grouped
 
@@ -4,11 +4,13 @@ Intent detection and constraint-based timetable filtering
 """
 
 import re
-from typing import List, Dict, Optional, Tuple
+import numpy as np
+from typing import List, Dict, Optional, Tuple, Callable
 from dataclasses import dataclass
 from enum import Enum
-from .scheduler import TimeTableSchedule
-from .data_processor import TimeBlock
+from .scheduler import TimeTableSchedule, ScheduleSet, SearchCheck, SearchConstraints
+from .data_processor import Slot
+from .batch import ScheduleBatch
 
 
 class ConstraintIntent(Enum):
@@ -186,9 +188,128 @@ class IntentDetector:
         return f"{hour:02d}:{minute:02d}"
 
 
+class AvoidConsecutiveCheck(SearchCheck):
+    """Search-time AVOID_CONSECUTIVE: no two class start hours one hour apart on a day"""
+
+    # One bit per (day, start hour); the spare 25th bit keeps days from touching
+    HOURS_PER_DAY_STRIDE = 25
+
+    def start(self, slot_options: List[List[Slot]]) -> int:
+        return 0
+
+    def extend(self, state: int, position: int, slot: Slot) -> Optional[int]:
+        hours = state
+        for tb in slot.time_blocks:
+            hours |= 1 << (tb.day_index * self.HOURS_PER_DAY_STRIDE + tb.start // 60)
+        if hours & (hours >> 1):
+            return None
+        return hours
+
+
+class PreferMorningCheck(SearchCheck):
+    """
+    Search-time PREFER_MORNING: at least 60% as many morning blocks as courses.
+
+    Holds per-search data, so each search needs its own instance (see
+    ConstraintFilter.compile_constraints).
+    """
+
+    MORNING_RATIO = 0.6
+
+    @staticmethod
+    def _morning_blocks(slot: Slot) -> int:
+        return sum(1 for tb in slot.time_blocks if tb.start < 12 * 60)
+
+    def start(self, slot_options: List[List[Slot]]) -> Tuple[float, int]:
+        # State: (morning blocks still needed, most the unassigned courses can add)
+        self._best = [
+            max((self._morning_blocks(slot) for slot in options), default=0)
+            for options in slot_options
+        ]
+        return len(slot_options) * self.MORNING_RATIO, sum(self._best)
+
+    def extend(self, state: Tuple[float, int], position: int, slot: Slot) -> Optional[Tuple[float, int]]:
+        needed = state[0] - self._morning_blocks(slot)
+        potential = state[1] - self._best[position]
+        if potential < needed:
+            return None
+        return needed, potential
+
+    def accept(self, state: Tuple[float, int]) -> bool:
+        return state[0] <= 0
+
+
 class ConstraintFilter:
     """Apply constraints to filter timetables"""
 
+    # Result sets at least this large are filtered as one columnar batch
+    BATCH_FILTER_THRESHOLD = 512
+
+    @staticmethod
+    def slot_predicate(constraint: Constraint) -> Optional[Callable[[Slot], bool]]:
+        """
+        Return the per-slot form of a per-block constraint.
+
+        AVOID_DAY, MIN_TIME, MAX_TIME and NO_CLASSES_BETWEEN hold for a
+        schedule exactly when they hold for each of its slots. Other intents
+        return None.
+        """
+        intent = constraint.intent
+        entities = constraint.entities
+
+        if intent == ConstraintIntent.AVOID_DAY:
+            avoid_days = set(entities.get("days", []))
+            return lambda slot: all(tb.day not in avoid_days for tb in slot.time_blocks)
+
+        if intent == ConstraintIntent.MAX_TIME and entities.get("max_time"):
+            max_time = entities["max_time"]
+            return lambda slot: all(tb.start_time <= max_time for tb in slot.time_blocks)
+
+        if intent == ConstraintIntent.MIN_TIME and entities.get("min_time"):
+            min_time = entities["min_time"]
+            return lambda slot: all(tb.start_time >= min_time for tb in slot.time_blocks)
+
+        if (
+            intent == ConstraintIntent.NO_CLASSES_BETWEEN
+            and entities.get("start_time")
+            and entities.get("end_time")
+        ):
+            start_time, end_time = entities["start_time"], entities["end_time"]
+            return lambda slot: not any(start_time <= tb.start_time <= end_time for tb in slot.time_blocks)
+
+        return None
+
+    @staticmethod
+    def compile_constraints(constraints: List[Constraint]) -> SearchConstraints:
+        """
+        Compile constraints for BacktrackingScheduler instead of post-filtering.
+
+        Per-block intents (AVOID_DAY, MIN_TIME, MAX_TIME, NO_CLASSES_BETWEEN)
+        become slot predicates that shrink each course's domain before the
+        search starts; AVOID_CONSECUTIVE and PREFER_MORNING become incremental
+        checks. The search then returns exactly the schedules
+        apply_constraints() would keep.
+
+        Args:
+            constraints: List of Constraint objects
+
+        Returns:
+            SearchConstraints to pass to the scheduler
+        """
+        compiled = SearchConstraints()
+        for constraint in constraints:
+            predicate = ConstraintFilter.slot_predicate(constraint)
+            if predicate is not None:
+                compiled.slot_predicates.append(predicate)
+
+            elif constraint.intent == ConstraintIntent.AVOID_CONSECUTIVE:
+                compiled.checks.append(AvoidConsecutiveCheck())
+
+            elif constraint.intent == ConstraintIntent.PREFER_MORNING:
+                compiled.checks.append(PreferMorningCheck())
+
+        return compiled
+
     @staticmethod
     def apply_constraints(
         schedules: List[TimeTableSchedule],
@@ -197,25 +318,71 @@ class ConstraintFilter:
         """
         Filter timetables based on extracted constraints.
 
+        Large result sets are converted to a ScheduleBatch once and every
+        constraint is evaluated as a boolean mask over it.
+
         Args:
             schedules: List of valid timetables
             constraints: List of Constraint objects
 
         Returns:
-            Filtered list of timetables matching all constraints
+            Filtered list of timetables matching all constraints; a
+            ScheduleSet for ScheduleSet input
         """
         if not constraints:
             return schedules
 
-        filtered = schedules
-        for constraint in constraints:
-            if constraint.intent == ConstraintIntent.UNKNOWN:
-                continue
+        active = [c for c in constraints if c.intent != ConstraintIntent.UNKNOWN]
+        if active and isinstance(schedules, ScheduleSet):
+            # Packed sets are evaluated from their index matrix and stay packed
+            return schedules.take(np.flatnonzero(ConstraintFilter.batch_mask(schedules.to_batch(), active)))
+
+        if active and len(schedules) >= ConstraintFilter.BATCH_FILTER_THRESHOLD:
+            try:
+                batch = ScheduleBatch.from_schedules(schedules)
+            except ValueError:
+                # Posted blocks outside the canonical form: the scalar checks
+                # compare them as given, so filter them one by one
+                batch = None
+            if batch is not None:
+                mask = ConstraintFilter.batch_mask(batch, active)
+                return [schedules[i] for i in np.flatnonzero(mask)]
 
+        filtered = schedules
+        for constraint in active:
             filtered = ConstraintFilter._apply_single_constraint(filtered, constraint)
 
         return filtered
 
+    @staticmethod
+    def batch_mask(batch: ScheduleBatch, constraints: List[Constraint]) -> np.ndarray:
+        """
+        Evaluate constraints over a columnar batch.
+
+        Returns:
+            Boolean array, True for schedules matching every constraint
+        """
+        mask = np.ones(len(batch), dtype=bool)
+        for constraint in constraints:
+            mask &= ConstraintFilter._constraint_mask(batch, constraint)
+        return mask
+
+    @staticmethod
+    def _constraint_mask(batch: ScheduleBatch, constraint: Constraint) -> np.ndarray:
+        """Vectorized _schedule_matches_constraint for one constraint"""
+        predicate = ConstraintFilter.slot_predicate(constraint)
+        if predicate is not None:
+            return batch.slot_mask(predicate)
+
+        if constraint.intent == ConstraintIntent.PREFER_MORNING:
+            # At least 60% morning, measured against the number of slots
+            return batch.early_blocks() >= batch.course_counts() * 0.6
+
+        if constraint.intent == ConstraintIntent.AVOID_CONSECUTIVE:
+            return ~batch.has_consecutive_hours()
+
+        return np.ones(len(batch), dtype=bool)
+
     @staticmethod
     def _apply_single_constraint(
         schedules: List[TimeTableSchedule],
@@ -3,10 +3,25 @@ Module 2: Core Scheduling Engine
 Handles conflict detection, backtracking scheduler, and optimization
 """
 
-from typing import List, Dict, Tuple, Set, Optional
-from dataclasses import dataclass
-from itertools import combinations, product
-from .data_processor import Slot, TimeBlock
+import heapq
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import ClassVar, List, Dict, Tuple, Set, Optional, Iterator, Hashable, Callable, Union
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import chain
+import numpy as np
+
+from .data_processor import Slot
+from .serialization import dumps
+from .batch import ScheduleBatch
 
 
 class ConflictDetector:
@@ -24,15 +39,8 @@ class ConflictDetector:
         Returns:
             True if conflict exists, False otherwise
         """
-        if not slot_a.time_blocks or not slot_b.time_blocks:
-            return False
-
-        # Get all (day, start_time) pairs for both slots
-        times_a = {(tb.day, tb.start_time) for tb in slot_a.time_blocks}
-        times_b = {(tb.day, tb.start_time) for tb in slot_b.time_blocks}
-
-        # Check for intersection
-        return bool(times_a & times_b)
+        # Masks are precomputed per slot, so overlap is a single AND
+        return bool(slot_a.occupancy_mask & slot_b.occupancy_mask)
 
     @staticmethod
     def check_conflict_in_group(slots: List[Slot]) -> Tuple[bool, Optional[Tuple[Slot, Slot]]]:
@@ -52,6 +60,170 @@ class ConflictDetector:
         return False, None
 
 
+class ConflictIndex:
+    """Precomputed slot compatibility bitsets for a whole dataset"""
+
+    def __init__(self, grouped_courses: Dict[str, List[Slot]]):
+        """
+        Assign every slot an integer id and build, per slot, the bitset of
+        slot ids it does not overlap with.
+
+        Args:
+            grouped_courses: Dict from data_processor.group_courses()
+        """
+        self.slots: List[Slot] = [slot for slots in grouped_courses.values() for slot in slots]
+        self._slot_ids: Dict[int, int] = {id(slot): i for i, slot in enumerate(self.slots)}
+        self.all_slots: int = (1 << len(self.slots)) - 1
+        self.compatible: List[int] = self._build_compatibility()
+
+    @classmethod
+    def from_compatible(cls, grouped_courses: Dict[str, List[Slot]], compatible: List[int]) -> "ConflictIndex":
+        """
+        Rebuild an index from previously computed bitsets (e.g. a snapshot).
+
+        Args:
+            grouped_courses: The dataset the bitsets were computed for
+            compatible: Compatible-slot bitset per slot, in slot id order
+        """
+        index = cls.__new__(cls)
+        index.slots = [slot for slots in grouped_courses.values() for slot in slots]
+        if len(compatible) != len(index.slots):
+            raise ValueError("Compatibility bitsets do not match the number of slots")
+        index._slot_ids = {id(slot): i for i, slot in enumerate(index.slots)}
+        index.all_slots = (1 << len(index.slots)) - 1
+        index.compatible = compatible
+        return index
+
+    def _build_compatibility(self) -> List[int]:
+        """Compute compatible-slot bitsets via per-bucket occupant sets"""
+        # Bitset of slot ids occupying each occupancy bucket
+        occupants: Dict[int, int] = {}
+        for slot_id, slot in enumerate(self.slots):
+            mask = slot.occupancy_mask
+            while mask:
+                low = mask & -mask
+                bucket = low.bit_length() - 1
+                occupants[bucket] = occupants.get(bucket, 0) | (1 << slot_id)
+                mask ^= low
+
+        # Slots sharing a mask share a compatibility set
+        by_mask: Dict[int, int] = {}
+        compatible = []
+        for slot in self.slots:
+            mask = slot.occupancy_mask
+            if mask not in by_mask:
+                conflicts = 0
+                remaining = mask
+                while remaining:
+                    low = remaining & -remaining
+                    conflicts |= occupants[low.bit_length() - 1]
+                    remaining ^= low
+                by_mask[mask] = self.all_slots & ~conflicts
+            compatible.append(by_mask[mask])
+        return compatible
+
+    def copy(self) -> "ConflictIndex":
+        """
+        Return an independent index to patch with add_slot(), remove_slot()
+        or replace_slot(); an index in use by searches must not be patched.
+        Bitsets are ints, so only the containers are copied.
+        """
+        index = ConflictIndex.__new__(ConflictIndex)
+        index.slots = list(self.slots)
+        index._slot_ids = dict(self._slot_ids)
+        index.all_slots = self.all_slots
+        index.compatible = list(self.compatible)
+        return index
+
+    def add_slot(self, slot: Slot) -> int:
+        """
+        Index one more slot without rebuilding the other bitsets' contents.
+
+        Returns:
+            The new slot's id
+        """
+        slot_id = len(self.slots)
+        self.slots.append(slot)
+        self._slot_ids[id(slot)] = slot_id
+        self.all_slots |= 1 << slot_id
+        self._update_compatibility(slot_id, slot)
+        return slot_id
+
+    def remove_slot(self, slot: Slot):
+        """
+        Drop a slot from every bitset. Its id is retired, not reused, so ids
+        of the remaining slots stay valid.
+
+        Raises:
+            ValueError: If the slot is not in the index
+        """
+        slot_id = self.slot_id(slot)
+        del self._slot_ids[id(slot)]
+        self.all_slots &= ~(1 << slot_id)
+        self._update_compatibility(slot_id, None)
+
+    def replace_slot(self, old: Slot, new: Slot) -> int:
+        """
+        Put a changed slot in place of an indexed one, keeping its id.
+
+        Raises:
+            ValueError: If `old` is not in the index
+        """
+        slot_id = self.slot_id(old)
+        del self._slot_ids[id(old)]
+        self.slots[slot_id] = new
+        self._slot_ids[id(new)] = slot_id
+        self._update_compatibility(slot_id, new)
+        return slot_id
+
+    def _update_compatibility(self, slot_id: int, slot: Optional[Slot]):
+        """
+        Recompute bit `slot_id` in every live bitset, and the slot's own
+        bitset (empty when `slot` is None). Bitsets shared between slots
+        with equal masks stay shared.
+        """
+        bit = 1 << slot_id
+        mask = slot.occupancy_mask if slot is not None else 0
+        compatible = self.compatible
+        if slot_id == len(compatible):
+            compatible.append(0)
+
+        own = 0
+        updated: Dict[Tuple[int, bool], int] = {}
+        for other_id, other in enumerate(self.slots):
+            if other_id == slot_id or not (self.all_slots >> other_id) & 1:
+                continue
+            fits = slot is not None and not (other.occupancy_mask & mask)
+            if fits:
+                own |= 1 << other_id
+            row = compatible[other_id]
+            key = (id(row), fits)
+            if key not in updated:
+                updated[key] = row | bit if fits else row & ~bit
+            compatible[other_id] = updated[key]
+
+        # As in _build_compatibility, a slot only fits with itself if it occupies no time
+        if slot is not None and not mask:
+            own |= bit
+        compatible[slot_id] = own
+
+    def slot_id(self, slot: Slot) -> int:
+        """
+        Look up the id of a slot belonging to this index.
+
+        Raises:
+            ValueError: If the slot was not part of the indexed dataset
+        """
+        slot_id = self._slot_ids.get(id(slot))
+        if slot_id is None:
+            raise ValueError(f"Slot {slot.course_code}/{slot.slot_number} is not in the conflict index")
+        return slot_id
+
+    def is_compatible(self, slot_a: Slot, slot_b: Slot) -> bool:
+        """Check whether two indexed slots can be scheduled together"""
+        return bool(self.compatible[self.slot_id(slot_a)] >> self.slot_id(slot_b) & 1)
+
+
 @dataclass
 class TimeTableSchedule:
     """Represents a valid timetable schedule"""
@@ -66,123 +238,1354 @@ class TimeTableSchedule:
             "total_credits": self.total_credits,
         }
 
+    def to_json(self) -> bytes:
+        """to_dict() as JSON, built from the slots' serialized fragments"""
+        return b"".join((
+            b'{"slots":[', b",".join([slot.to_json() for slot in self.slots]),
+            b'],"course_codes":', dumps(self.course_codes),
+            b',"total_credits":%d}' % self.total_credits,
+        ))
+
+
+class ScheduleSet(Sequence):
+    """
+    Compact result set: one shared course list plus a packed matrix of
+    per-course slot indices.
+
+    rows[i, p] is the index into slot_options[p] chosen by schedule i, stored
+    as uint16 when every course has fewer than 65536 options, so a schedule
+    costs a few bytes. Indexing materializes a TimeTableSchedule; slicing and
+    take() return ScheduleSets over the same slots. Slot dicts are built once
+    per set, when the set is first serialized.
+    """
+
+    def __init__(
+        self,
+        course_codes: List[str],
+        slot_options: List[List[Slot]],
+        rows: np.ndarray,
+        _payloads: Optional[List[List[Optional[dict]]]] = None,
+    ):
+        self.course_codes = list(course_codes)
+        self.slot_options = slot_options
+        self.rows = rows
+        self._payloads = _payloads if _payloads is not None else [[None] * len(o) for o in slot_options]
+
+    @classmethod
+    def from_choices(
+        cls,
+        course_codes: List[str],
+        slot_options: List[List[Slot]],
+        choices: Union[List[Tuple[int, ...]], np.ndarray],
+    ) -> "ScheduleSet":
+        """
+        Pack option-index tuples (or an index matrix) into a ScheduleSet.
+
+        Args:
+            course_codes: Course code of each position
+            slot_options: Slots each position's indices refer to
+            choices: One option index per position for every schedule
+        """
+        rows = np.array(choices, dtype=cls.row_dtype(slot_options)).reshape(len(choices), len(course_codes))
+        return cls(course_codes, slot_options, rows)
+
+    @classmethod
+    def from_iter(
+        cls,
+        course_codes: List[str],
+        slot_options: List[List[Slot]],
+        choices: Iterator[Tuple[int, ...]],
+    ) -> "ScheduleSet":
+        """Pack option-index tuples as a search yields them (see pack_rows)"""
+        return cls(course_codes, slot_options, cls.pack_rows(choices, len(course_codes), cls.row_dtype(slot_options)))
+
+    @staticmethod
+    def row_dtype(slot_options: List[List[Slot]]) -> type:
+        """Narrowest index type for the options of every position"""
+        largest = max((len(options) for options in slot_options), default=0)
+        return np.uint16 if largest <= np.iinfo(np.uint16).max + 1 else np.int32
+
+    @staticmethod
+    def pack_rows(choices: Iterator[Tuple[int, ...]], width: int, dtype: type) -> np.ndarray:
+        """
+        Consume option-index tuples straight into a (schedules, width) array,
+        so no tuple outlives its own iteration step.
+        """
+        if not width:
+            return np.zeros((sum(1 for _ in choices), 0), dtype=dtype)
+        return np.fromiter(chain.from_iterable(choices), dtype=dtype).reshape(-1, width)
+
+    def __len__(self) -> int:
+        return self.rows.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._derive(self.rows[index])
+        row = self.rows[index].tolist()
+        slots = [self.slot_options[position][i] for position, i in enumerate(row)]
+        return TimeTableSchedule(
+            slots=slots,
+            course_codes=list(self.course_codes),
+            total_credits=sum(slot.credits for slot in slots),
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (ScheduleSet, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def take(self, indices: Sequence) -> "ScheduleSet":
+        """Return the schedules at the given positions, in that order"""
+        return self._derive(self.rows[np.asarray(indices, dtype=np.int64)])
+
+    def reorder(self, course_codes: List[str]) -> "ScheduleSet":
+        """
+        Permute the courses into another order of the same course codes.
+
+        Raises:
+            ValueError: If course_codes is not a permutation of this set's codes
+        """
+        if list(course_codes) == self.course_codes:
+            return self
+        if sorted(course_codes) != sorted(self.course_codes):
+            raise ValueError("course_codes must be a permutation of the result set's courses")
+        # Equal codes keep their relative order on both sides
+        source = sorted(range(len(self.course_codes)), key=self.course_codes.__getitem__)
+        target = sorted(range(len(course_codes)), key=list(course_codes).__getitem__)
+        columns = [0] * len(course_codes)
+        for src, dst in zip(source, target):
+            columns[dst] = src
+        return ScheduleSet(
+            course_codes,
+            [self.slot_options[c] for c in columns],
+            self.rows[:, columns],
+            [self._payloads[c] for c in columns],
+        )
+
+    def sorted(self) -> "ScheduleSet":
+        """Return the set in plain course-by-course enumeration order"""
+        if not len(self) or not self.rows.shape[1]:
+            return self
+        # lexsort treats its last key as the primary one
+        return self.take(np.lexsort(self.rows.T[::-1]))
+
+    def total_credits(self) -> np.ndarray:
+        """Total credits of every schedule"""
+        totals = np.zeros(len(self), dtype=np.int64)
+        for position, options in enumerate(self.slot_options):
+            credits = np.array([slot.credits for slot in options], dtype=np.int64)
+            if len(credits):
+                totals += credits[self.rows[:, position]]
+        return totals
+
+    def to_dicts(self) -> List[dict]:
+        """Serialize every schedule in the TimeTableSchedule.to_dict() format"""
+        payloads = self._slot_payloads()
+        return [
+            {
+                "slots": [payloads[position][i] for position, i in enumerate(row)],
+                "course_codes": self.course_codes,
+                "total_credits": credits,
+            }
+            for row, credits in zip(self.rows.tolist(), self.total_credits().tolist())
+        ]
+
+    def to_json(self) -> List[bytes]:
+        """
+        Serialize every schedule to JSON in the to_dicts() format, splicing
+        in each slot's cached fragment (Slot.to_json()) instead of building
+        and encoding per-schedule dicts.
+        """
+        fragments = [[slot.to_json() for slot in options] for options in self.slot_options]
+        tail = b'],"course_codes":' + dumps(self.course_codes) + b',"total_credits":'
+        join = b",".join
+        return [
+            b'{"slots":[%b%b%d}' % (join([fragments[position][i] for position, i in enumerate(row)]), tail, credits)
+            for row, credits in zip(self.rows.tolist(), self.total_credits().tolist())
+        ]
+
+    def iter_json(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        """Serialize to JSON lazily, a chunk of schedules at a time"""
+        for start in range(0, len(self), chunk_size):
+            yield from self[start:start + chunk_size].to_json()
+
+    def to_batch(self) -> ScheduleBatch:
+        """Build a ScheduleBatch straight from the index matrix"""
+        slots = [slot for options in self.slot_options for slot in options]
+        offsets = np.cumsum([0] + [len(options) for options in self.slot_options[:-1]], dtype=np.int64)
+        slot_arrays = np.stack(
+            [ScheduleBatch.slot_counts(slot) for slot in slots] or [ScheduleBatch.slot_counts(None)]
+        )
+        indices = self.rows.astype(np.int64) + offsets if self.rows.shape[1] else self.rows.astype(np.int64)
+        return ScheduleBatch.from_slot_indices(slot_arrays, indices, slots)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index matrix"""
+        return self.rows.nbytes
+
+    def _slot_payloads(self) -> List[List[dict]]:
+        """Slot dicts, built on first use and shared by derived sets"""
+        for position, options in enumerate(self.slot_options):
+            payloads = self._payloads[position]
+            for i in np.unique(self.rows[:, position]).tolist():
+                if payloads[i] is None:
+                    payloads[i] = options[i].to_dict()
+        return self._payloads
+
+    def _derive(self, rows: np.ndarray) -> "ScheduleSet":
+        return ScheduleSet(self.course_codes, self.slot_options, rows, self._payloads)
+
+
+@dataclass
+class SearchStats:
+    """Counters collected during a single timetable search"""
+    nodes: int = 0
+    solutions: int = 0
+    # Set when a SearchBudget limit stopped the search early
+    truncated: bool = False
+    # Which limit: "max_results", "max_nodes", "deadline" or "cancelled"
+    stop_reason: Optional[str] = None
+
+
+class SearchInterrupted(Exception):
+    """Raised inside a search when its SearchBudget runs out"""
+
+
+@dataclass
+class SearchBudget:
+    """
+    Limits on a single search. A search that reaches one stops and returns
+    what it found so far, with SearchStats.truncated set; the schedules
+    returned are then a prefix of the full result in search order.
+    """
+    max_results: Optional[int] = None
+    max_nodes: Optional[int] = None
+    # time.monotonic() value after which the search stops
+    deadline: Optional[float] = None
+    # Set from another thread to stop the search (e.g. the client went away)
+    cancelled: Optional[threading.Event] = None
+
+    # Search nodes visited between deadline and cancellation checks
+    CHECK_INTERVAL: ClassVar[int] = 1024
+
+    @classmethod
+    def from_limits(
+        cls,
+        max_results: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional["SearchBudget"]:
+        """Build a budget with a deadline `timeout` seconds from now; None if nothing is limited"""
+        if max_results is None and max_nodes is None and timeout is None and cancelled is None:
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return cls(max_results, max_nodes, deadline, cancelled)
+
+    def stop_reason(self, nodes: int) -> Optional[str]:
+        """Return the limit that has been reached after `nodes` search nodes, or None"""
+        if self.max_nodes is not None and nodes >= self.max_nodes:
+            return "max_nodes"
+        if self.cancelled is not None and self.cancelled.is_set():
+            return "cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+    def limits(self) -> Tuple[Optional[int], Optional[int], Optional[float]]:
+        """
+        Picklable (max_results, max_nodes, seconds left) for a worker
+        process; monotonic deadlines do not carry across processes.
+        """
+        remaining = None if self.deadline is None else max(self.deadline - time.monotonic(), 0.0)
+        return self.max_results, self.max_nodes, remaining
+
+
+class SearchCheck:
+    """
+    Incremental schedule constraint evaluated while the search extends a
+    partial schedule.
+
+    Subclasses carry a hashable state from slot to slot. States become part
+    of feasibility cache keys, so two partial schedules with equal states
+    must admit the same completions.
+    """
+
+    def key(self) -> Hashable:
+        """Identify this check (and its parameters) in cache keys"""
+        return type(self).__name__
+
+    def start(self, slot_options: List[List[Slot]]) -> Hashable:
+        """Return the state of an empty schedule"""
+        return None
+
+    def extend(self, state: Hashable, position: int, slot: Slot) -> Optional[Hashable]:
+        """Return the state after adding a slot, or None to reject it"""
+        return state
+
+    def accept(self, state: Hashable) -> bool:
+        """Decide whether a complete schedule with this state is valid"""
+        return True
+
+
+@dataclass
+class SearchConstraints:
+    """Constraints applied inside the search rather than to its results"""
+    # Every slot must satisfy every predicate; failing slots leave the domain
+    slot_predicates: List[Callable[[Slot], bool]] = field(default_factory=list)
+    checks: List[SearchCheck] = field(default_factory=list)
+
+
+@dataclass
+class _SearchContext:
+    """Per-search state shared by every level of the backtracking recursion"""
+    selected_courses: List[str]
+    slot_options: List[List[Slot]]
+    slot_ids: List[List[int]]
+    domains: List[int]
+    choice: List[int]
+    stats: SearchStats
+    checks: List[SearchCheck] = field(default_factory=list)
+    subproblems: Dict[int, Tuple[Tuple[str, ...], int]] = field(default_factory=dict)
+    budget: Optional[SearchBudget] = None
+    # Node count at which the budget is checked next
+    check_at: int = sys.maxsize
+
+    def __post_init__(self):
+        if self.budget is not None:
+            self.check_at = self.stats.nodes
+
+    def check_budget(self):
+        """
+        Stop the search if its budget has run out; called by the search
+        loops once stats.nodes reaches check_at.
+
+        Raises:
+            SearchInterrupted: If a limit has been reached
+        """
+        nodes = self.stats.nodes
+        reason = self.budget.stop_reason(nodes)
+        if reason is not None:
+            self.stop(reason)
+            raise SearchInterrupted(reason)
+        self.check_at = nodes + SearchBudget.CHECK_INTERVAL
+        if self.budget.max_nodes is not None:
+            self.check_at = min(self.check_at, self.budget.max_nodes)
+
+    def stop(self, reason: str):
+        """Record that the search stopped early"""
+        self.stats.truncated = True
+        self.stats.stop_reason = reason
+
+    @cached_property
+    def max_blocks(self) -> List[int]:
+        """Most time blocks any slot of each course contributes"""
+        return [max((len(slot.time_blocks) for slot in options), default=0) for options in self.slot_options]
+
+    @cached_property
+    def max_early_blocks(self) -> List[int]:
+        """Most early time blocks any slot of each course contributes"""
+        return [
+            max((ScheduleOptimizer._count_early_blocks([slot]) for slot in options), default=0)
+            for options in self.slot_options
+        ]
+
+    @cached_property
+    def check_keys(self) -> Tuple[Hashable, ...]:
+        return tuple(check.key() for check in self.checks)
+
+    def initial_states(self) -> Tuple[Hashable, ...]:
+        return tuple(check.start(self.slot_options) for check in self.checks)
+
+    def extend_states(self, states: Tuple, position: int, slot: Slot) -> Optional[Tuple]:
+        """Advance every check by one slot; None if any check rejects it"""
+        if not self.checks:
+            return states
+        next_states = []
+        for check, state in zip(self.checks, states):
+            state = check.extend(state, position, slot)
+            if state is None:
+                return None
+            next_states.append(state)
+        return tuple(next_states)
+
+    def accept_states(self, states: Tuple) -> bool:
+        return all(check.accept(state) for check, state in zip(self.checks, states))
+
+    def cache_key(self, assigned: int, candidates: int, states: Tuple) -> Hashable:
+        """
+        Identify the subproblem left after assigning the given positions.
+
+        The remaining course codes plus the candidate slots still live in
+        their domains fully determine the subtree, so equal keys from
+        different partial assignments (or different requests) share results.
+        With search checks, their parameters and states are part of the key.
+        """
+        scope = self.subproblems.get(assigned)
+        if scope is None:
+            unassigned = [p for p in range(len(self.domains)) if not (assigned >> p) & 1]
+            codes = tuple(sorted(self.selected_courses[p] for p in unassigned))
+            union = 0
+            for p in unassigned:
+                union |= self.domains[p]
+            scope = self.subproblems[assigned] = (codes, union)
+        if self.checks:
+            return scope[0], candidates & scope[1], self.check_keys, states
+        return scope[0], candidates & scope[1]
+
+
+class FeasibilityCache:
+    """
+    Bounded, thread-safe LRU of subtree solution counts.
+
+    Keys identify a search subtree: the courses still to be assigned and the
+    slots left compatible with the occupied time. A stored count of 0 marks a
+    subtree with no valid completion, so searches can skip it.
+    """
+
+    DEFAULT_MAX_ENTRIES = 100_000
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Return the cached solution count for a subtree, or None"""
+        with self._lock:
+            count = self._entries.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Hashable, count: int):
+        """Record the solution count of a fully explored subtree"""
+        with self._lock:
+            self._entries[key] = count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries; counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def without_courses(self, course_codes: Set[str]) -> "FeasibilityCache":
+        """
+        Return a new cache holding the subtrees whose remaining courses do
+        not include any of `course_codes` (e.g. after their slots changed).
+        Those subtrees stay valid: their slots and the compatibility between
+        them are unchanged. Counters carry over; this cache is unchanged.
+        """
+        cache = FeasibilityCache(self.max_entries)
+        with self._lock:
+            cache._entries = OrderedDict(
+                (key, count) for key, count in self._entries.items() if course_codes.isdisjoint(key[0])
+            )
+            cache.hits, cache.misses, cache.evictions = self.hits, self.misses, self.evictions
+        return cache
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class BacktrackingScheduler:
     """Generate valid timetable combinations using backtracking"""
 
-    def __init__(self, grouped_courses: Dict[str, List[Slot]]):
+    def __init__(
+        self,
+        grouped_courses: Dict[str, List[Slot]],
+        conflict_index: Optional[ConflictIndex] = None,
+        feasibility_cache: Optional[FeasibilityCache] = None,
+        parallel_search: Optional["ParallelSearch"] = None,
+    ):
         """
         Initialize scheduler with grouped courses.
 
         Args:
             grouped_courses: Dict from data_processor.group_courses()
+            conflict_index: Shared index covering every slot in grouped_courses;
+                built from grouped_courses when omitted
+            feasibility_cache: Subtree cache shared by schedulers over the same
+                conflict index; a private one is created when omitted
+            parallel_search: Optional process pool used by generate_timetables()
+                for large selections; must share conflict_index
+
+        Raises:
+            ValueError: If parallel_search was built over a different index
         """
         self.grouped_courses = grouped_courses
-        self.memoization_cache: Dict[str, bool] = {}
+        self.conflict_index = conflict_index or ConflictIndex(grouped_courses)
+        self.feasibility_cache = feasibility_cache if feasibility_cache is not None else FeasibilityCache()
+        if parallel_search is not None and parallel_search.conflict_index is not self.conflict_index:
+            raise ValueError("parallel_search must use the scheduler's conflict index")
+        self.parallel_search = parallel_search
 
-    def generate_timetables(self, selected_courses: List[str]) -> List[TimeTableSchedule]:
+    def generate_timetables(
+        self,
+        selected_courses: List[str],
+        stats: Optional[SearchStats] = None,
+        constraints: Optional[SearchConstraints] = None,
+        search_order: bool = False,
+        budget: Optional[SearchBudget] = None,
+    ) -> ScheduleSet:
         """
         Generate all valid (conflict-free) timetable combinations.
 
+        Schedules are returned in the order of the plain course-by-course
+        enumeration, regardless of the order the search visits them in.
+        With a parallel_search, selections at or above its threshold are
+        split across worker processes; the result is identical.
+
+        Args:
+            selected_courses: List of course codes to schedule
+            stats: Optional SearchStats updated with search counters
+            constraints: Optional constraints every schedule must satisfy
+            search_order: Keep the order iter_timetables() yields instead
+            budget: Optional limits; when one is reached the schedules found
+                so far (the first ones in search order) are returned and
+                stats.truncated is set
+
+        Returns:
+            ScheduleSet of valid schedules (a sequence of TimeTableSchedule)
+        """
+        ctx = self._prepare(selected_courses, stats, constraints, budget)
+        if self.parallel_search is not None and self.parallel_search.should_split(ctx):
+            schedules = ScheduleSet.from_choices(
+                selected_courses, ctx.slot_options, self.parallel_search.search(ctx)
+            )
+            return schedules if search_order else schedules.sorted()
+
+        # Packed as they are found; the packed rows are sorted, not the tuples
+        schedules = ScheduleSet.from_iter(selected_courses, ctx.slot_options, self._bounded(ctx, self._start(ctx)))
+        return schedules if search_order else schedules.sorted()
+
+    def iter_timetables(
+        self,
+        selected_courses: List[str],
+        stats: Optional[SearchStats] = None,
+        constraints: Optional[SearchConstraints] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> Iterator[TimeTableSchedule]:
+        """
+        Lazily yield valid timetable combinations in search order.
+
+        Input is validated immediately; schedules are only built as the
+        caller consumes them, so islice() over the result stops the search.
+        The order is deterministic for a given dataset and selection.
+
+        Args:
+            selected_courses: List of course codes to schedule
+            stats: Optional SearchStats updated with search counters
+            constraints: Optional constraints every schedule must satisfy
+            budget: Optional limits; the iterator ends early when one is
+                reached, with stats.truncated set
+
+        Returns:
+            Iterator of valid TimeTableSchedule objects
+        """
+        slot_options, choices = self._search(selected_courses, stats, constraints, budget)
+        return (
+            self._build_schedule(selected_courses, slot_options, choice)
+            for choice in choices
+        )
+
+    def count_timetables(
+        self,
+        selected_courses: List[str],
+        stats: Optional[SearchStats] = None,
+        constraints: Optional[SearchConstraints] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> int:
+        """
+        Count valid timetable combinations without building any schedule.
+
+        Uses dynamic programming over subproblem states: partial selections
+        that leave the same live slots for the same remaining courses share
+        one memoized count, so each distinct state is solved once.
+
+        Args:
+            selected_courses: List of course codes to schedule
+            stats: Optional SearchStats updated with search counters
+            constraints: Optional constraints every schedule must satisfy
+            budget: Optional node/time limits (max_results does not apply)
+
+        Returns:
+            Number of valid timetables
+
+        Raises:
+            SearchInterrupted: If the budget ran out; a partial count is
+                not meaningful, but fully counted subtrees stay cached
+        """
+        ctx = self._prepare(selected_courses, stats, constraints, budget)
+        count = self._count(
+            ctx,
+            list(range(len(selected_courses))),
+            0,
+            self.conflict_index.all_slots,
+            ctx.initial_states(),
+        )
+        ctx.stats.solutions += count
+        return count
+
+    def _count(
+        self,
+        ctx: _SearchContext,
+        remaining: List[int],
+        assigned: int,
+        candidates: int,
+        states: Tuple,
+    ) -> int:
+        """Count completions of a partial assignment, memoized per state"""
+        ctx.stats.nodes += 1
+        if ctx.stats.nodes >= ctx.check_at:
+            ctx.check_budget()
+        if not remaining:
+            return 1 if ctx.accept_states(states) else 0
+
+        domains = ctx.domains
+        position = min(remaining, key=lambda p: (domains[p] & candidates).bit_count())
+        rest = [p for p in remaining if p != position]
+        slot_ids = ctx.slot_ids[position]
+        compatible = self.conflict_index.compatible
+
+        # Without checks the last two courses are counted from bitsets alone
+        if not ctx.checks:
+            # Last course: every compatible slot completes a schedule
+            if not rest:
+                return sum(1 for slot_id in slot_ids if (candidates >> slot_id) & 1)
+
+            # Two courses left: count compatible pairs directly
+            if len(rest) == 1:
+                other = domains[rest[0]] & candidates
+                return sum(
+                    (other & compatible[slot_id]).bit_count()
+                    for slot_id in slot_ids
+                    if (candidates >> slot_id) & 1
+                )
+
+        next_assigned = assigned | (1 << position)
+        options = ctx.slot_options[position]
+        total = 0
+        for index, slot_id in enumerate(slot_ids):
+            if not (candidates >> slot_id) & 1:
+                continue
+
+            next_candidates = candidates & compatible[slot_id]
+            if any(not domains[p] & next_candidates for p in rest):
+                continue
+
+            next_states = ctx.extend_states(states, position, options[index])
+            if next_states is None:
+                continue
+
+            if not rest:
+                total += self._count(ctx, rest, next_assigned, next_candidates, next_states)
+                continue
+
+            cache_key = ctx.cache_key(next_assigned, next_candidates, next_states)
+            count = self.feasibility_cache.get(cache_key)
+            if count is None:
+                count = self._count(ctx, rest, next_assigned, next_candidates, next_states)
+                self.feasibility_cache.put(cache_key, count)
+            total += count
+
+        return total
+
+    def top_k_timetables(
+        self,
+        selected_courses: List[str],
+        k: int,
+        criteria: Optional[Dict[str, any]] = None,
+        stats: Optional[SearchStats] = None,
+        constraints: Optional[SearchConstraints] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> ScheduleSet:
+        """
+        Find the k best-ranked timetables with branch-and-bound.
+
+        Keeps a heap of the k best complete schedules and prunes any subtree
+        whose optimistic score (ScheduleOptimizer.score_upper_bound) cannot
+        beat the current k-th best. The result equals the first k entries of
+        ScheduleOptimizer.rank_schedules(generate_timetables(...)), ties
+        included.
+
+        Args:
+            selected_courses: List of course codes to schedule
+            k: Number of timetables to return
+            criteria: Ranking preferences, as for ScheduleOptimizer.rank_schedules()
+            stats: Optional SearchStats updated with search counters
+            constraints: Optional constraints every schedule must satisfy
+            budget: Optional node/time limits; when one is reached the best
+                schedules found so far are returned and stats.truncated is set
+
+        Returns:
+            ScheduleSet of up to k schedules, best first
+        """
+        ctx = self._prepare(selected_courses, stats, constraints, budget)
+        if k <= 0:
+            return ScheduleSet.from_choices(selected_courses, ctx.slot_options, [])
+
+        # Heap entries are (score, negated choice): the root is the lowest
+        # score and, among equal scores, the latest in generation order
+        heap: List[Tuple[float, Tuple[int, ...]]] = []
+        try:
+            self._branch_and_bound(
+                ctx,
+                list(range(len(selected_courses))),
+                self.conflict_index.all_slots,
+                ctx.initial_states(),
+                [],
+                heap,
+                k,
+                criteria or {},
+            )
+        except SearchInterrupted:
+            pass
+
+        ranked = sorted(heap, key=lambda entry: (-entry[0], tuple(-i for i in entry[1])))
+        return ScheduleSet.from_choices(
+            selected_courses,
+            ctx.slot_options,
+            [tuple(-i for i in negated) for _, negated in ranked],
+        )
+
+    def _branch_and_bound(
+        self,
+        ctx: _SearchContext,
+        remaining: List[int],
+        candidates: int,
+        states: Tuple,
+        current_selection: List[Slot],
+        heap: List[Tuple[float, Tuple[int, ...]]],
+        k: int,
+        criteria: Dict[str, any],
+    ):
+        """Depth-first top-k search over the same tree as _backtrack"""
+        ctx.stats.nodes += 1
+        if ctx.stats.nodes >= ctx.check_at:
+            ctx.check_budget()
+
+        if not remaining:
+            if not ctx.accept_states(states):
+                return
+            ctx.stats.solutions += 1
+            entry = (
+                ScheduleOptimizer.score_slots(current_selection, criteria),
+                tuple(-i for i in ctx.choice),
+            )
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            return
+
+        # Prune subtrees whose best possible score cannot enter the heap
+        if len(heap) == k:
+            extra_blocks = sum(ctx.max_blocks[p] for p in remaining)
+            extra_early = sum(ctx.max_early_blocks[p] for p in remaining)
+            bound = ScheduleOptimizer.score_upper_bound(
+                current_selection, criteria, extra_blocks, extra_early
+            )
+            if bound < heap[0][0]:
+                return
+
+        domains = ctx.domains
+        position = min(remaining, key=lambda p: (domains[p] & candidates).bit_count())
+        rest = [p for p in remaining if p != position]
+
+        compatible = self.conflict_index.compatible
+        options = ctx.slot_options[position]
+        for index, slot_id in enumerate(ctx.slot_ids[position]):
+            if not (candidates >> slot_id) & 1:
+                continue
+
+            next_candidates = candidates & compatible[slot_id]
+            if any(not domains[p] & next_candidates for p in rest):
+                continue
+
+            next_states = ctx.extend_states(states, position, options[index])
+            if next_states is None:
+                continue
+
+            ctx.choice[position] = index
+            current_selection.append(options[index])
+            self._branch_and_bound(
+                ctx, rest, next_candidates, next_states, current_selection, heap, k, criteria
+            )
+            current_selection.pop()
+
+    def _search(
+        self,
+        selected_courses: List[str],
+        stats: Optional[SearchStats],
+        constraints: Optional[SearchConstraints],
+        budget: Optional[SearchBudget] = None,
+    ) -> Tuple[List[List[Slot]], Iterator[Tuple[int, ...]]]:
+        """Validate the selection and start the backtracking generator"""
+        ctx = self._prepare(selected_courses, stats, constraints, budget)
+        return ctx.slot_options, self._bounded(ctx, self._start(ctx))
+
+    @staticmethod
+    def _bounded(ctx: _SearchContext, choices: Iterator[Tuple[int, ...]]) -> Iterator[Tuple[int, ...]]:
+        """
+        Yield from a search until its budget runs out.
+
+        With max_results, one extra schedule is looked for so that
+        stats.truncated is only set when more schedules exist.
+        """
+        if ctx.budget is None:
+            return choices
+        return BacktrackingScheduler._bounded_choices(ctx, choices)
+
+    @staticmethod
+    def _bounded_choices(ctx: _SearchContext, choices: Iterator[Tuple[int, ...]]) -> Iterator[Tuple[int, ...]]:
+        limit = ctx.budget.max_results
+        found = 0
+        try:
+            for choice in choices:
+                if found == limit:
+                    ctx.stop("max_results")
+                    return
+                found += 1
+                yield choice
+        except SearchInterrupted:
+            return
+        finally:
+            choices.close()
+
+    def _start(self, ctx: _SearchContext) -> Iterator[Tuple[int, ...]]:
+        """Start the backtracking generator at the root of the search tree"""
+        return self._backtrack(
+            ctx,
+            list(range(len(ctx.selected_courses))),
+            0,
+            self.conflict_index.all_slots,
+            ctx.initial_states(),
+        )
+
+    def _search_split(
+        self,
+        selected_courses: List[str],
+        slot_ids: List[List[int]],
+        checks: List[SearchCheck],
+        leading: List[int],
+        limits: Optional[Tuple[Optional[int], Optional[int], Optional[float]]] = None,
+        cancelled=None,
+    ) -> Tuple[np.ndarray, int, int, bool]:
+        """
+        Enumerate one split of a parallel search inside a worker process.
+
         Args:
             selected_courses: List of course codes to schedule
+            slot_ids: Conflict index slot ids allowed for each course
+            checks: Search checks every schedule must pass
+            leading: Positions fixed to a single slot, in the order the
+                serial search assigned them
+            limits: Optional SearchBudget.limits() of the whole search
+            cancelled: Optional Event-like flag the parent sets to stop it
 
         Returns:
-            List of valid TimeTableSchedule objects
+            Tuple (option-index rows in search order, nodes visited,
+            solutions found, whether a limit stopped the split early)
         """
+        slots = self.conflict_index.slots
+        max_results, max_nodes, timeout = limits if limits is not None else (None, None, None)
+        budget = SearchBudget.from_limits(max_results, max_nodes, timeout, cancelled)
+        ctx = self._context(
+            selected_courses,
+            [[slots[slot_id] for slot_id in ids] for ids in slot_ids],
+            SearchStats(),
+            checks,
+            budget,
+        )
+        # Single-slot leading positions win the MRV choice ahead of the rest,
+        # which keep their order, so the serial visiting order is reproduced
+        remaining = list(leading) + [p for p in range(len(selected_courses)) if p not in leading]
+        choices = self._bounded(
+            ctx, self._backtrack(ctx, remaining, 0, self.conflict_index.all_slots, ctx.initial_states())
+        )
+        rows = ScheduleSet.pack_rows(choices, len(selected_courses), np.int32)
+        return rows, ctx.stats.nodes, ctx.stats.solutions, ctx.stats.truncated
+
+    def _prepare(
+        self,
+        selected_courses: List[str],
+        stats: Optional[SearchStats],
+        constraints: Optional[SearchConstraints] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> _SearchContext:
+        """Validate input and resolve the slot domains of each course"""
         # Validate input
         for course_code in selected_courses:
             if course_code not in self.grouped_courses:
                 raise ValueError(f"Course {course_code} not found in data")
 
-        # Get slot options for each course
-        slot_options = [self.grouped_courses[code] for code in selected_courses]
+        # Get slot options for each course, dropping slots that fail a predicate
+        predicates = constraints.slot_predicates if constraints else []
+        slot_options = [
+            [
+                slot for slot in self.grouped_courses[code]
+                if all(predicate(slot) for predicate in predicates)
+            ]
+            for code in selected_courses
+        ]
+        return self._context(
+            selected_courses,
+            slot_options,
+            stats if stats is not None else SearchStats(),
+            list(constraints.checks) if constraints else [],
+            budget,
+        )
 
-        # Generate all combinations using backtracking
-        valid_schedules = []
-        self._backtrack(selected_courses, slot_options, 0, [], valid_schedules)
+    def _context(
+        self,
+        selected_courses: List[str],
+        slot_options: List[List[Slot]],
+        stats: SearchStats,
+        checks: List[SearchCheck],
+        budget: Optional[SearchBudget] = None,
+    ) -> _SearchContext:
+        """Build the search state for resolved slot options"""
+        slot_ids = [
+            [self.conflict_index.slot_id(slot) for slot in options]
+            for options in slot_options
+        ]
+        domains = [sum(1 << slot_id for slot_id in set(ids)) for ids in slot_ids]
 
-        return valid_schedules
+        return _SearchContext(
+            selected_courses=list(selected_courses),
+            slot_options=slot_options,
+            slot_ids=slot_ids,
+            domains=domains,
+            choice=[0] * len(selected_courses),
+            stats=stats,
+            checks=checks,
+            budget=budget,
+        )
 
     def _backtrack(
         self,
-        selected_courses: List[str],
-        slot_options: List[List[Slot]],
-        course_index: int,
-        current_selection: List[Slot],
-        result: List[TimeTableSchedule],
-    ):
+        ctx: _SearchContext,
+        remaining: List[int],
+        assigned: int,
+        candidates: int,
+        states: Tuple,
+    ) -> Iterator[Tuple[int, ...]]:
         """
-        Recursive backtracking function.
+        Recursive backtracking generator with MRV ordering and forward checking.
+
+        Subtrees are memoized in the feasibility cache by the remaining
+        courses and the slots still live for them (see _SearchContext.cache_key).
+        Subtrees known to be empty are skipped.
 
         Args:
-            selected_courses: List of course codes
-            slot_options: Available slots for each course
-            course_index: Current course being processed
-            current_selection: Currently selected slots
-            result: List to collect valid schedules
+            ctx: Per-search state
+            remaining: Positions of courses not yet assigned
+            assigned: Bitmask of assigned course positions
+            candidates: Bitset of slot ids compatible with every selected slot
+            states: Current state of each search check
+
+        Yields:
+            Tuples of option indices, one per course position
         """
+        stats = ctx.stats
+        stats.nodes += 1
+        if stats.nodes >= ctx.check_at:
+            ctx.check_budget()
+
         # Base case: all courses processed
-        if course_index == len(selected_courses):
-            # Create a valid schedule
-            total_credits = sum(slot.credits for slot in current_selection)
-            schedule = TimeTableSchedule(
-                slots=current_selection.copy(),
-                course_codes=selected_courses.copy(),
-                total_credits=total_credits,
-            )
-            result.append(schedule)
+        if not remaining:
+            if ctx.accept_states(states):
+                stats.solutions += 1
+                yield tuple(ctx.choice)
             return
 
-        # Try each slot option for current course
-        current_course = selected_courses[course_index]
-        for slot in slot_options[course_index]:
+        domains = ctx.domains
+        # Most-constrained course first: fewest slots still compatible
+        position = min(remaining, key=lambda p: (domains[p] & candidates).bit_count())
+        rest = [p for p in remaining if p != position]
+        next_assigned = assigned | (1 << position)
+
+        compatible = self.conflict_index.compatible
+        options = ctx.slot_options[position]
+        for index, slot_id in enumerate(ctx.slot_ids[position]):
             # Check if this slot conflicts with any already selected
-            has_conflict = any(
-                ConflictDetector.check_conflict(slot, selected_slot)
-                for selected_slot in current_selection
-            )
+            if not (candidates >> slot_id) & 1:
+                continue
+
+            # Forward check: every remaining course must keep a slot
+            next_candidates = candidates & compatible[slot_id]
+            if any(not domains[p] & next_candidates for p in rest):
+                continue
+
+            next_states = ctx.extend_states(states, position, options[index])
+            if next_states is None:
+                continue
 
-            if not has_conflict:
-                # Prune early: check memoization
-                cache_key = self._get_cache_key(current_selection + [slot])
-                if cache_key not in self.memoization_cache:
-                    # No prior conflict found with this combination
-                    current_selection.append(slot)
-                    self._backtrack(
-                        selected_courses,
-                        slot_options,
-                        course_index + 1,
-                        current_selection,
-                        result,
-                    )
-                    current_selection.pop()
-                    self.memoization_cache[cache_key] = False
-                else:
-                    # Known valid path from cache
-                    current_selection.append(slot)
-                    self._backtrack(
-                        selected_courses,
-                        slot_options,
-                        course_index + 1,
-                        current_selection,
-                        result,
-                    )
-                    current_selection.pop()
+            ctx.choice[position] = index
+            if not rest:
+                yield from self._backtrack(ctx, rest, next_assigned, next_candidates, next_states)
+                continue
+
+            cache_key = ctx.cache_key(next_assigned, next_candidates, next_states)
+            if self.feasibility_cache.get(cache_key) == 0:
+                continue
+
+            found_before = stats.solutions
+            yield from self._backtrack(ctx, rest, next_assigned, next_candidates, next_states)
+            # Only reached when the subtree was fully enumerated
+            self.feasibility_cache.put(cache_key, stats.solutions - found_before)
 
     @staticmethod
-    def _get_cache_key(slots: List[Slot]) -> str:
-        """Generate cache key for a combination of slots"""
-        return "|".join(f"{slot.course_code}-{slot.slot_number}" for slot in slots)
+    def _build_schedule(
+        selected_courses: List[str],
+        slot_options: List[List[Slot]],
+        choice: Tuple[int, ...],
+    ) -> TimeTableSchedule:
+        """Create a schedule from one option index per course position"""
+        slots = [slot_options[position][index] for position, index in enumerate(choice)]
+        return TimeTableSchedule(
+            slots=slots,
+            course_codes=list(selected_courses),
+            total_credits=sum(slot.credits for slot in slots),
+        )
 
     def clear_cache(self):
-        """Clear memoization cache"""
-        self.memoization_cache.clear()
+        """Clear the feasibility cache"""
+        self.feasibility_cache.clear()
+
+
+class _CancelFlags:
+    """
+    Per-search cancellation flags shared with the workers of one pool.
+
+    A search takes a free flag and hands its index to its tasks; setting the
+    flag stops tasks already running in the workers. The flag is cleared and
+    reused once every task of that search has finished.
+    """
+
+    def __init__(self, context, size: int):
+        self.values = context.Array("b", size, lock=False)
+        self._free = list(range(size))
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[int]:
+        """Take a free flag; None when every flag is in use"""
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release_when_done(self, index: int, futures: List) -> None:
+        """Clear and free a flag after all of its search's tasks are done"""
+        pending = [len(futures)]
+        lock = threading.Lock()
+
+        def release():
+            self.values[index] = 0
+            with self._lock:
+                self._free.append(index)
+
+        def done(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            release()
+
+        if not futures:
+            release()
+        for future in futures:
+            future.add_done_callback(done)
+
+
+class _WorkerCancelFlag:
+    """threading.Event-like view of one shared cancellation flag in a worker"""
+
+    def __init__(self, values, index: int):
+        self.values = values
+        self.index = index
+
+    def is_set(self) -> bool:
+        return bool(self.values[self.index])
+
+
+# Per-process scheduler of a ParallelSearch worker and its pool's cancellation
+# flags, set by _init_search_worker()
+_worker_scheduler: Optional[BacktrackingScheduler] = None
+_worker_cancel_flags = None
+
+
+def _init_search_worker(slots: List[Slot], cancel_flags):
+    """Rebuild the parent's conflict index inside a worker process"""
+    global _worker_scheduler, _worker_cancel_flags
+    # A single group keeps the parent's slot id order
+    _worker_scheduler = BacktrackingScheduler({}, ConflictIndex({"": slots}))
+    _worker_cancel_flags = cancel_flags
+
+
+def _run_search_split(
+    task: Tuple[List[str], List[List[int]], List[SearchCheck], List[int], Optional[Tuple], Optional[int]],
+) -> Tuple[np.ndarray, int, int, bool]:
+    """Worker entry point for one ParallelSearch task"""
+    *split, flag = task
+    cancelled = None if flag is None else _WorkerCancelFlag(_worker_cancel_flags, flag)
+    return _worker_scheduler._search_split(*split, cancelled=cancelled)
+
+
+class ParallelSearch:
+    """
+    Process pool that splits a timetable search on its leading courses.
+
+    Every worker rebuilds the conflict index once. A task fixes the one or
+    two courses the serial search would assign first to a single slot each
+    and returns the option-index rows of that subtree; concatenating the
+    tasks in order reproduces the serial search order.
+    """
+
+    # Selections with fewer slot combinations than this stay serial
+    DEFAULT_MIN_COMBINATIONS = 200_000
+    # Split on two courses when one does not give every worker this many tasks
+    TASKS_PER_WORKER = 4
+    # Seconds between cancellation/deadline checks while waiting on a task
+    POLL_INTERVAL = 0.05
+    # Searches with a budget that can be stopped inside the workers at once;
+    # past this, running tasks stop at their own deadline or node limit
+    CANCEL_FLAGS = 64
+
+    def __init__(
+        self,
+        conflict_index: ConflictIndex,
+        workers: Optional[int] = None,
+        min_combinations: int = DEFAULT_MIN_COMBINATIONS,
+    ):
+        """
+        Args:
+            conflict_index: Index shared with the schedulers using this pool
+            workers: Number of worker processes; defaults to the CPU count.
+                0 or 1 keeps every search serial and never starts the pool
+            min_combinations: Smallest search space (product of slot counts)
+                that is split across workers
+        """
+        self.conflict_index = conflict_index
+        self.workers = max(workers, 1) if workers is not None else os.cpu_count() or 1
+        self.min_combinations = min_combinations
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cancel_flags: Optional[_CancelFlags] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def should_split(self, ctx: _SearchContext) -> bool:
+        """Decide whether a prepared search is large enough to parallelize"""
+        if self._closed or self.workers < 2 or len(ctx.slot_options) < 2:
+            return False
+        combinations = 1
+        for options in ctx.slot_options:
+            combinations *= len(options)
+        return combinations >= self.min_combinations
+
+    def search(self, ctx: _SearchContext) -> np.ndarray:
+        """
+        Enumerate every valid schedule of a prepared search across the pool.
+
+        With a budget, each task gets the search's limits. Tasks are
+        collected in order and collection stops at the first one cut short
+        (or once the limits are reached across tasks), so a truncated result
+        is still a prefix of the serial search order. Cancellation and the
+        deadline are polled while waiting. When the search stops early, tasks
+        not yet started are dropped and running ones are told to stop through
+        a shared flag, so they free their workers within a budget check.
+
+        Args:
+            ctx: Search state from BacktrackingScheduler._prepare()
+
+        Returns:
+            Array of option-index rows, one per schedule, in the order
+            BacktrackingScheduler.iter_timetables() yields them
+        """
+        positions, prefixes = self._split(ctx)
+        budget = ctx.budget
+        limits = None
+        if budget is not None:
+            # One extra result per task tells whether more exist
+            max_results, max_nodes, timeout = budget.limits()
+            limits = (None if max_results is None else max_results + 1, max_nodes, timeout)
+        executor, cancel_flags = self._get_executor()
+        flag = cancel_flags.acquire() if budget is not None else None
+        tasks = []
+        for prefix in prefixes:
+            slot_ids = list(ctx.slot_ids)
+            for position, index in zip(positions, prefix):
+                slot_ids[position] = [ctx.slot_ids[position][index]]
+            tasks.append((ctx.selected_courses, slot_ids, ctx.checks, positions, limits, flag))
+
+        rows = []
+        found = 0
+        futures = []
+        try:
+            for task in tasks:
+                futures.append(executor.submit(_run_search_split, task))
+            for prefix, future in zip(prefixes, futures):
+                choices, nodes, solutions, truncated = self._result(future, ctx)
+                # Fixed courses had a single option; restore their real index
+                choices[:, positions] = prefix
+                rows.append(choices)
+                found += len(choices)
+                ctx.stats.nodes += nodes
+                ctx.stats.solutions += solutions
+                if budget is None:
+                    continue
+                if budget.max_results is not None and found > budget.max_results:
+                    ctx.stop("max_results")
+                    break
+                if truncated:
+                    ctx.stop(budget.stop_reason(ctx.stats.nodes) or "deadline")
+                    break
+                reason = budget.stop_reason(ctx.stats.nodes)
+                if reason is not None and future is not futures[-1]:
+                    ctx.stop(reason)
+                    break
+        except SearchInterrupted:
+            pass
+        except BrokenProcessPool:
+            # Start a fresh pool on the next search
+            self.shutdown()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+            if flag is not None:
+                # Stop tasks still running, then clear the flag for reuse
+                # once the last of them is done
+                cancel_flags.values[flag] = 1
+                cancel_flags.release_when_done(flag, futures)
+            if self._closed:
+                # Closed while this search was starting; stop the pool it started
+                self.close()
+
+        if not rows:
+            return np.empty((0, len(ctx.selected_courses)), dtype=np.int32)
+        rows = np.concatenate(rows)
+        if budget is not None and budget.max_results is not None:
+            rows = rows[:budget.max_results]
+        return rows
+
+    def _result(self, future, ctx: _SearchContext) -> Tuple[np.ndarray, int, int, bool]:
+        """
+        Wait for a task, polling the search budget.
+
+        Raises:
+            SearchInterrupted: If the search was cancelled or passed its deadline
+        """
+        budget = ctx.budget
+        if budget is None or (budget.cancelled is None and budget.deadline is None):
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=self.POLL_INTERVAL)
+            except FutureTimeoutError:
+                reason = budget.stop_reason(ctx.stats.nodes)
+                if reason is not None:
+                    ctx.stop(reason)
+                    raise SearchInterrupted(reason)
+
+    def _split(self, ctx: _SearchContext) -> Tuple[List[int], List[Tuple[int, ...]]]:
+        """
+        Choose the courses and slots each task fixes.
+
+        Follows the serial search's first one or two MRV choices, so the
+        tasks in order cover its subtrees in the order it visits them.
+        """
+        domains = ctx.domains
+        compatible = self.conflict_index.compatible
+        remaining = list(range(len(domains)))
+        first = min(remaining, key=lambda p: domains[p].bit_count())
+        prefixes = [(i,) for i in range(len(ctx.slot_ids[first]))]
+        if len(prefixes) >= self.workers * self.TASKS_PER_WORKER or len(remaining) < 3:
+            return [first], prefixes
+
+        # The serial search picks the second course after each first slot
+        rest = [p for p in remaining if p != first]
+        pairs = []
+        for i, first_id in enumerate(ctx.slot_ids[first]):
+            candidates = self.conflict_index.all_slots & compatible[first_id]
+            if any(not domains[p] & candidates for p in rest):
+                continue
+            second = min(rest, key=lambda p: (domains[p] & candidates).bit_count())
+            pairs.extend(
+                (i, second, j)
+                for j, slot_id in enumerate(ctx.slot_ids[second])
+                if (candidates >> slot_id) & 1
+            )
+
+        # Tasks share one position list, so every first slot must lead to
+        # the same second course
+        seconds = {second for _, second, _ in pairs}
+        if len(seconds) != 1:
+            return [first], prefixes
+        return [first, seconds.pop()], [(i, j) for i, _, j in pairs]
+
+    def _get_executor(self) -> Tuple[ProcessPoolExecutor, _CancelFlags]:
+        """Start the worker pool (and its cancellation flags) on first use"""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers are safe to start from a threaded server
+                context = multiprocessing.get_context("spawn")
+                self._cancel_flags = _CancelFlags(context, self.CANCEL_FLAGS)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_search_worker,
+                    initargs=(self.conflict_index.slots, self._cancel_flags.values),
+                )
+            return self._executor, self._cancel_flags
+
+    def shutdown(self):
+        """Stop the worker processes; the pool restarts on the next search"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """
+        Retire the pool (e.g. its index was superseded): searches already
+        running on it finish, later ones on this instance run serially.
+        """
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
 
 
 class ScheduleOptimizer:
     """Optimize and rank generated schedules"""
 
+    # Result sets at least this large are scored with NumPy in one batch
+    BATCH_SCORING_THRESHOLD = 512
+
     @staticmethod
     def rank_schedules(
         schedules: List[TimeTableSchedule],
@@ -196,49 +1599,106 @@ class ScheduleOptimizer:
             criteria: Dict with ranking preferences (e.g., {"prefer_morning": True, "max_gaps": 2})
 
         Returns:
-            Sorted list of schedules by score (highest first)
+            Sorted list of schedules by score (highest first); a ScheduleSet
+            for ScheduleSet input
         """
         if not criteria:
             criteria = {}
 
-        def score_schedule(schedule: TimeTableSchedule) -> float:
-            score = 0.0
+        if isinstance(schedules, ScheduleSet):
+            # Packed sets are scored from their index matrix and stay packed
+            order = np.argsort(-schedules.to_batch().scores(criteria), kind="stable")
+            return schedules.take(order)
 
-            # Score 1: Fewer gaps between classes
-            gaps = ScheduleOptimizer._calculate_gaps(schedule.slots)
-            score += (10 - min(gaps, 10))  # Max 10 points
+        if len(schedules) >= ScheduleOptimizer.BATCH_SCORING_THRESHOLD:
+            try:
+                scores = ScheduleBatch.from_schedules(schedules).scores(criteria)
+            except ValueError:
+                scores = None  # Non-canonical slot-like blocks: score them one by one
+            if scores is not None:
+                # Stable argsort on negated scores keeps ties in input order, like sorted()
+                order = np.argsort(-scores, kind="stable")
+                return [schedules[i] for i in order]
 
-            # Score 2: Classes concentrated (prefer morning/early)
-            if criteria.get("prefer_morning", False):
-                early_score = ScheduleOptimizer._score_early_classes(schedule.slots)
-                score += early_score  # Max 10 points
+        # Sort by score in descending order
+        ranked = sorted(
+            schedules,
+            key=lambda schedule: ScheduleOptimizer.score_slots(schedule.slots, criteria),
+            reverse=True,
+        )
+        return ranked
 
-            # Score 3: Balanced days (fewer classes per day)
-            day_balance = ScheduleOptimizer._score_day_distribution(schedule.slots)
-            score += day_balance  # Max 10 points
+    @staticmethod
+    def score_slots(slots: List[Slot], criteria: Dict[str, any]) -> float:
+        """Score one schedule's slots (higher is better)"""
+        score = 0.0
 
-            return score
+        # Score 1: Fewer gaps between classes
+        gaps = ScheduleOptimizer._calculate_gaps(slots)
+        score += (10 - min(gaps, 10))  # Max 10 points
 
-        # Sort by score in descending order
-        ranked = sorted(schedules, key=score_schedule, reverse=True)
-        return ranked
+        # Score 2: Classes concentrated (prefer morning/early)
+        if criteria.get("prefer_morning", False):
+            early_score = ScheduleOptimizer._score_early_classes(slots)
+            score += early_score  # Max 10 points
+
+        # Score 3: Balanced days (fewer classes per day)
+        day_balance = ScheduleOptimizer._score_day_distribution(slots)
+        score += day_balance  # Max 10 points
+
+        return score
+
+    @staticmethod
+    def score_upper_bound(
+        slots: List[Slot],
+        criteria: Dict[str, any],
+        extra_blocks: int,
+        extra_early: int,
+    ) -> float:
+        """
+        Optimistic score for any completion of a partial schedule.
+
+        Each added time block can close at most one gap hour and add at most
+        one early class, so the bound assumes the remaining courses contribute
+        `extra_blocks` blocks of which `extra_early` start before noon.
+
+        Args:
+            slots: Slots selected so far
+            criteria: Ranking preferences, as for rank_schedules()
+            extra_blocks: Maximum number of blocks the remaining courses can add
+            extra_early: Maximum number of early blocks they can add
+
+        Returns:
+            Score no completion of `slots` can exceed
+        """
+        if not extra_blocks:
+            return ScheduleOptimizer.score_slots(slots, criteria)
+
+        gaps = max(ScheduleOptimizer._calculate_gaps(slots) - extra_blocks, 0)
+        score = 10 - min(gaps, 10)
+
+        if criteria.get("prefer_morning", False):
+            early = ScheduleOptimizer._count_early_blocks(slots) + extra_early
+            score += min(early * 2, 10)
+
+        # Any remaining block may land on a new day
+        score += 5.0
+        return score
 
     @staticmethod
     def _calculate_gaps(slots: List[Slot]) -> int:
         """Calculate total gap hours between classes"""
         # Simplified: count gaps within each day
-        day_times: Dict[str, List[str]] = {}
+        day_times: Dict[int, Set[int]] = {}
         for slot in slots:
             for tb in slot.time_blocks:
-                if tb.day not in day_times:
-                    day_times[tb.day] = []
-                day_times[tb.day].append(tb.start_time)
+                day_times.setdefault(tb.day_index, set()).add(tb.start)
 
         total_gaps = 0
-        for day, times in day_times.items():
-            sorted_times = sorted(set(times))
+        for times in day_times.values():
+            sorted_times = sorted(times)
             for i in range(len(sorted_times) - 1):
-                gap = int(sorted_times[i + 1][:2]) - int(sorted_times[i][:2])
+                gap = sorted_times[i + 1] // 60 - sorted_times[i] // 60
                 if gap > 1:
                     total_gaps += gap - 1
         return total_gaps
@@ -246,22 +1706,26 @@ class ScheduleOptimizer:
     @staticmethod
     def _score_early_classes(slots: List[Slot]) -> float:
         """Score classes occurring earlier in the day"""
+        early_count = ScheduleOptimizer._count_early_blocks(slots)
+        return min(early_count * 2, 10)
+
+    @staticmethod
+    def _count_early_blocks(slots: List[Slot]) -> int:
+        """Count time blocks starting before noon"""
         early_count = 0
         for slot in slots:
             for tb in slot.time_blocks:
-                hour = int(tb.start_time[:2])
-                if hour < 12:  # Before noon
+                if tb.start < 12 * 60:  # Before noon
                     early_count += 1
-
-        return min(early_count * 2, 10)
+        return early_count
 
     @staticmethod
     def _score_day_distribution(slots: List[Slot]) -> float:
         """Score balanced distribution across days"""
-        day_counts: Dict[str, int] = {}
+        day_counts: Dict[int, int] = {}
         for slot in slots:
             for tb in slot.time_blocks:
-                day_counts[tb.day] = day_counts.get(tb.day, 0) + 1
+                day_counts[tb.day_index] = day_counts.get(tb.day_index, 0) + 1
 
         # Prefer balanced distribution (not all classes on 2 days)
         if len(day_counts) > 1:
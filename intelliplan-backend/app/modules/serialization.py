@@ -0,0 +1,45 @@
+"""
+Module 9: JSON Serialization
+Compact JSON encoding for API responses, using orjson when it is installed
+and the standard library otherwise. orjson is an optional speed-up, not a
+requirement: both encoders produce the same documents.
+"""
+
+import json
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON.
+
+    Both encoders produce the same document for the str/int/float/bool/None
+    dicts and lists the API returns, which never hold NaN or infinity
+    (orjson would write null, the json module the invalid token NaN).
+
+    Raises:
+        ValueError: From the json fallback, for a NaN or infinite float
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def dumps_with_list(obj: dict, key: str, items: List[bytes]) -> bytes:
+    """
+    Serialize a dict with one extra trailing key whose value is a list of
+    already serialized JSON values, spliced in without decoding them.
+
+    Args:
+        obj: JSON-serializable dict without `key`
+        key: Name of the spliced list
+        items: Serialized JSON values of the list
+    """
+    head = dumps(obj)[:-1]
+    separator = b"," if obj else b""
+    return b"".join((head, separator, dumps(key), b":[", b",".join(items), b"]}"))
@@ -0,0 +1,279 @@
+"""
+Module 8: Dataset Snapshots
+Versioned binary snapshot of processed course data and its conflict index,
+stored next to the CSV and keyed by the CSV's content hash
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .data_processor import OCCUPANCY_GRANULARITY_MINUTES, OccupancyEncoder, Slot, TimeBlock
+from .scheduler import ConflictIndex
+
+
+class DatasetSnapshot:
+    """
+    Read and write dataset snapshots.
+
+    Layout: MAGIC, a little-endian u64 header length, a JSON header, then
+    raw arrays (each aligned to ALIGNMENT bytes) that are read straight
+    from a memory map:
+
+    - slot_fields: (slots, 4) indices into header["values"] for course
+      code, course name, faculty name and slot number
+    - slot_credits, slot_timing: credits and distinct-timing index per slot
+    - timing_offsets, block_day, block_start, block_end: the time blocks of
+      each distinct timing, blocks[timing_offsets[t]:timing_offsets[t + 1]]
+    - timing_row, compatible: per distinct timing, its row of compatible
+      slot bits (little-endian) in the conflict index
+
+    Any change to the layout must bump VERSION; snapshots with another
+    version, CSV hash or occupancy granularity are ignored.
+    """
+
+    MAGIC = b"IPSNAP\0\0"
+    # 2: missing course and faculty names are stored as null, not NaN
+    VERSION = 2
+    ALIGNMENT = 64
+    SUFFIX = ".snapshot"
+
+    @staticmethod
+    def path_for(csv_path: str) -> str:
+        """Snapshot path next to a CSV (ENROLLMENT.csv -> ENROLLMENT.snapshot)"""
+        return os.path.splitext(csv_path)[0] + DatasetSnapshot.SUFFIX
+
+    @staticmethod
+    def save(
+        path: str,
+        csv_hash: str,
+        grouped: Dict[str, List[Slot]],
+        conflict_index: ConflictIndex,
+    ) -> bool:
+        """
+        Write a snapshot atomically (temp file + rename).
+
+        Args:
+            path: Snapshot file path
+            csv_hash: sha256 hex digest of the CSV the data came from
+            grouped: Dict from CourseGrouper.group_courses()
+            conflict_index: ConflictIndex built over `grouped`
+
+        Returns:
+            True if written; False if the data cannot be represented or the
+            file cannot be written (the caller keeps working from the CSV)
+        """
+        try:
+            header, arrays = DatasetSnapshot._encode(csv_hash, grouped, conflict_index)
+        except (TypeError, ValueError) as e:
+            print(f"⚠ Snapshot not written: {e}")
+            return False
+
+        offset = 0
+        layout = {}
+        for name, array in arrays.items():
+            offset = -(-offset // DatasetSnapshot.ALIGNMENT) * DatasetSnapshot.ALIGNMENT
+            layout[name] = [array.dtype.str, list(array.shape), offset]
+            offset += array.nbytes
+        header["arrays"] = layout
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = len(DatasetSnapshot.MAGIC) + 8 + len(header_bytes)
+        data_start = -(-data_start // DatasetSnapshot.ALIGNMENT) * DatasetSnapshot.ALIGNMENT
+
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(DatasetSnapshot.MAGIC)
+                    f.write(struct.pack("<Q", len(header_bytes)))
+                    f.write(header_bytes)
+                    for name, array in arrays.items():
+                        f.seek(data_start + layout[name][2])
+                        f.write(np.ascontiguousarray(array).tobytes())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"⚠ Snapshot not written: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def load(path: str, csv_hash: str) -> Optional[Tuple[Dict[str, List[Slot]], ConflictIndex]]:
+        """
+        Load a snapshot written for the CSV with hash `csv_hash`.
+
+        Args:
+            path: Snapshot file path
+            csv_hash: sha256 hex digest of the current CSV
+
+        Returns:
+            (grouped courses, conflict index), or None if the snapshot is
+            missing, stale, from another format version or unreadable
+        """
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"⚠ Ignoring unreadable snapshot {path}: {e}")
+            return None
+
+        try:
+            return DatasetSnapshot._decode(buffer, csv_hash)
+        except (ValueError, KeyError, IndexError, TypeError, struct.error) as e:
+            print(f"⚠ Ignoring unreadable snapshot {path}: {e}")
+            return None
+        finally:
+            try:
+                buffer.close()
+            except BufferError:
+                pass  # Array views still referenced (e.g. by a traceback); freed with them
+
+    @staticmethod
+    def _encode(
+        csv_hash: str,
+        grouped: Dict[str, List[Slot]],
+        conflict_index: ConflictIndex,
+    ) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        slots = conflict_index.slots
+        if len(slots) != sum(len(options) for options in grouped.values()):
+            raise ValueError("conflict index does not cover the grouped courses")
+
+        values: List = []
+        value_ids: Dict = {}
+
+        def value_id(value) -> int:
+            if value is not None and not isinstance(value, (str, int, float)):
+                raise TypeError(f"cannot store {type(value).__name__} field value {value!r}")
+            key = (type(value), value)
+            if key not in value_ids:
+                value_ids[key] = len(values)
+                values.append(value)
+            return value_ids[key]
+
+        timing_ids: Dict[Tuple, int] = {}
+        timing_first_slot: List[int] = []
+        slot_fields = np.empty((len(slots), 4), dtype=np.int32)
+        slot_credits = np.empty(len(slots), dtype=np.int64)
+        slot_timing = np.empty(len(slots), dtype=np.int32)
+        for i, slot in enumerate(slots):
+            slot_fields[i] = [value_id(slot.course_code), value_id(slot.course_name),
+                              value_id(slot.faculty_name), value_id(slot.slot_number)]
+            slot_credits[i] = slot.credits
+            key = tuple((tb.day_index, tb.start, tb.end) for tb in slot.time_blocks)
+            if key not in timing_ids:
+                timing_ids[key] = len(timing_first_slot)
+                timing_first_slot.append(i)
+            slot_timing[i] = timing_ids[key]
+
+        blocks = [block for key in timing_ids for block in key]
+        block_array = np.array(blocks, dtype=np.int32).reshape(len(blocks), 3)
+        timing_offsets = np.cumsum([0] + [len(key) for key in timing_ids], dtype=np.int64).astype(np.int32)
+
+        # Slots with equal masks share a compatibility row
+        row_ids: Dict[int, int] = {}
+        timing_row = np.empty(len(timing_ids), dtype=np.int32)
+        row_bits = []
+        for t, i in enumerate(timing_first_slot):
+            mask = slots[i].occupancy_mask
+            if mask not in row_ids:
+                row_ids[mask] = len(row_bits)
+                row_bits.append(conflict_index.compatible[i])
+            timing_row[t] = row_ids[mask]
+        row_bytes = -(-len(slots) // 8)
+        compatible = np.frombuffer(
+            b"".join(bits.to_bytes(row_bytes, "little") for bits in row_bits), dtype=np.uint8
+        ).reshape(len(row_bits), row_bytes)
+
+        header = {
+            "version": DatasetSnapshot.VERSION,
+            "csv_sha256": csv_hash,
+            "granularity": OCCUPANCY_GRANULARITY_MINUTES,
+            "values": values,
+            "courses": [[value_id(code), len(options)] for code, options in grouped.items()],
+        }
+        arrays = {
+            "slot_fields": slot_fields,
+            "slot_credits": slot_credits,
+            "slot_timing": slot_timing,
+            "timing_offsets": timing_offsets,
+            "block_day": block_array[:, 0].astype(np.uint8),
+            "block_start": block_array[:, 1].astype(np.uint16),
+            "block_end": block_array[:, 2].astype(np.uint16),
+            "timing_row": timing_row,
+            "compatible": compatible,
+        }
+        return header, arrays
+
+    @staticmethod
+    def _decode(buffer, csv_hash: str) -> Optional[Tuple[Dict[str, List[Slot]], ConflictIndex]]:
+        magic_size = len(DatasetSnapshot.MAGIC)
+        if buffer[:magic_size] != DatasetSnapshot.MAGIC:
+            raise ValueError("not a dataset snapshot")
+        (header_size,) = struct.unpack_from("<Q", buffer, magic_size)
+        header_start = magic_size + 8
+        header = json.loads(bytes(buffer[header_start:header_start + header_size]).decode("utf-8"))
+        if (
+            header.get("version") != DatasetSnapshot.VERSION
+            or header.get("csv_sha256") != csv_hash
+            or header.get("granularity") != OCCUPANCY_GRANULARITY_MINUTES
+        ):
+            return None
+
+        data_start = -(-(header_start + header_size) // DatasetSnapshot.ALIGNMENT) * DatasetSnapshot.ALIGNMENT
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            count = int(np.prod(shape, dtype=np.int64))
+            if count == 0:
+                arrays[name] = np.empty(shape, dtype=np.dtype(dtype))
+                continue
+            arrays[name] = np.frombuffer(
+                buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset
+            ).reshape(shape)
+
+        offsets = arrays["timing_offsets"].tolist()
+        days = arrays["block_day"].tolist()
+        starts = arrays["block_start"].tolist()
+        ends = arrays["block_end"].tolist()
+        timings = [
+            tuple(TimeBlock.from_minutes(days[b], starts[b], ends[b]) for b in range(offsets[t], offsets[t + 1]))
+            for t in range(len(offsets) - 1)
+        ]
+        masks = [OccupancyEncoder.encode(blocks) for blocks in timings]
+        compatible_rows = arrays["compatible"]
+        rows = [int.from_bytes(compatible_rows[r].tobytes(), "little") for r in range(len(compatible_rows))]
+        timing_row = arrays["timing_row"].tolist()
+
+        # Each distinct value is one shared object, as Slot() would intern it
+        values = [sys.intern(value) if isinstance(value, str) else value for value in header["values"]]
+        slot_timing = arrays["slot_timing"].tolist()
+        restore = Slot.restore
+        slots = [
+            restore(values[code], values[name], values[faculty], values[number], credits, timings[t], masks[t])
+            for (code, name, faculty, number), credits, t in zip(
+                arrays["slot_fields"].tolist(), arrays["slot_credits"].tolist(), slot_timing
+            )
+        ]
+        compatible = [rows[timing_row[t]] for t in slot_timing]
+
+        grouped: Dict[str, List[Slot]] = {}
+        position = 0
+        for code, count in header["courses"]:
+            grouped[values[code]] = slots[position:position + count]
+            position += count
+        if position != len(slots):
+            raise ValueError("course table does not match slot count")
+
+        return grouped, ConflictIndex.from_compatible(grouped, compatible)
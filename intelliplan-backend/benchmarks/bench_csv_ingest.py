@@ -0,0 +1,108 @@
+"""
+Benchmark: vectorized CourseGrouper.group_courses against the previous
+row-by-row (DataFrame.iterrows + parse_timings) grouping on synthetic CSVs.
+
+Usage:
+    python benchmarks/bench_csv_ingest.py [--rows 10000,100000,1000000] [--patterns 2000]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.modules.data_processor import (
+    CourseGrouper, CSVDataImporter, OccupancyEncoder, OCCUPANCY_GRANULARITY_MINUTES, Slot, TimingsParser,
+)
+
+
+def legacy_group_courses(df: pd.DataFrame, granularity: int = OCCUPANCY_GRANULARITY_MINUTES):
+    """CourseGrouper.group_courses as it was before (one parse per row)"""
+    grouped = {}
+    for _, row in df.iterrows():
+        credits = int(row["CREDITS"]) if pd.notna(row["CREDITS"]) else 0
+        time_blocks = TimingsParser.parse_timings(row["TIMINGS"])
+        slot = Slot(
+            course_code=row["COURSE_CODE"],
+            course_name=row["COURSE_NAME"],
+            faculty_name=row["FACULTY_NAME"],
+            slot_number=row["SLOT_NUMBER"],
+            credits=credits,
+            time_blocks=time_blocks,
+            occupancy_mask=OccupancyEncoder.encode(time_blocks, granularity),
+        )
+        grouped.setdefault(row["COURSE_CODE"], []).append(slot)
+    return grouped
+
+
+def write_csv(path: str, rows: int, patterns: int, seed: int = 0):
+    """Enrollment-like CSV: shared timing patterns, ~20 sections per course, a few bad blocks"""
+    rng = random.Random(seed)
+    days = TimingsParser.DAYS[:6]
+    timing_patterns = []
+    for _ in range(patterns):
+        blocks = []
+        for day in rng.sample(days, rng.randint(1, 3)):
+            hour = rng.randint(8, 16)
+            blocks.append(f"{day}: {hour:02d}:00 - {hour + 1:02d}:00")
+            blocks.append(f"{day}: {hour + 1:02d}:00 - {hour + 2:02d}:00")
+        timing_patterns.append(", ".join(blocks))
+    timing_patterns[0] += ", Someday: 08:00 - 09:00"
+
+    courses = max(rows // 20, 1)
+    df = pd.DataFrame({
+        "COURSE_CODE": [f"19CS{i % courses:05d}" for i in range(rows)],
+        "COURSE_NAME": [f"Course {i % courses}" for i in range(rows)],
+        "FACULTY_NAME": [f"Faculty {rng.randrange(rows // 10 + 1)}" for _ in range(rows)],
+        "SLOT_NUMBER": [f"S{i // courses}" for i in range(rows)],
+        "TIMINGS": [rng.choice(timing_patterns) for _ in range(rows)],
+        "CREDITS": [rng.choice([2, 3, 4]) for _ in range(rows)],
+    })
+    df.to_csv(path, index=False)
+
+
+def timed(fn, *args):
+    """Run fn quietly with the collector paused (as timeit does), so the other
+    path's live objects do not skew the result"""
+    gc.collect()
+    gc.disable()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn(*args)
+            return result, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--patterns", type=int, default=2000, help="distinct TIMINGS strings")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'iterrows (s)':>14}{'vectorized (s)':>16}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(r) for r in args.rows.split(",")):
+            path = os.path.join(tmp, f"enrollment_{rows}.csv")
+            write_csv(path, rows, args.patterns)
+            df, _ = timed(CSVDataImporter.load_csv, path)
+
+            legacy, legacy_s = timed(legacy_group_courses, df)
+            grouped, vectorized_s = timed(CourseGrouper.group_courses, df)
+            assert list(grouped) == list(legacy) and all(grouped[c] == legacy[c] for c in legacy)
+
+            print(f"{rows:>10}{legacy_s:>14.2f}{vectorized_s:>16.2f}{legacy_s / vectorized_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark: memory and scoring throughput of the slotted Slot/TimeBlock model
+against the previous dataclass model (string days and "HH:MM" times).
+
+Usage:
+    python benchmarks/bench_data_model.py [--slots 50000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.modules.data_processor import OccupancyEncoder, Slot, TimeBlock, TimingsParser
+from app.modules.scheduler import ScheduleOptimizer
+
+
+@dataclass
+class LegacyTimeBlock:
+    day: str
+    start_time: str
+    end_time: str
+
+
+@dataclass
+class LegacySlot:
+    course_code: str
+    course_name: str
+    faculty_name: str
+    slot_number: str
+    credits: int
+    time_blocks: List[LegacyTimeBlock]
+    occupancy_mask: int = field(default=0, compare=False)
+
+
+def legacy_score(slots: List[LegacySlot]) -> float:
+    """String-based gap/early/day scoring, as ScheduleOptimizer did before"""
+    day_times: Dict[str, List[str]] = {}
+    early = 0
+    for slot in slots:
+        for tb in slot.time_blocks:
+            day_times.setdefault(tb.day, []).append(tb.start_time)
+            if int(tb.start_time[:2]) < 12:
+                early += 1
+    gaps = 0
+    for times in day_times.values():
+        sorted_times = sorted(set(times))
+        for i in range(len(sorted_times) - 1):
+            gap = int(sorted_times[i + 1][:2]) - int(sorted_times[i][:2])
+            if gap > 1:
+                gaps += gap - 1
+    return (10 - min(gaps, 10)) + min(early * 2, 10) + (5.0 if len(day_times) > 1 else 0.0)
+
+
+def legacy_to_dict(slot: LegacySlot) -> dict:
+    """Slot.to_dict() as it was before"""
+    return {
+        "course_code": slot.course_code,
+        "course_name": slot.course_name,
+        "faculty_name": slot.faculty_name,
+        "slot_number": slot.slot_number,
+        "credits": slot.credits,
+        "time_blocks": [asdict(tb) for tb in slot.time_blocks],
+    }
+
+
+def slotted_score(slots: List[Slot]) -> float:
+    """The same score from the current ScheduleOptimizer helpers"""
+    gaps = ScheduleOptimizer._calculate_gaps(slots)
+    early = ScheduleOptimizer._count_early_blocks(slots)
+    return (10 - min(gaps, 10)) + min(early * 2, 10) + ScheduleOptimizer._score_day_distribution(slots)
+
+
+def make_rows(count: int, seed: int = 0) -> List[tuple]:
+    """Synthetic CSV-like rows: ~100 courses, 20 faculty, 2-3 weekly blocks each"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        course = i % 100
+        blocks = []
+        for day in rng.sample(TimingsParser.DAYS, rng.randint(2, 3)):
+            hour = rng.randint(8, 17)
+            blocks.append((day[:], f"{hour:02d}:00", f"{hour + 1:02d}:00"))
+        # Fresh string objects per row, as the CSV reader produces them
+        rows.append((
+            "".join(["19CS", str(100 + course)]),
+            " ".join(["Course", str(course)]),
+            " ".join(["Faculty", str(i % 20)]),
+            str(i // 100 + 1),
+            3,
+            blocks,
+        ))
+    return rows
+
+
+def build_legacy(rows):
+    slots = []
+    for code, name, faculty, number, credits, blocks in rows:
+        time_blocks = [LegacyTimeBlock(d, start, end) for d, start, end in blocks]
+        mask = OccupancyEncoder.encode([TimeBlock(d, start, end) for d, start, end in blocks])
+        slots.append(LegacySlot(code, name, faculty, number, credits, time_blocks, mask))
+    return slots
+
+
+def build_slotted(rows):
+    return [
+        Slot(code, name, faculty, number, credits, [TimeBlock(d, start, end) for d, start, end in blocks])
+        for code, name, faculty, number, credits, blocks in rows
+    ]
+
+
+def measure_memory(build, count: int) -> int:
+    """Bytes still allocated once the source rows (the parsed CSV) are dropped"""
+    tracemalloc.start()
+    rows = make_rows(count)
+    slots = build(rows)
+    del rows
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del slots
+    return retained
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slots", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    legacy_bytes = measure_memory(build_legacy, args.slots)
+    slotted_bytes = measure_memory(build_slotted, args.slots)
+
+    rows = make_rows(args.slots)
+    legacy = build_legacy(rows)
+    slotted = build_slotted(rows)
+    legacy_schedules = [legacy[i:i + 5] for i in range(0, len(legacy) - 4, 5)]
+    slotted_schedules = [slotted[i:i + 5] for i in range(0, len(slotted) - 4, 5)]
+    assert [legacy_score(s) for s in legacy_schedules] == [slotted_score(s) for s in slotted_schedules]
+
+    legacy_score_s = best_of(args.repeat, lambda: [legacy_score(s) for s in legacy_schedules])
+    slotted_score_s = best_of(args.repeat, lambda: [slotted_score(s) for s in slotted_schedules])
+    assert [legacy_to_dict(slot) for slot in legacy] == [slot.to_dict() for slot in slotted]
+    legacy_dump_s = best_of(args.repeat, lambda: [legacy_to_dict(slot) for slot in legacy])
+    slotted_dump_s = best_of(args.repeat, lambda: [slot.to_dict() for slot in slotted])
+
+    n = len(rows)
+    print(f"slots: {n}, schedules scored: {len(slotted_schedules)}")
+    print(f"{'':22}{'legacy':>12}{'slotted':>12}{'ratio':>8}")
+    print(f"{'memory (bytes/slot)':22}{legacy_bytes / n:12.0f}{slotted_bytes / n:12.0f}"
+          f"{legacy_bytes / slotted_bytes:7.2f}x")
+    print(f"{'score (us/schedule)':22}{legacy_score_s / len(legacy_schedules) * 1e6:12.2f}"
+          f"{slotted_score_s / len(slotted_schedules) * 1e6:12.2f}{legacy_score_s / slotted_score_s:7.2f}x")
+    print(f"{'serialize (us/slot)':22}{legacy_dump_s / n * 1e6:12.2f}{slotted_dump_s / n * 1e6:12.2f}"
+          f"{legacy_dump_s / slotted_dump_s:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: /generate response encoding. The previous path built a dict per
+schedule and slot, validated it against Dict[str, Any] and encoded it with
+FastAPI's generic encoder; the current one splices pre-serialized slot JSON.
+
+Usage:
+    python benchmarks/bench_serialization.py [--courses 4] [--slots 14] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.main import timetables_response
+from app.modules import serialization
+from app.modules.data_processor import Slot, TimeBlock, TimingsParser
+from app.modules.scheduler import BacktrackingScheduler
+
+
+def build_grouped(courses: int, slots: int):
+    """Courses whose slots rarely overlap, so most combinations are valid"""
+    days = TimingsParser.DAYS[:6]
+    return {
+        f"C{c}": [
+            Slot(f"C{c}", f"Course {c}", f"Faculty {c}-{i}", f"S{i}", 3, [
+                TimeBlock(days[(i + c) % 6], f"{8 + (i * 5 + c * 3) % 10:02d}:00", f"{9 + (i * 5 + c * 3) % 10:02d}:00"),
+                TimeBlock(days[(i + c + 2) % 6], f"{8 + (i * 7 + c) % 10:02d}:00", f"{9 + (i * 7 + c) % 10:02d}:00"),
+            ])
+            for i in range(slots)
+        ]
+        for c in range(courses)
+    }
+
+
+def legacy_encode(payload: Dict[str, Any], page) -> bytes:
+    """Dicts per schedule, response_model validation, then the generic encoder"""
+    payload = dict(payload, timetables=page.to_dicts())
+    validated = TypeAdapter(Dict[str, Any]).validate_python(payload)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def median_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--slots", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    grouped = build_grouped(args.courses, args.slots)
+    page = BacktrackingScheduler(grouped).generate_timetables(list(grouped))
+    payload = {"status": "success", "count": len(page), "offset": 0, "has_more": False}
+    print(f"{len(page)} timetables, orjson {'available' if serialization.orjson else 'missing'}")
+
+    fast = timetables_response(payload, page).body
+    assert json.loads(fast) == json.loads(legacy_encode(payload, page))
+
+    legacy_s = median_time(lambda: legacy_encode(payload, page), args.repeat)
+    print(f"{'dicts + validation + jsonable_encoder':40}{legacy_s * 1e3:>10.0f}ms")
+    for name, encoder in (("spliced fragments, json", None), ("spliced fragments, orjson", serialization.orjson)):
+        if name.endswith("orjson") and encoder is None:
+            continue
+        serialization.orjson = encoder
+        for options in page.slot_options:
+            for slot in options:
+                slot._json = None  # Count the one-off slot serialization too
+        fast_s = median_time(lambda: timetables_response(payload, page), args.repeat)
+        print(f"{name:40}{fast_s * 1e3:>10.0f}ms{legacy_s / fast_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: import time and time-to-first-response of the API, in fresh
+interpreters, with and without startup warm-up and a dataset snapshot.
+
+Usage:
+    python benchmarks/bench_startup.py [--rows 0] [--repeat 5]
+
+--rows 0 uses a copy of the bundled ENROLLMENT.csv; otherwise a synthetic
+CSV of that many rows (see bench_csv_ingest.py).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND)
+
+from app.modules.snapshot import DatasetSnapshot
+
+# Runs in a fresh interpreter; the last stdout line is the JSON result
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.main as main
+t1 = time.perf_counter()
+pandas_on_import = "pandas" in sys.modules
+main.DATA_FILE = {data_file!r}
+if {warm_up!r}:
+    main.warm_up()  # What the lifespan hook runs before the server reports ready
+t2 = time.perf_counter()
+main.get_dataset().catalog.response({{}})  # What GET /courses serves
+t3 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "ready": t2 - t0, "first_request": t3 - t2,
+                  "pandas_on_import": pandas_on_import}}))
+"""
+
+
+def run_child(data_file: str, warm_up: bool) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(data_file=data_file, warm_up=warm_up)],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "ENROLLMENT.csv")
+        if args.rows:
+            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+            from bench_csv_ingest import write_csv
+            write_csv(data_file, args.rows, patterns=2000)
+        else:
+            shutil.copy(os.path.join(BACKEND, "..", "ENROLLMENT.csv"), data_file)
+        snapshot = DatasetSnapshot.path_for(data_file)
+
+        print(f"{'scenario':28}{'import':>10}{'ready':>10}{'1st request':>13}  pandas on import")
+        for warm_up in (False, True):
+            for use_snapshot in (False, True):
+                runs = []
+                for _ in range(args.repeat):
+                    if use_snapshot and not os.path.exists(snapshot):
+                        run_child(data_file, warm_up=True)
+                    elif not use_snapshot and os.path.exists(snapshot):
+                        os.remove(snapshot)
+                    runs.append(run_child(data_file, warm_up))
+                median = {key: statistics.median(run[key] for run in runs)
+                          for key in ("import", "ready", "first_request")}
+                name = f"{'warm-up' if warm_up else 'lazy'}, {'snapshot' if use_snapshot else 'CSV'}"
+                print(f"{name:28}{median['import'] * 1e3:>8.0f}ms{median['ready'] * 1e3:>8.0f}ms"
+                      f"{median['first_request'] * 1e3:>11.1f}ms  {runs[0]['pandas_on_import']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,33 @@ from datetime import datetime
 
 # Import modules
 from app.modules.data_processor import (
-    TimingsParser, TimeBlock, CSVDataImporter, CourseGrouper, Slot
+    TimingsParser, TimeBlock, CSVDataImporter, CourseGrouper, Slot, OccupancyEncoder
+)
+from app.modules.scheduler import (
+    ConflictDetector, BacktrackingScheduler, ConflictIndex, SearchStats, FeasibilityCache,
+    ScheduleOptimizer,
 )
-from app.modules.scheduler import ConflictDetector, BacktrackingScheduler
 from app.modules.nlp_filter import IntentDetector, ConstraintFilter, ConstraintIntent
 
 
+def setUpModule():
+    """Serve a temporary copy of ENROLLMENT.csv, so dataset snapshots stay out of the tree"""
+    global data_dir, data_file_patch
+    import tempfile
+    import shutil
+    from app import main
+    data_dir = tempfile.TemporaryDirectory()
+    data_file = os.path.join(data_dir.name, "ENROLLMENT.csv")
+    shutil.copy(main.DATA_FILE, data_file)
+    data_file_patch = patch.multiple(main, DATA_FILE=data_file, dataset=None)
+    data_file_patch.start()
+
+
+def tearDownModule():
+    data_file_patch.stop()
+    data_dir.cleanup()
+
+
 class TestTimingsParser(unittest.TestCase):
     """Test Module 1: Timings Parser"""
 
@@ -49,6 +70,56 @@ class TestTimingsParser(unittest.TestCase):
         self.assertFalse(TimingsParser._is_valid_time("24:00"))
         self.assertFalse(TimingsParser._is_valid_time("invalid"))
 
+    def test_parse_timings_shared_and_counted(self):
+        """Test repeated strings share one tuple and skipped blocks are counted per call"""
+        from app.modules.data_processor import ParseWarnings
+        warnings = ParseWarnings()
+        timing_str = "Monday: 08:00 - 09:00, Funday: 09:00 - 10:00, Friday: 25:00 - 26:00"
+
+        first = TimingsParser.parse_timings(timing_str, warnings)
+        second = TimingsParser.parse_timings("".join(timing_str), warnings)
+
+        self.assertIs(first, second)
+        self.assertEqual(first, (TimeBlock("Monday", "08:00", "09:00"),))
+        self.assertEqual((warnings.unknown_day, warnings.invalid_time), (2, 2))
+        self.assertEqual(warnings.examples, [timing_str])
+
+    def test_vectorized_grouping_matches_rows(self):
+        """Test column parsing and grouping agree with row-by-row parsing"""
+        import pandas as pd
+        timings = [
+            "Monday: 08:00 - 09:00, Wednesday: 10:00 - 11:00",
+            "Funday: 08:00 - 09:00, Tuesday: 13:00 - 14:00",
+            "Friday: 25:00 - 26:00, Friday: 09:30 - 10:45",
+            "",
+            float("nan"),
+            "Monday: 08:00 - 09:00, Wednesday: 10:00 - 11:00",
+        ]
+        df = pd.DataFrame({
+            "COURSE_CODE": ["B1", "A1", "B1", "C1", "A1", "B1"],
+            "COURSE_NAME": ["Beta", "Alpha", "Beta", "Gamma", "Alpha", "Beta"],
+            "FACULTY_NAME": ["X", "Y", "Z", "X", "Y", "X"],
+            "SLOT_NUMBER": ["1", "1", "2", "1", "2", "3"],
+            "TIMINGS": timings,
+            "CREDITS": [3, 4, 3, float("nan"), 4, 3],
+        }, index=[10, 3, 7, 1, 0, 5])
+
+        from app.modules.data_processor import ParseWarnings
+        column_warnings, row_warnings = ParseWarnings(), ParseWarnings()
+        with patch("builtins.print"):
+            parsed = TimingsParser.parse_timings_column(df["TIMINGS"], column_warnings)
+            expected = [TimingsParser.parse_timings(t, row_warnings) for t in timings]
+            grouped = CourseGrouper.group_courses(df)
+
+        self.assertEqual(parsed, expected)
+        self.assertEqual(column_warnings, row_warnings)
+        self.assertEqual(list(grouped), ["B1", "A1", "C1"])
+        self.assertEqual([s.slot_number for s in grouped["B1"]], ["1", "2", "3"])
+        self.assertEqual(grouped["C1"][0].credits, 0)
+        for slots in grouped.values():
+            for slot in slots:
+                self.assertEqual(slot.occupancy_mask, OccupancyEncoder.encode(slot.time_blocks))
+
 
 class TestConflictDetector(unittest.TestCase):
     """Test Module 2: Conflict Detection"""
@@ -117,6 +188,116 @@ class TestConflictDetector(unittest.TestCase):
         self.assertFalse(has_conflict)
 
 
+    def test_conflict_partial_overlap(self):
+        """Test conflict when intervals overlap without sharing a start time"""
+        slot_overlap = Slot("19ME533", "3D Printing", "Muthukumar V", "4C1-1", 4,
+                            [TimeBlock("Monday", "08:30", "09:30")])
+        self.assertTrue(ConflictDetector.check_conflict(self.slot_1, slot_overlap))
+        self.assertTrue(ConflictDetector.check_conflict(self.slot_2, slot_overlap))
+
+
+class TestOccupancyEncoder(unittest.TestCase):
+    """Test Module 1: Week occupancy bitmasks"""
+
+    def test_adjacent_blocks_do_not_overlap(self):
+        """Test back-to-back blocks produce disjoint masks"""
+        mask_a = OccupancyEncoder.encode([TimeBlock("Monday", "08:00", "09:00")])
+        mask_b = OccupancyEncoder.encode([TimeBlock("Monday", "09:00", "10:00")])
+        self.assertNotEqual(mask_a, 0)
+        self.assertEqual(mask_a & mask_b, 0)
+
+    def test_granularity(self):
+        """Test coarse buckets merge blocks that share a bucket"""
+        block_a = [TimeBlock("Monday", "08:00", "08:20")]
+        block_b = [TimeBlock("Monday", "08:40", "09:00")]
+        self.assertEqual(OccupancyEncoder.encode(block_a, 10) & OccupancyEncoder.encode(block_b, 10), 0)
+        self.assertNotEqual(OccupancyEncoder.encode(block_a, 60) & OccupancyEncoder.encode(block_b, 60), 0)
+
+    def test_days_are_separate(self):
+        """Test identical times on different days do not overlap"""
+        mask_a = OccupancyEncoder.encode([TimeBlock("Monday", "23:00", "23:59")])
+        mask_b = OccupancyEncoder.encode([TimeBlock("Tuesday", "00:00", "01:00")])
+        self.assertEqual(mask_a & mask_b, 0)
+
+
+class TestSlotModel(unittest.TestCase):
+    """Test Module 1: Compact Slot/TimeBlock representation"""
+
+    def test_time_block_views(self):
+        """Test integer fields round-trip to the original strings"""
+        block = TimeBlock("Wednesday", "08:05", "24:00")
+        self.assertEqual((block.day_index, block.start, block.end), (2, 485, 1440))
+        self.assertEqual(block.to_dict(), {"day": "Wednesday", "start_time": "08:05", "end_time": "24:00"})
+        self.assertEqual(block, TimeBlock("Wednesday", "08:05", "24:00"))
+        self.assertRaises(ValueError, TimeBlock, "Someday", "08:00", "09:00")
+        self.assertRaises(ValueError, TimeBlock, "Monday", "08:60", "09:00")
+
+    def test_slot_serialization(self):
+        """Test slots serialize as before, intern names and survive pickling"""
+        import pickle
+        slot = Slot("CS101", "Intro", "Dr. " + "Smith", "1", 3, [TimeBlock("Monday", "08:00", "09:00")])
+        other = Slot("CS101", "Intro", "Dr. " + "Smith", "2", 3, [])
+
+        self.assertIs(slot.faculty_name, other.faculty_name)
+        self.assertEqual(slot.to_dict()["time_blocks"],
+                         [{"day": "Monday", "start_time": "08:00", "end_time": "09:00"}])
+        copy = pickle.loads(pickle.dumps(slot))
+        self.assertEqual(copy, slot)
+        self.assertEqual(copy.occupancy_mask, slot.occupancy_mask)
+
+
+class TestDatasetSnapshot(unittest.TestCase):
+    """Test Module 8: Dataset snapshots"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ENROLLMENT.snapshot")
+        self.grouped = {
+            "CS101": [
+                Slot("CS101", "Intro", "Dr. A", "1", 3, [TimeBlock("Monday", "08:00", "09:00")]),
+                Slot("CS101", "Intro", "Dr. B", "2", 3, [TimeBlock("Tuesday", "08:00", "09:00")]),
+            ],
+            "MA201": [
+                Slot("MA201", float("nan"), "Dr. C", "1", 0,
+                     [TimeBlock("Monday", "08:30", "09:30"), TimeBlock("Friday", "14:00", "15:00")]),
+                Slot("MA201", float("nan"), "Dr. C", "2", 4, []),
+            ],
+        }
+        self.index = ConflictIndex(self.grouped)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test a saved snapshot restores the same courses and conflict index"""
+        from app.modules.snapshot import DatasetSnapshot
+        self.assertTrue(DatasetSnapshot.save(self.path, "abc", self.grouped, self.index))
+
+        grouped, index = DatasetSnapshot.load(self.path, "abc")
+
+        self.assertEqual(list(grouped), list(self.grouped))
+        for code, slots in self.grouped.items():
+            for loaded, slot in zip(grouped[code], slots):
+                self.assertEqual(loaded.to_dict()["time_blocks"], slot.to_dict()["time_blocks"])
+                self.assertEqual((loaded.slot_number, loaded.credits, loaded.occupancy_mask),
+                                 (slot.slot_number, slot.credits, slot.occupancy_mask))
+        self.assertEqual(index.compatible, self.index.compatible)
+        self.assertIs(index.slots[2], grouped["MA201"][0])
+
+    def test_stale_or_corrupt_snapshot_is_ignored(self):
+        """Test snapshots for another CSV hash or with damaged contents are not used"""
+        from app.modules.snapshot import DatasetSnapshot
+        DatasetSnapshot.save(self.path, "abc", self.grouped, self.index)
+        self.assertIsNone(DatasetSnapshot.load(self.path, "def"))
+
+        with open(self.path, "r+b") as f:
+            f.truncate(100)
+        with patch("builtins.print"):
+            self.assertIsNone(DatasetSnapshot.load(self.path, "abc"))
+        self.assertIsNone(DatasetSnapshot.load(os.path.join(self.tmp.name, "missing.snapshot"), "abc"))
+
+
 class TestIntentDetector(unittest.TestCase):
     """Test Module 3: NLP Intent Detection"""
 
@@ -208,6 +389,51 @@ class TestConstraintFilter(unittest.TestCase):
         self.assertEqual(len(filtered), 1)
         self.assertEqual(filtered[0].course_codes[0], "19AI404")
 
+    def test_compiled_constraints_match_post_filter(self):
+        """Test constraints pushed into the search keep exactly the post-filtered schedules"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock(["Monday", "Tuesday", "Saturday"][(i + c) % 3],
+                                f"{8 + (i * 2 + c) % 8:02d}:00", f"{9 + (i * 2 + c) % 8:02d}:00")])
+                for i in range(5)
+            ]
+            for c in range(3)
+        }
+        scheduler = BacktrackingScheduler(grouped)
+        all_schedules = scheduler.generate_timetables(list(grouped))
+
+        for text in [
+            "No classes on Saturday",
+            "No classes after 1 PM",
+            "No class before 10 AM",
+            "No classes between 9 AM and 11 AM",
+            "No back to back classes",
+            "Prefer morning",
+            "No classes on Monday and avoid consecutive classes",
+        ]:
+            constraints = IntentDetector.detect_intent(text)
+            expected = ConstraintFilter.apply_constraints(all_schedules, constraints)
+            compiled = ConstraintFilter.compile_constraints(constraints)
+            schedules = scheduler.generate_timetables(list(grouped), constraints=compiled)
+
+            self.assertEqual([s.slots for s in schedules], [s.slots for s in expected], text)
+            self.assertEqual(
+                scheduler.count_timetables(list(grouped), constraints=ConstraintFilter.compile_constraints(constraints)),
+                len(expected),
+                text,
+            )
+
+    def test_compile_splits_predicates_and_checks(self):
+        """Test per-block intents prune domains and the rest run during search"""
+        compiled = ConstraintFilter.compile_constraints(
+            IntentDetector.detect_intent("No classes on Saturday and no back to back classes")
+        )
+        self.assertEqual(len(compiled.slot_predicates), 1)
+        self.assertEqual(len(compiled.checks), 1)
+        self.assertFalse(compiled.slot_predicates[0](self.slot_saturday))
+        self.assertTrue(compiled.slot_predicates[0](self.slot_monday))
+
 
 class TestBacktrackingScheduler(unittest.TestCase):
     """Test Module 2: Backtracking Scheduler"""
@@ -253,6 +479,464 @@ class TestBacktrackingScheduler(unittest.TestCase):
         with self.assertRaises(ValueError):
             scheduler.generate_timetables(["INVALID"])
 
+    def test_iter_timetables_is_lazy(self):
+        """Test the generator matches the list API and validates eagerly"""
+        scheduler = BacktrackingScheduler(self.grouped)
+        schedules = scheduler.iter_timetables(["19AI404", "19AI409"])
+
+        first = next(schedules)
+        expected = scheduler.generate_timetables(["19AI404", "19AI409"])
+        self.assertIn(first, expected)
+        self.assertCountEqual([first] + list(schedules), expected)
+
+        with self.assertRaises(ValueError):
+            scheduler.iter_timetables(["INVALID"])
+
+    def test_matches_exhaustive_enumeration(self):
+        """Test MRV/forward-checking search returns the brute-force result in order"""
+        import random
+        from itertools import product
+
+        rng = random.Random(7)
+        days = ["Monday", "Tuesday", "Wednesday"]
+        grouped = {}
+        for c in range(4):
+            code = f"C{c}"
+            grouped[code] = []
+            for i in range(rng.randint(1, 5)):
+                blocks = []
+                for _ in range(rng.randint(1, 2)):
+                    hour = rng.randint(8, 12)
+                    blocks.append(TimeBlock(rng.choice(days), f"{hour:02d}:00", f"{hour + 1:02d}:00"))
+                grouped[code].append(Slot(code, code, "Faculty", f"S{i}", 3, blocks))
+
+        selection = list(grouped)
+        expected = [
+            list(combo) for combo in product(*(grouped[code] for code in selection))
+            if not ConflictDetector.check_conflict_in_group(list(combo))[0]
+        ]
+        schedules = BacktrackingScheduler(grouped).generate_timetables(selection)
+        self.assertEqual([schedule.slots for schedule in schedules], expected)
+
+    def test_forward_checking_prunes_dead_ends(self):
+        """Test a course with no compatible slot is detected without descending"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock("Monday", f"{8 + c:02d}:00", f"{9 + c:02d}:00"),
+                      TimeBlock("Tuesday", f"{8 + i:02d}:00", f"{9 + i:02d}:00")])
+                for i in range(6)
+            ]
+            for c in range(4)
+        }
+        # Clashes with every slot of C3
+        grouped["BLOCKER"] = [Slot("BLOCKER", "Blocker", "Faculty", "B1", 3,
+                                   [TimeBlock("Monday", "11:00", "12:00")])]
+
+        stats = SearchStats()
+        schedules = BacktrackingScheduler(grouped).generate_timetables(list(grouped), stats)
+        self.assertEqual(schedules, [])
+        self.assertLess(stats.nodes, 5)
+
+    def test_count_matches_generation(self):
+        """Test counting agrees with full generation without building schedules"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock("Monday", f"{8 + (i + c) % 5:02d}:00", f"{9 + (i + c) % 5:02d}:00"),
+                      TimeBlock("Friday", f"{8 + i:02d}:00", f"{9 + i:02d}:00")])
+                for i in range(5)
+            ]
+            for c in range(4)
+        }
+        scheduler = BacktrackingScheduler(grouped)
+        expected = len(scheduler.generate_timetables(list(grouped)))
+
+        with patch("app.modules.scheduler.TimeTableSchedule") as schedule_cls:
+            count = BacktrackingScheduler(grouped).count_timetables(list(grouped))
+            schedule_cls.assert_not_called()
+        self.assertEqual(count, expected)
+        self.assertEqual(scheduler.count_timetables(["C0"]), 5)
+
+    def test_top_k_matches_exhaustive_ranking(self):
+        """Test branch-and-bound returns the head of the exhaustive ranking"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock(["Monday", "Tuesday", "Friday"][(i + c) % 3],
+                                f"{8 + (i * 3 + c) % 9:02d}:00", f"{9 + (i * 3 + c) % 9:02d}:00")])
+                for i in range(5)
+            ]
+            for c in range(4)
+        }
+        scheduler = BacktrackingScheduler(grouped)
+        for criteria in ({}, {"prefer_morning": True}):
+            ranked = ScheduleOptimizer.rank_schedules(scheduler.generate_timetables(list(grouped)), criteria)
+            for k in (1, 4, len(ranked) + 1):
+                top = scheduler.top_k_timetables(list(grouped), k, criteria)
+                self.assertEqual([s.slots for s in top], [s.slots for s in ranked[:k]])
+
+        self.assertEqual(scheduler.top_k_timetables(list(grouped), 0), [])
+
+    def test_conflict_index_compatibility(self):
+        """Test the index agrees with pairwise conflict checks"""
+        index = ConflictIndex(self.grouped)
+        slots = [self.slot_1a, self.slot_1b, self.slot_2a, self.slot_2b]
+        for slot_a in slots:
+            for slot_b in slots:
+                if slot_a is slot_b:
+                    continue
+                self.assertEqual(
+                    index.is_compatible(slot_a, slot_b),
+                    not ConflictDetector.check_conflict(slot_a, slot_b),
+                )
+
+    def test_shared_index_with_filtered_courses(self):
+        """Test a filtered scheduler reuses the dataset-wide index"""
+        index = ConflictIndex(self.grouped)
+        filtered = {"19AI404": [self.slot_1a], "19AI409": self.grouped["19AI409"]}
+        scheduler = BacktrackingScheduler(filtered, index)
+
+        self.assertIs(scheduler.conflict_index, index)
+        self.assertEqual(len(scheduler.generate_timetables(["19AI404", "19AI409"])), 2)
+
+    def test_index_rejects_unknown_slot(self):
+        """Test slots outside the index are reported"""
+        index = ConflictIndex({"19AI404": [self.slot_1a]})
+        scheduler = BacktrackingScheduler(self.grouped, index)
+
+        with self.assertRaises(ValueError):
+            scheduler.generate_timetables(["19AI409"])
+
+    def test_incremental_index_matches_rebuild(self):
+        """Test adding, replacing and removing slots agrees with a fresh index"""
+        index = ConflictIndex(self.grouped)
+        slot_1c = Slot("19AI404", "AOA", "Sasikala K", "4W2-3", 3,
+                       [TimeBlock("Wednesday", "08:00", "09:00")])
+        slot_2a_moved = Slot("19AI409", "Applied AI", "Lavanya G", "4K1-1", 3,
+                             [TimeBlock("Tuesday", "08:00", "09:00")])
+        index.add_slot(slot_1c)
+        index.replace_slot(self.slot_2a, slot_2a_moved)
+        index.remove_slot(self.slot_2b)
+        grouped = {
+            "19AI404": [self.slot_1a, self.slot_1b, slot_1c],
+            "19AI409": [slot_2a_moved],
+        }
+
+        rebuilt = ConflictIndex(grouped)
+        slots = [slot for options in grouped.values() for slot in options]
+        for slot_a in slots:
+            for slot_b in slots:
+                self.assertEqual(index.is_compatible(slot_a, slot_b), rebuilt.is_compatible(slot_a, slot_b))
+        self.assertEqual(index.all_slots.bit_count(), len(slots))
+        with self.assertRaises(ValueError):
+            index.slot_id(self.slot_2b)
+        self.assertEqual(
+            [s.slots for s in BacktrackingScheduler(grouped, index).generate_timetables(list(grouped))],
+            [s.slots for s in BacktrackingScheduler(grouped, rebuilt).generate_timetables(list(grouped))],
+        )
+
+    def test_search_budget_truncates(self):
+        """Test budgets stop the search with a prefix of the full result in search order"""
+        import threading
+        from app.modules.scheduler import SearchBudget, SearchInterrupted
+        grouped = {
+            f"C{c}": [Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                           [TimeBlock("Monday", f"{8 + i + c:02d}:00", f"{9 + i + c:02d}:00")])
+                      for i in range(4)]
+            for c in range(3)
+        }
+        scheduler = BacktrackingScheduler(grouped)
+        courses = list(grouped)
+        full = scheduler.generate_timetables(courses, search_order=True)
+
+        stats = SearchStats()
+        first = scheduler.generate_timetables(courses, stats, search_order=True, budget=SearchBudget(max_results=2))
+        self.assertEqual(list(first), list(full[:2]))
+        self.assertEqual((stats.truncated, stats.stop_reason), (True, "max_results"))
+
+        stats = SearchStats()
+        exact = scheduler.generate_timetables(courses, stats, budget=SearchBudget(max_results=len(full)))
+        self.assertEqual(len(exact), len(full))
+        self.assertFalse(stats.truncated)
+
+        cancelled = threading.Event()
+        cancelled.set()
+        for budget, reason in (
+            (SearchBudget(max_nodes=3), "max_nodes"),
+            (SearchBudget(deadline=0.0), "deadline"),
+            (SearchBudget(cancelled=cancelled), "cancelled"),
+        ):
+            stats = SearchStats()
+            partial = BacktrackingScheduler(grouped).generate_timetables(courses, stats, budget=budget)
+            self.assertEqual((stats.truncated, stats.stop_reason), (True, reason))
+            self.assertLess(len(partial), len(full))
+            with self.assertRaises(SearchInterrupted):
+                BacktrackingScheduler(grouped).count_timetables(courses, budget=budget)
+        self.assertEqual(stats.nodes, 1)
+
+        # Subtrees cut short are not cached as complete
+        self.assertEqual(list(scheduler.generate_timetables(courses, search_order=True)), list(full))
+
+    def test_parallel_search_matches_serial(self):
+        """Test splitting the search across processes returns the serial result"""
+        from app.modules.scheduler import ParallelSearch
+        from app.modules.nlp_filter import IntentDetector, ConstraintFilter
+
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock(["Monday", "Tuesday", "Friday"][(i + c) % 3],
+                                f"{8 + (i * 3 + c) % 9:02d}:00", f"{9 + (i * 3 + c) % 9:02d}:00")])
+                for i in range(5)
+            ]
+            for c in range(4)
+        }
+        index = ConflictIndex(grouped)
+        parallel = ParallelSearch(index, workers=2, min_combinations=1)
+        self.addCleanup(parallel.shutdown)
+        serial_scheduler = BacktrackingScheduler(grouped, index)
+        parallel_scheduler = BacktrackingScheduler(grouped, index, parallel_search=parallel)
+
+        for text in ("", "No back to back classes and prefer morning"):
+            constraints = IntentDetector.detect_intent(text) if text else []
+            serial_stats, parallel_stats = SearchStats(), SearchStats()
+            serial = serial_scheduler.generate_timetables(
+                list(grouped), serial_stats, ConstraintFilter.compile_constraints(constraints)
+            )
+            split = parallel_scheduler.generate_timetables(
+                list(grouped), parallel_stats, ConstraintFilter.compile_constraints(constraints)
+            )
+            self.assertEqual([s.slots for s in split], [s.slots for s in serial], text)
+            self.assertEqual(parallel_stats.solutions, serial_stats.solutions)
+
+            # search_order reproduces the lazy iteration order
+            lazy = serial_scheduler.iter_timetables(list(grouped), constraints=ConstraintFilter.compile_constraints(constraints))
+            split = parallel_scheduler.generate_timetables(
+                list(grouped), constraints=ConstraintFilter.compile_constraints(constraints), search_order=True
+            )
+            self.assertEqual([s.slots for s in split], [s.slots for s in lazy], text)
+
+        # A budget keeps the serial prefix
+        from app.modules.scheduler import SearchBudget
+        stats = SearchStats()
+        split = parallel_scheduler.generate_timetables(
+            list(grouped), stats, search_order=True, budget=SearchBudget(max_results=7)
+        )
+        lazy = serial_scheduler.iter_timetables(list(grouped))
+        self.assertEqual([s.slots for s in split], [next(lazy).slots for _ in range(7)])
+        self.assertEqual((stats.truncated, stats.stop_reason), (True, "max_results"))
+
+        # Small selections stay serial; a pool over another index is rejected
+        self.assertFalse(ParallelSearch(index, workers=2).should_split(serial_scheduler._prepare(["C0", "C1"], None)))
+        with self.assertRaises(ValueError):
+            BacktrackingScheduler(grouped, ConflictIndex(grouped), parallel_search=parallel)
+
+
+    def test_cancelled_parallel_search_frees_workers(self):
+        """Test cancelling a split search stops the tasks running in the workers"""
+        import threading
+        import time
+        from app.modules.scheduler import ParallelSearch, SearchBudget
+
+        # No two courses share an hour: every one of the 12**7 combinations is valid
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock(TimingsParser.DAYS[i % 6], f"{8 + c:02d}:00", f"{9 + c:02d}:00")])
+                for i in range(12)
+            ]
+            for c in range(7)
+        }
+        parallel = ParallelSearch(ConflictIndex(grouped), workers=2, min_combinations=1)
+        self.addCleanup(parallel.shutdown)
+        scheduler = BacktrackingScheduler(grouped, parallel.conflict_index, parallel_search=parallel)
+        small = lambda: scheduler.generate_timetables(["C0", "C1"], budget=SearchBudget(max_nodes=10**9))
+        small()  # Start the workers outside the timing
+
+        cancelled = threading.Event()
+        threading.Timer(0.3, cancelled.set).start()
+        stats = SearchStats()
+        scheduler.generate_timetables(list(grouped), stats, budget=SearchBudget(cancelled=cancelled))
+        self.assertEqual(stats.stop_reason, "cancelled")
+
+        # Each running task has millions of schedules left; only a stop frees its worker
+        start = time.monotonic()
+        self.assertEqual(len(small()), 144)
+        self.assertLess(time.monotonic() - start, 2.0)
+        # Flags return to the pool once the tasks' done callbacks have run
+        while len(parallel._cancel_flags._free) < ParallelSearch.CANCEL_FLAGS and time.monotonic() - start < 2.0:
+            time.sleep(0.01)
+        self.assertEqual(len(parallel._cancel_flags._free), ParallelSearch.CANCEL_FLAGS)
+
+
+class TestFeasibilityCache(unittest.TestCase):
+    """Test Module 2: Bounded subtree cache"""
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted past the bound"""
+        cache = FeasibilityCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 0)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_shared_across_schedulers(self):
+        """Test a second search over the same index reuses cached subtrees"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock("Monday", f"{8 + i:02d}:00", f"{9 + i:02d}:00")])
+                for i in range(4)
+            ]
+            for c in range(3)
+        }
+        index = ConflictIndex(grouped)
+        cache = FeasibilityCache()
+        first = BacktrackingScheduler(grouped, index, cache).generate_timetables(list(grouped))
+        misses = cache.stats()["misses"]
+        second = BacktrackingScheduler(grouped, index, cache).generate_timetables(list(grouped))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 24)
+        self.assertGreater(cache.stats()["hits"], 0)
+        self.assertEqual(cache.stats()["misses"], misses)
+
+    def test_bounded_size(self):
+        """Test the cache never grows past its bound during a search"""
+        grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock("Tuesday", f"{8 + i:02d}:00", f"{9 + i:02d}:00")])
+                for i in range(5)
+            ]
+            for c in range(4)
+        }
+        cache = FeasibilityCache(max_entries=3)
+        schedules = BacktrackingScheduler(grouped, feasibility_cache=cache).generate_timetables(list(grouped))
+
+        self.assertEqual(len(schedules), 120)
+        self.assertLessEqual(len(cache), 3)
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+
+class TestScheduleBatch(unittest.TestCase):
+    """Test Module 7: Vectorized batch scoring"""
+
+    def setUp(self):
+        """Setup a dense selection with varied gaps, days and hours"""
+        days = ["Monday", "Tuesday", "Wednesday"]
+        self.grouped = {
+            f"C{c}": [
+                Slot(f"C{c}", "Course", "Faculty", f"S{i}", 3,
+                     [TimeBlock(days[(i + c) % 3], f"{8 + (i * 3 + c) % 10:02d}:00", f"{9 + (i * 3 + c) % 10:02d}:00"),
+                      TimeBlock(days[i % 3], f"{8 + (i * 5 + c) % 10:02d}:30", f"{9 + (i * 5 + c) % 10:02d}:30")])
+                for i in range(6)
+            ]
+            for c in range(4)
+        }
+        self.schedules = list(BacktrackingScheduler(self.grouped).generate_timetables(list(self.grouped)))
+
+    def test_schedule_set_is_compact_and_equivalent(self):
+        """Test the packed result set materializes the same schedules and dicts"""
+        from app.modules.scheduler import ScheduleSet
+
+        packed = BacktrackingScheduler(self.grouped).generate_timetables(list(self.grouped))
+        self.assertIsInstance(packed, ScheduleSet)
+        self.assertEqual(packed.rows.dtype.itemsize, 2)
+        self.assertEqual(packed, self.schedules)
+        self.assertEqual(packed.to_dicts(), [s.to_dict() for s in self.schedules])
+        self.assertEqual(packed[3:5], self.schedules[3:5])
+        self.assertEqual(packed.take([4, 1]), [self.schedules[4], self.schedules[1]])
+        rows = [tuple(row) for row in packed.rows.tolist()]
+        streamed = ScheduleSet.from_iter(packed.course_codes, packed.slot_options, iter(rows))
+        self.assertEqual(streamed.rows.dtype, packed.rows.dtype)
+        self.assertEqual(streamed, packed)
+
+        codes = list(reversed(list(self.grouped)))
+        reordered = packed.reorder(codes)
+        self.assertEqual(reordered[0].course_codes, codes)
+        self.assertEqual(reordered[0].slots, list(reversed(self.schedules[0].slots)))
+        self.assertEqual(reordered.reorder(list(self.grouped)), packed)
+
+        ranked = ScheduleOptimizer.rank_schedules(packed, {"prefer_morning": True})
+        self.assertIsInstance(ranked, ScheduleSet)
+        self.assertEqual(ranked, ScheduleOptimizer.rank_schedules(self.schedules, {"prefer_morning": True}))
+
+        constraints = IntentDetector.detect_intent("No classes on Tuesday and no back to back classes")
+        self.assertEqual(
+            ConstraintFilter.apply_constraints(packed, constraints),
+            ConstraintFilter.apply_constraints(self.schedules, constraints),
+        )
+
+    def test_scores_match_scalar(self):
+        """Test batch scores equal ScheduleOptimizer.score_slots exactly"""
+        from app.modules.batch import ScheduleBatch
+
+        batch = ScheduleBatch.from_schedules(self.schedules)
+        for criteria in ({}, {"prefer_morning": True}):
+            expected = [ScheduleOptimizer.score_slots(s.slots, criteria) for s in self.schedules]
+            self.assertEqual(batch.scores(criteria).tolist(), expected)
+
+    def test_rank_schedules_batch_path(self):
+        """Test ranking above the threshold keeps the scalar order, ties included"""
+        criteria = {"prefer_morning": True}
+        with patch.object(ScheduleOptimizer, "BATCH_SCORING_THRESHOLD", len(self.schedules) + 1):
+            scalar = ScheduleOptimizer.rank_schedules(self.schedules, criteria)
+        with patch.object(ScheduleOptimizer, "BATCH_SCORING_THRESHOLD", 1):
+            batched = ScheduleOptimizer.rank_schedules(self.schedules, criteria)
+
+        self.assertGreater(len(self.schedules), 1)
+        self.assertEqual([id(s) for s in batched], [id(s) for s in scalar])
+
+    def test_filter_batch_path_matches_scalar(self):
+        """Test columnar constraint filtering keeps exactly the scalar selection"""
+        from app.main import TimetableModel
+
+        models = [TimetableModel(**s.to_dict()) for s in self.schedules]
+        for text in [
+            "No classes on Tuesday",
+            "No classes after 3 PM",
+            "No class before 9 AM",
+            "No classes between 10 AM and 12 PM",
+            "No back to back classes",
+            "Prefer morning",
+            "No classes on Monday and avoid consecutive classes",
+        ]:
+            constraints = IntentDetector.detect_intent(text)
+            for schedules in (self.schedules, models):
+                with patch.object(ConstraintFilter, "BATCH_FILTER_THRESHOLD", len(schedules) + 1):
+                    scalar = ConstraintFilter.apply_constraints(schedules, constraints)
+                with patch.object(ConstraintFilter, "BATCH_FILTER_THRESHOLD", 1):
+                    batched = ConstraintFilter.apply_constraints(schedules, constraints)
+
+                self.assertEqual([id(s) for s in batched], [id(s) for s in scalar], text)
+
+    def test_filter_non_canonical_posted_blocks(self):
+        """Test posted blocks the batch cannot index are filtered like small lists"""
+        from app.main import FilterRequest, TimetableModel, filter_timetables
+
+        models = []
+        for schedule in self.schedules[:5]:
+            timetable = schedule.to_dict()
+            for slot in timetable["slots"]:
+                for tb in slot["time_blocks"]:
+                    tb["day"] = tb["day"][:3]  # "Mon"
+            models.append(TimetableModel(**timetable))
+
+        posted = models * 120
+        self.assertGreaterEqual(len(posted), ConstraintFilter.BATCH_FILTER_THRESHOLD)
+        for text in ("No back to back classes", "Prefer morning"):
+            expected = ConstraintFilter.apply_constraints(models, IntentDetector.detect_intent(text))
+            with patch("builtins.print"):
+                result = filter_timetables(FilterRequest(schedules=posted, constraint_text=text))
+            self.assertEqual(result.total, len(expected) * 120, text)
+
 
 # ============ Integration Tests ============
 
@@ -283,6 +967,609 @@ class TestIntegrationDataPipeline(unittest.TestCase):
         self.assertIn("19AI404", grouped)
         self.assertEqual(len(grouped["19AI404"]), 2)
 
+    def test_missing_names_serialize_as_null(self):
+        """Test missing names are valid JSON with and without orjson"""
+        import json
+        import pandas as pd
+        from app.modules import serialization
+
+        df = pd.DataFrame({
+            "COURSE_CODE": ["19AI404"], "COURSE_NAME": [float("nan")], "FACULTY_NAME": [None],
+            "SLOT_NUMBER": ["4W2-2"], "TIMINGS": ["Monday: 08:00 - 09:00"], "CREDITS": [3],
+        })
+        slot = CourseGrouper.group_courses(df)["19AI404"][0]
+        self.assertIsNone(slot.course_name)
+        for encoder in (serialization.orjson, None):
+            with patch.object(serialization, "orjson", encoder):
+                slot._json = None
+                # parse_constant rejects the NaN/Infinity tokens json.loads otherwise accepts
+                payload = json.loads(slot.to_json(), parse_constant=lambda token: self.fail(token))
+            self.assertEqual((payload["course_name"], payload["faculty_name"]), (None, None))
+        with self.assertRaises(ValueError):
+            with patch.object(serialization, "orjson", None):
+                serialization.dumps({"credits": float("nan")})
+
+
+class TestGenerateEndpoint(unittest.TestCase):
+    """Integration test: /generate against (a copy of) the bundled ENROLLMENT.csv"""
+
+    COURSES = ["19AI404", "19CE521", "19ME533"]
+
+    def test_pagination(self):
+        """Test offset/limit pages cover the full result exactly once"""
+        from app.main import generate_timetables, GenerateRequest
+
+        full = generate_timetables(GenerateRequest(course_codes=self.COURSES))
+        first = generate_timetables(GenerateRequest(course_codes=self.COURSES, limit=2))
+        rest = generate_timetables(GenerateRequest(course_codes=self.COURSES, offset=2))
+
+        self.assertTrue(first["has_more"])
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(first["timetables"] + rest["timetables"], full["timetables"])
+
+    def test_count_endpoint(self):
+        """Test /generate/count matches the number of generated timetables"""
+        from app.main import generate_timetables, count_timetables, GenerateRequest
+
+        request = GenerateRequest(course_codes=self.COURSES)
+        self.assertEqual(count_timetables(request)["count"], generate_timetables(request)["count"])
+
+    def test_ranked_top_k(self):
+        """Test rank/top_k returns the best timetables in ranked order"""
+        from app.main import generate_timetables, GenerateRequest
+
+        ranked = generate_timetables(GenerateRequest(course_codes=self.COURSES, rank=True))
+        top = generate_timetables(GenerateRequest(course_codes=self.COURSES, rank=True, top_k=2))
+
+        self.assertTrue(top["optimized"])
+        self.assertEqual(top["timetables"], ranked["timetables"][:2])
+
+    def test_search_limits(self):
+        """Test max_results returns a truncated page that is neither cached nor given a handle"""
+        from fastapi import HTTPException
+        from app.main import generate_timetables, count_timetables, result_cache, GenerateRequest
+
+        full = generate_timetables(GenerateRequest(course_codes=self.COURSES))
+        result_cache.clear()
+        limited = generate_timetables(GenerateRequest(course_codes=self.COURSES, max_results=2))
+
+        self.assertTrue(limited["truncated"])
+        self.assertEqual(limited["stop_reason"], "max_results")
+        self.assertIsNone(limited["result_set_id"])
+        self.assertEqual(result_cache.stats()["entries"], 0)
+        self.assertFalse(full["truncated"])
+        self.assertEqual(limited["timetables"], full["timetables"][:2])
+
+        with self.assertRaises(HTTPException) as ctx:
+            count_timetables(GenerateRequest(course_codes=self.COURSES, max_nodes=1))
+        self.assertEqual(ctx.exception.status_code, 503)
+        with self.assertRaises(HTTPException) as ctx:
+            generate_timetables(GenerateRequest(course_codes=self.COURSES, timeout_seconds=0))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_server_search_timeout(self):
+        """Test the server timeout caps requests and is validated as a setting"""
+        import time
+        from app import main
+        from app.main import GenerateRequest
+
+        with patch.object(main, "SEARCH_TIMEOUT", 5.0):
+            budget = main.search_budget(GenerateRequest(course_codes=self.COURSES, timeout_seconds=60))
+        self.assertLessEqual(budget.deadline - time.monotonic(), 5.0)
+        for value in ("0", "-1", "nan", "soon"):
+            with patch.dict(os.environ, {main.SEARCH_TIMEOUT_ENV: value}):
+                with self.assertRaises(ValueError):
+                    main.env_number(main.SEARCH_TIMEOUT_ENV, None, float, positive=True)
+
+    def test_stream_closed_early_stops_search(self):
+        """Test closing an NDJSON stream mid-way cancels its lazy search"""
+        import asyncio
+        from app import main
+        from app.main import generate_timetables, GenerateRequest
+
+        main.result_cache.clear()
+        budgets = []
+        iter_timetables = BacktrackingScheduler.iter_timetables
+
+        def recording(scheduler, courses, stats=None, constraints=None, budget=None):
+            budgets.append(budget)
+            return iter_timetables(scheduler, courses, stats, constraints, budget)
+
+        with patch.object(BacktrackingScheduler, "iter_timetables", recording):
+            response = generate_timetables(GenerateRequest(course_codes=self.COURSES, stream=True))
+
+        async def read_one_line():
+            body = response.body_iterator
+            first = await body.__anext__()
+            await body.aclose()  # What Starlette does when the client goes away
+            return first
+
+        self.assertTrue(asyncio.run(read_one_line()))
+        self.assertEqual(len(budgets), 1)
+        self.assertEqual(budgets[0].stop_reason(0), "cancelled")
+
+    def test_serialized_response_matches_dicts(self):
+        """Test the /generate route's spliced JSON equals the dict result, with either encoder"""
+        import asyncio
+        import json
+        from app.main import generate_timetables, generate_timetables_endpoint, GenerateRequest
+        from app.modules import serialization
+
+        class ConnectedRequest:
+            async def is_disconnected(self):
+                return False
+
+        for request in (
+            GenerateRequest(course_codes=self.COURSES),
+            GenerateRequest(course_codes=self.COURSES, limit=1, offset=1),
+            GenerateRequest(course_codes=self.COURSES, rank=True, top_k=2),
+        ):
+            expected = generate_timetables(request)
+            for encoder in (serialization.orjson, None):
+                with patch.object(serialization, "orjson", encoder):
+                    response = asyncio.run(generate_timetables_endpoint(request, ConnectedRequest()))
+                    body = json.loads(response.body)
+                    self.assertEqual(body, expected)
+                    self.assertEqual(list(body)[-1], "timetables")
+
+    def test_search_cancelled_on_disconnect(self):
+        """Test a client disconnect signals the running search to stop"""
+        import asyncio
+        from app.main import run_until_disconnected
+
+        class DisconnectedRequest:
+            async def is_disconnected(self):
+                return True
+
+        def search(timeout, cancelled):
+            return cancelled.wait(timeout)
+
+        self.assertTrue(asyncio.run(run_until_disconnected(DisconnectedRequest(), search, 5)))
+
+    def test_constraint_text(self):
+        """Test constraint_text runs intent detection and the constrained search together"""
+        from app.main import generate_timetables, count_timetables, GenerateRequest
+
+        request = GenerateRequest(course_codes=self.COURSES, constraint_text="No classes on Saturday")
+        result = generate_timetables(request)
+
+        self.assertEqual(result["constraints_applied"][0]["intent"], "avoid_day")
+        self.assertEqual(count_timetables(request)["count"], result["count"])
+        for timetable in result["timetables"]:
+            days = {tb["day"] for slot in timetable["slots"] for tb in slot["time_blocks"]}
+            self.assertNotIn("Saturday", days)
+
+    def test_result_cache(self):
+        """Test repeated selections are served from the result cache in the same order"""
+        from app import main
+        from app.main import generate_timetables, GenerateRequest
+
+        main.result_cache.clear()
+        first = generate_timetables(GenerateRequest(course_codes=self.COURSES))
+        misses = main.result_cache.misses
+        page = generate_timetables(GenerateRequest(course_codes=list(reversed(self.COURSES)), offset=1, limit=2))
+
+        self.assertEqual(main.result_cache.misses, misses)
+        self.assertGreater(main.result_cache.hits, 0)
+        self.assertEqual(
+            [[slot["course_code"] for slot in t["slots"]] for t in page["timetables"]],
+            [list(reversed(self.COURSES))] * len(page["timetables"]),
+        )
+        self.assertEqual(
+            [sorted(t["slots"], key=lambda slot: slot["course_code"]) for t in page["timetables"]],
+            [sorted(t["slots"], key=lambda slot: slot["course_code"]) for t in first["timetables"][1:3]],
+        )
+
+    def test_result_set_handles(self):
+        """Test /results and /filter work on the stored result set by id"""
+        from fastapi import HTTPException
+        from app import main
+        from app.main import generate_timetables, get_results_page, filter_timetables
+        from app.main import GenerateRequest, FilterRequest
+
+        full = generate_timetables(GenerateRequest(course_codes=self.COURSES))
+        result_set_id = full["result_set_id"]
+        self.assertIsNotNone(result_set_id)
+
+        page = get_results_page(result_set_id, offset=1, limit=1)
+        self.assertEqual(page["total"], full["count"])
+        self.assertTrue(page["has_more"])
+        self.assertEqual(page["timetables"], full["timetables"][1:2])
+
+        by_value = filter_timetables(FilterRequest(
+            schedules=full["timetables"], constraint_text="No classes on Saturday"
+        ))
+        main.result_cache.clear()  # Evicted results are regenerated from the handle
+        by_id = filter_timetables(FilterRequest(
+            result_set_id=result_set_id, constraint_text="No classes on Saturday"
+        ))
+        self.assertEqual(
+            [t.model_dump() for t in by_id.filtered_timetables],
+            [t.model_dump() for t in by_value.filtered_timetables],
+        )
+
+        with self.assertRaises(HTTPException) as ctx:
+            get_results_page("unknown")
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_result_cache_eviction(self):
+        """Test the memory cap and TTL evict result sets"""
+        from app.main import ResultCache
+        from app.modules.scheduler import ScheduleSet
+
+        slot = Slot("C0", "Course", "Faculty", "S0", 3, [TimeBlock("Monday", "08:00", "09:00")])
+        schedules = ScheduleSet.from_choices(["C0"], [[slot]], [(0,)] * 10)
+        size = ResultCache.estimate_size(schedules)
+        cache = ResultCache(max_bytes=size * 2)
+        cache.put("a", schedules)
+        cache.put("b", schedules)
+        cache.put("c", schedules)
+        self.assertIsNone(cache.get("a"))
+        self.assertIs(cache.get("c"), schedules)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache = ResultCache(ttl_seconds=0)
+        cache.put("a", schedules)
+        self.assertIsNone(cache.get("a"))
+
+        cache = ResultCache(max_entries=2)
+        for key in "abc":
+            cache.put(key, schedules)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertIsNone(cache.get("a"))
+
+    def test_result_cache_settings(self):
+        """Test the result cache limits come from the environment"""
+        from app import main
+
+        env = {
+            main.RESULT_CACHE_MAX_BYTES_ENV: "1048576",
+            main.RESULT_CACHE_MAX_ENTRIES_ENV: "16",
+            main.RESULT_CACHE_TTL_ENV: "2.5",
+        }
+        with patch.dict(os.environ, env):
+            stats = main.configured_result_cache().stats()
+        self.assertEqual((stats["max_bytes"], stats["max_entries"], stats["ttl_seconds"]), (1048576, 16, 2.5))
+        with patch.dict(os.environ, {main.RESULT_CACHE_TTL_ENV: "soon"}):
+            with self.assertRaises(ValueError):
+                main.configured_result_cache()
+
+    def test_stream_ndjson(self):
+        """Test streaming mode emits one JSON timetable per line"""
+        import asyncio
+        import json
+        from app.main import generate_timetables, GenerateRequest
+
+        full = generate_timetables(GenerateRequest(course_codes=self.COURSES))
+        response = generate_timetables(GenerateRequest(course_codes=self.COURSES, stream=True))
+
+        async def collect():
+            return [chunk async for chunk in response.body_iterator]
+
+        lines = asyncio.run(collect())
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in lines], full["timetables"])
+
+
+class TestUploadEndpoint(unittest.TestCase):
+    """Integration test: /upload_csv validates before replacing the served dataset"""
+
+    def setUp(self):
+        import tempfile
+        import shutil
+        from app import main
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp.name, "ENROLLMENT.csv")
+        shutil.copy(main.DATA_FILE, self.data_file)
+        self.globals = patch.multiple(main, DATA_FILE=self.data_file, dataset=None)
+        self.globals.start()
+        with patch("builtins.print"):
+            main.load_data()
+
+    def tearDown(self):
+        from app import main
+        main.result_cache.clear()
+        main.result_sets.clear()
+        self.globals.stop()
+        self.tmp.cleanup()
+
+    def upload(self, content: bytes, filename: str = "new.csv"):
+        import asyncio
+        import io
+        from fastapi import UploadFile
+        from app.main import upload_csv
+        with patch("builtins.print"):
+            return asyncio.run(upload_csv(UploadFile(io.BytesIO(content), filename=filename)))
+
+    def test_upload_replaces_dataset(self):
+        """Test a valid upload is written over the data file and served"""
+        from app import main
+        with open(self.data_file, "rb") as f:
+            header, first_row = f.read().decode("utf-8").splitlines()[:2]
+        content = f"{header}\n{first_row}\n".encode("utf-8")
+
+        with patch.object(main, "UPLOAD_CHUNK_SIZE", 16):
+            result = self.upload(content)
+
+        self.assertEqual(result["total_courses"], 1)
+        self.assertEqual(len(main.load_data()), 1)
+        with open(self.data_file, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["ENROLLMENT.csv", "ENROLLMENT.snapshot"])
+
+    def test_invalid_upload_keeps_dataset(self):
+        """Test a CSV that fails validation leaves the served dataset and file untouched"""
+        from fastapi import HTTPException
+        from app import main
+        grouped = main.load_data()
+        with open(self.data_file, "rb") as f:
+            original = f.read()
+
+        with self.assertRaises(HTTPException) as ctx:
+            self.upload(b"COURSE_CODE,CREDITS\nCS101,3\n")
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIs(main.load_data(), grouped)
+        with open(self.data_file, "rb") as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["ENROLLMENT.csv", "ENROLLMENT.snapshot"])
+
+
+class TestSlotEndpoints(unittest.TestCase):
+    """Integration test: slot edits patch the served dataset and its caches"""
+
+    def setUp(self):
+        from app import main
+        self.globals = patch.multiple(main, dataset=None)
+        self.globals.start()
+        with patch("builtins.print"):
+            main.load_data()
+
+    def tearDown(self):
+        from app import main
+        main.result_cache.clear()
+        main.result_sets.clear()
+        self.globals.stop()
+
+    def test_edit_invalidates_only_affected_results(self):
+        """Test an updated slot is served and only results involving its course are dropped"""
+        from app import main
+        from app.main import GenerateRequest, SlotModel, TimeBlockModel
+
+        main.generate_timetables(GenerateRequest(course_codes=["19AI404", "19ME533"]))
+        main.generate_timetables(GenerateRequest(course_codes=["19CE521"]))
+        self.assertEqual(main.result_cache.stats()["entries"], 2)
+        original = main.load_data()["19ME533"][0]
+
+        body = SlotModel(
+            course_code="19ME533", course_name=original.course_name, faculty_name=original.faculty_name,
+            slot_number="4C1-9", credits=original.credits,
+            time_blocks=[TimeBlockModel(day="Saturday", start_time="15:00", end_time="16:00")],
+        )
+        version = main.get_dataset().version
+        result = main.update_slot("19ME533", original.slot_number, body)
+
+        self.assertEqual(result["dataset_version"], version + 1)
+        self.assertEqual(main.result_cache.stats()["entries"], 1)
+        numbers = [slot.slot_number for slot in main.load_data()["19ME533"]]
+        self.assertIn("4C1-9", numbers)
+        self.assertNotIn(original.slot_number, numbers)
+        served = main.generate_timetables(GenerateRequest(course_codes=["19ME533"]))
+        self.assertIn("4C1-9", [t["slots"][0]["slot_number"] for t in served["timetables"]])
+
+        # Its only slot: deleting it removes the course, adding one brings it back
+        main.delete_slot("19ME533", "4C1-9")
+        self.assertNotIn("19ME533", main.load_data())
+        self.assertEqual(main.add_slot(body)["dataset_version"], version + 3)
+        self.assertEqual(main.load_data()["19ME533"][0].slot_number, "4C1-9")
+
+    def test_edit_expires_affected_result_sets(self):
+        """Test handles of results involving an edited course 404 instead of changing"""
+        from fastapi import HTTPException
+        from app import main
+        from app.main import GenerateRequest
+
+        affected = main.generate_timetables(GenerateRequest(course_codes=["19AI404", "19CE521"]))
+        other = main.generate_timetables(GenerateRequest(course_codes=["19ME533"]))
+        self.assertGreater(affected["count"], 1)
+
+        main.delete_slot("19AI404", main.load_data()["19AI404"][0].slot_number)
+        with self.assertRaises(HTTPException) as ctx:
+            main.get_results_page(affected["result_set_id"])
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(main.get_results_page(other["result_set_id"])["total"], other["count"])
+
+    def test_invalid_edits_rejected(self):
+        """Test unknown, duplicate and malformed slots leave the dataset untouched"""
+        from fastapi import HTTPException
+        from app import main
+        from app.main import SlotModel, TimeBlockModel
+
+        grouped = main.load_data()
+        existing = grouped["19ME533"][0]
+        body = SlotModel(
+            course_code="19ME533", course_name="x", faculty_name="y", slot_number=existing.slot_number,
+            credits=3, time_blocks=[TimeBlockModel(day="Monday", start_time="08:00", end_time="09:00")],
+        )
+        bad_time = body.model_copy(update={
+            "slot_number": "NEW",
+            "time_blocks": [TimeBlockModel(day="Monday", start_time="09:00", end_time="08:00")],
+        })
+        for call, status in (
+            (lambda: main.delete_slot("19ME533", "missing"), 404),
+            (lambda: main.add_slot(body), 409),
+            (lambda: main.add_slot(bad_time), 400),
+        ):
+            with self.assertRaises(HTTPException) as ctx:
+                call()
+            self.assertEqual(ctx.exception.status_code, status)
+        self.assertIs(main.load_data(), grouped)
+
+
+class TestCourseCatalog(unittest.TestCase):
+    """Integration test: /courses is built once per dataset version and revalidated"""
+
+    def setUp(self):
+        from app import main
+        self.globals = patch.multiple(main, dataset=None)
+        self.globals.start()
+        with patch("builtins.print"):
+            main.load_data()
+
+    def tearDown(self):
+        self.globals.stop()
+
+    def get_courses(self, **headers):
+        """Call the endpoint with request headers (underscores for dashes)"""
+        from starlette.requests import Request
+        from app import main
+        raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+        return main.get_available_courses(Request({"type": "http", "headers": raw}))
+
+    def test_conditional_get(self):
+        """Test validators, 304 responses and a new ETag after a slot edit"""
+        import json
+        from app import main
+
+        plain = self.get_courses()
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(json.loads(plain.body)["count"], len(main.load_data()))
+        etag = plain.headers["etag"]
+
+        for headers in (
+            {"if_none_match": etag},
+            {"if_none_match": f'"other", W/{etag}'},
+            {"if_modified_since": plain.headers["last-modified"]},
+        ):
+            response = self.get_courses(**headers)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.body, b"")
+        self.assertIs(self.get_courses().body, plain.body)
+
+        main.delete_slot("19ME533", main.load_data()["19ME533"][0].slot_number)
+        changed = self.get_courses(if_none_match=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+        self.assertEqual(json.loads(changed.body)["count"], json.loads(plain.body)["count"] - 1)
+
+    def test_gzip_variant(self):
+        """Test gzip is served only when accepted, with its own ETag"""
+        import gzip
+        from app.main import accepts_gzip
+
+        compressed = self.get_courses(accept_encoding="gzip, deflate")
+        plain = self.get_courses(accept_encoding="identity")
+        self.assertEqual(compressed.headers["content-encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.body), plain.body)
+        self.assertNotEqual(compressed.headers["etag"], plain.headers["etag"])
+        revalidated = self.get_courses(accept_encoding="gzip", if_none_match=compressed.headers["etag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertTrue(accepts_gzip("deflate, gzip;q=0.5"))
+        self.assertFalse(accepts_gzip("gzip;q=0, br"))
+
+
+class TestDatasetState(unittest.TestCase):
+    """Integration test: the served dataset is loaded once and replaced, never mutated"""
+
+    def setUp(self):
+        from app import main
+        self.globals = patch.multiple(main, dataset=None)
+        self.globals.start()
+
+    def tearDown(self):
+        from app import main
+        main.result_cache.clear()
+        main.result_sets.clear()
+        self.globals.stop()
+
+    def test_concurrent_first_load_is_single_flight(self):
+        """Test threads arriving before the first load share one CSV read"""
+        import threading
+        import time
+        from app import main
+
+        read = main.read_data_file
+        calls = []
+
+        def slow_read():
+            calls.append(1)
+            time.sleep(0.05)
+            return read()
+
+        with patch.object(main, "read_data_file", slow_read), patch("builtins.print"):
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(main.get_dataset())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_edit_leaves_previous_version_intact(self):
+        """Test a request holding the old dataset keeps a consistent view after an edit"""
+        from app import main
+        with patch("builtins.print"):
+            before = main.get_dataset()
+        removed = before.grouped["19AI404"][0]
+        courses = ["19AI404", "19CE521"]
+        expected = [s.slots for s in before.scheduler.generate_timetables(courses)]
+
+        main.delete_slot("19AI404", removed.slot_number)
+
+        after = main.get_dataset()
+        self.assertEqual(after.version, before.version + 1)
+        self.assertIn(removed, before.grouped["19AI404"])
+        self.assertIs(before.conflict_index.slots[before.conflict_index.slot_id(removed)], removed)
+        self.assertEqual([s.slots for s in before.scheduler.generate_timetables(courses)], expected)
+        with self.assertRaises(ValueError):
+            after.conflict_index.slot_id(removed)
+
+
+class TestStartup(unittest.TestCase):
+    """Integration test: import cost and optional warm-up of app.main"""
+
+    def test_app_import_skips_pandas(self):
+        """Test importing the API does not load pandas until CSV data is ingested"""
+        import subprocess
+        code = "import sys, app.main; print('pandas' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.join(os.path.dirname(__file__), ".."), check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_warm_up_on_startup(self):
+        """Test the lifespan hook warms up only when enabled"""
+        import asyncio
+        from app import main
+
+        async def start_and_stop():
+            async with main.app.router.lifespan_context(main.app):
+                pass
+
+        with patch.object(main, "warm_up") as warm_up, patch.object(main, "dataset", None):
+            with patch.dict(os.environ, {main.WARMUP_ENV: "0"}):
+                asyncio.run(start_and_stop())
+            warm_up.assert_not_called()
+            with patch.dict(os.environ, {main.WARMUP_ENV: "1"}):
+                asyncio.run(start_and_stop())
+            warm_up.assert_called_once()
+
+    def test_search_pool_settings(self):
+        """Test worker count and parallel threshold come from the environment"""
+        from app import main
+
+        grouped = {"C0": [Slot("C0", "Course", "Faculty", "S0", 3, [TimeBlock("Monday", "08:00", "09:00")])]}
+        env = {main.SEARCH_WORKERS_ENV: "0", main.PARALLEL_THRESHOLD_ENV: "5000"}
+        with patch.dict(os.environ, env):
+            pool = main.Dataset.build(grouped, ConflictIndex(grouped), "hash", 1).parallel_search
+        self.assertEqual(pool.workers, 1)
+        self.assertEqual(pool.min_combinations, 5000)
+        with patch.dict(os.environ, {main.SEARCH_WORKERS_ENV: "-2"}):
+            with self.assertRaises(ValueError):
+                main.Dataset.build(grouped, ConflictIndex(grouped), "hash", 1)
+
 
 def run_tests():
     """Run all tests"""